@@ -0,0 +1,14 @@
+"""
+性能基准模块 (benchmarks)
+=====================
+
+本目录存放知识问答系统的基准测试脚本，用于比较优化前后的性能差异。
+
+- run_suite: 合成规模基准套件（10k / 1M / 10M 三元组，SQLite 本地存储，结果输出为 JSON）
+- synthetic: 按种子生成可复现的中文知识图谱和问题语料
+- 其余 bench_*.py 为针对单项优化的微基准
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.run_suite --scales 10k 1m
+    python -m benchmarks.bench_relation_matcher
+"""
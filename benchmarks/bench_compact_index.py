@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑三元组索引内存基准
+======================
+
+用 benchmarks/synthetic.py 生成 --sizes 个三元组，比较两种内存索引：
+- dict: TripleIndex，正向/反向字符串字典（每个三元组多个 str 对象和字典条目）
+- compact: CompactTripleIndex，字符串驻留为整数 id，CSR 邻接存放在 array 中
+
+每种索引在独立子进程中构建，报告：构建耗时、常驻内存增量（RSS）折合每三元组字节数、
+compact 自身统计的数组占用，以及原始 UTF-8 数据量（三个字符串的字节数之和）作为参照，
+另外比较两者的查询延迟并确认命中情况一致。dict 在千万级时内存可能超过本机，
+默认只在不超过 --dict-max 的规模上运行。
+
+运行方式：
+    python -m benchmarks.bench_compact_index [--sizes 1000000,10000000] [--dict-max 1000000] [--queries 20000]
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import time
+
+from database.compact_index import CompactTripleIndex
+from database.triple_index import TripleIndex
+from benchmarks.common import latency_summary
+from benchmarks.synthetic import SyntheticKnowledgeGraph
+
+STORES = {"dict": TripleIndex, "compact": CompactTripleIndex}
+
+
+def current_rss_bytes():
+    """当前常驻内存（Linux /proc/self/statm 第二列为页数）"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def build_and_measure(store, size, queries, seed, conn):
+    """子进程：构建索引，测量内存与查询延迟，结果通过管道返回"""
+    graph = SyntheticKnowledgeGraph(seed)
+    payload = [0]
+
+    def stream():
+        for triple in graph.triples(size):
+            payload[0] += sum(len(value.encode("utf-8")) for value in triple)
+            yield triple
+
+    gc.collect()
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    index = STORES[store]()
+    index.load(stream())
+    build_seconds = time.perf_counter() - start
+    gc.collect()
+    rss_delta = current_rss_bytes() - rss_before
+
+    # 查询样本：一半已知实体（正向/反向），一半不存在的实体
+    rng = random.Random(seed)
+    relations = graph.relations() + [""]
+    entity_count = max(1, -(-size // 3))
+    keys = [(graph.entity(rng.randrange(entity_count))[0], rng.choice(relations)) for _ in range(queries // 2)]
+    keys += [(name, rng.choice(relations)) for name in graph.missing_entities(queries - len(keys))]
+    samples, answers = [], []
+    for entity, relation in keys:
+        t0 = time.perf_counter()
+        answers.append(index.lookup(entity, relation))
+        samples.append(time.perf_counter() - t0)
+    conn.send({
+        "triples": index.size,
+        "build_seconds": build_seconds,
+        "rss_delta": rss_delta,
+        "payload": payload[0],
+        "arrays": index.stats()["total_bytes"] if store == "compact" else None,
+        "latency": latency_summary(samples),
+        "found": [answer is not None for answer in answers],
+    })
+    conn.close()
+
+
+def run(store, size, queries, seed):
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=build_and_measure, args=(store, size, queries, seed, child))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="紧凑三元组索引内存基准")
+    parser.add_argument('--sizes', default="1000000,10000000", help="逗号分隔的三元组数量")
+    parser.add_argument('--dict-max', type=int, default=1_000_000, help="dict 索引运行的最大规模")
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'规模':>10} {'索引':<8} {'构建(s)':>8} {'RSS/三元组':>11} {'数组/三元组':>11} {'原始数据/三元组':>15} "
+          f"{'p50(us)':>8} {'p99(us)':>8}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        results = {}
+        for store in STORES:
+            if store == "dict" and size > args.dict_max:
+                continue
+            result = results[store] = run(store, size, args.queries, args.seed)
+            triples = result["triples"]
+            arrays = f"{result['arrays'] / triples:.1f}" if result["arrays"] is not None else "-"
+            print(f"{size:>10} {store:<8} {result['build_seconds']:>8.1f} {result['rss_delta'] / triples:>11.1f} "
+                  f"{arrays:>11} {result['payload'] / triples:>15.1f} "
+                  f"{result['latency']['p50_us']:>8.1f} {result['latency']['p99_us']:>8.1f}")
+        if len(results) == 2:
+            agree = sum(a == b for a, b in zip(results["dict"]["found"], results["compact"]["found"]))
+            print(f"{'':>10} 命中情况一致 {agree}/{len(results['dict']['found'])}，"
+                  f"内存为 dict 的 {results['compact']['rss_delta'] / results['dict']['rss_delta']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实体过滤器基准
+==============
+
+用 benchmarks/synthetic.py 生成 --triples 个三元组写入临时 SQLite 文件（不需要 MySQL），测量：
+- build: 从数据库重建过滤器与从文件加载（加载后按 id 补齐新增三元组）的耗时
+- fpr: 用数据库中不存在的实体实测误判率，与配置的目标值和按置位比例估计的值比较
+- miss: 未知实体查询延迟分位数，未启用 / 启用过滤器各一组（均不使用答案缓存）
+- hit: 已知实体查询延迟，确认过滤器对命中路径的额外开销
+
+运行方式：
+    python -m benchmarks.bench_entity_filter [--triples 300000] [--queries 5000] [--fpr 0.01]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from config.system_config import SYSTEM_CONFIG
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.common import latency_summary
+from benchmarks.synthetic import SyntheticKnowledgeGraph
+
+
+def measure_queries(db, keys):
+    samples = []
+    for entity, relation in keys:
+        t0 = time.perf_counter()
+        db.query_knowledge(entity, relation)
+        samples.append(time.perf_counter() - t0)
+    return latency_summary(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实体过滤器基准")
+    parser.add_argument('--triples', type=int, default=300_000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--capacity', type=int, default=None, help="过滤器容量，默认为实体数")
+    parser.add_argument('--fpr', type=float, default=0.01, help="目标误判率")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    graph = SyntheticKnowledgeGraph(args.seed)
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        db = DBOperation(backend=SQLiteBackend(os.path.join(work_dir, "filter.db")))
+        filter_path = os.path.join(work_dir, "entities.bloom")
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.bulk_save_knowledge(graph.triples(args.triples), batch_size=10000)
+            entities = {entity for triple in graph.triples(args.triples) for entity in (triple[0], triple[2])}
+            SYSTEM_CONFIG["entity_filter_capacity"] = args.capacity or len(entities)
+            SYSTEM_CONFIG["entity_filter_fpr"] = args.fpr
+            print(f"✅ 已导入 {args.triples} 个三元组，{len(entities)} 个不同实体")
+
+            start = time.perf_counter()
+            db.load_entity_filter(path=filter_path)
+            rebuild_seconds = time.perf_counter() - start
+            # 模拟文件生成之后又学习了新知识，再从文件加载并补齐
+            for i in range(1000):
+                db.save_knowledge(f"新增实体{i}", "别名", f"新增别名{i}")
+            start = time.perf_counter()
+            db.load_entity_filter(path=filter_path)
+            file_seconds = time.perf_counter() - start
+            stats = db.entity_filter.stats()
+            print(f"重建 {rebuild_seconds:.2f}s，从文件加载并补齐 1000 条 {file_seconds * 1000:.1f}ms，"
+                  f"{stats['bits']} 位 / {stats['hashes']} 个哈希，占用 {stats['memory_bytes'] / 1024:.0f} KB")
+            missing = [f"不存在的实体{i}" for i in range(max(args.queries, 100_000))]
+            false_positives = sum(1 for entity in missing if entity in db.entity_filter)
+            print(f"误判率：目标 {args.fpr:.2%}，估计 {stats['estimated_false_positive_rate']:.2%}，"
+                  f"实测 {false_positives / len(missing):.2%}（{len(missing)} 个未知实体）")
+            assert all(f"新增实体{i}" in db.entity_filter for i in range(1000)), "新增实体不应被判为不存在"
+
+            relations = [relation for _, relation, _ in graph.triples(1000)]
+            miss_keys = [(rng.choice(missing), rng.choice(relations)) for _ in range(args.queries)]
+            known = sorted(entities)
+            hit_keys = [(rng.choice(known), rng.choice(relations)) for _ in range(args.queries)]
+
+            print(f"{'查询':<16} {'p50(us)':>10} {'p90(us)':>10} {'p99(us)':>10}")
+            bloom = db.entity_filter
+            for label, enabled, keys in [("miss 无过滤器", False, miss_keys), ("miss 过滤器", True, miss_keys),
+                                         ("hit 无过滤器", False, hit_keys), ("hit 过滤器", True, hit_keys)]:
+                db.entity_filter = bloom if enabled else None
+                summary = measure_queries(db, keys)
+                print(f"{label:<16} {summary['p50_us']:>10.1f} {summary['p90_us']:>10.1f} {summary['p99_us']:>10.1f}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
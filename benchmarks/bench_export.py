@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识流式导出基准
+================
+
+用 benchmarks/synthetic.py 生成 --triples 个三元组写入临时 SQLite 文件（不需要 MySQL），
+通过 database.export_triples 分别导出为 csv / jsonl / columnar，每种格式在独立子进程中运行，报告：
+- 导出吞吐量（行/秒）和输出文件每行字节数
+- 导出进程峰值常驻内存增量（应只取决于批大小，与表大小无关）
+另外对 columnar 文件用 iter_columnar 读回并确认行数一致。
+
+运行方式：
+    python -m benchmarks.bench_export [--triples 1000000] [--batch-size 10000]
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+
+from database.db_operation import DBOperation
+from database.export_triples import FORMATS, export_triples, iter_columnar
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.synthetic import SyntheticKnowledgeGraph
+
+
+def run_export(db_path, output, fmt, batch_size, conn):
+    """子进程：导出一次，返回统计信息和峰值内存增量"""
+    db = DBOperation(backend=SQLiteBackend(db_path))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        stats = export_triples(db, output, fmt, batch_size=batch_size, checkpoint=output + ".checkpoint")
+    finally:
+        db.close()
+    stats["peak_rss_delta_mb"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    conn.send(stats)
+    conn.close()
+
+
+def run(db_path, output, fmt, batch_size):
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=run_export, args=(db_path, output, fmt, batch_size, child))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="知识流式导出基准")
+    parser.add_argument('--triples', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, "export.db")
+        db = DBOperation(backend=SQLiteBackend(db_path))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.bulk_save_knowledge(SyntheticKnowledgeGraph(args.seed).triples(args.triples), batch_size=10000)
+        db.close()
+        print(f"数据库文件 {os.path.getsize(db_path) / args.triples:.1f} 字节/行")
+
+        print(f"{'格式':<10} {'行数':>9} {'行/秒':>9} {'字节/行':>8} {'峰值内存增量(MB)':>16}")
+        for fmt in FORMATS:
+            output = os.path.join(work_dir, f"export.{fmt}")
+            stats = run(db_path, output, fmt, args.batch_size)
+            print(f"{fmt:<10} {stats['rows']:>9} {stats['rows_per_sec']:>9.0f} "
+                  f"{stats['bytes'] / stats['rows']:>8.1f} {stats['peak_rss_delta_mb']:>16.1f}")
+            if fmt == "columnar":
+                count = sum(1 for _ in iter_columnar(output))
+                print(f"{'':<10} 读回 {count} 行，{'一致' if count == stats['rows'] else '不一致'}")
+            os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+问答语料并行抽取基准
+====================
+
+用 benchmarks/synthetic.py 生成问答对写入临时 JSONL 文件（每 20 个问答对混入一个无法抽取的闲聊），
+通过 database.extract_corpus 抽取并写入临时 SQLite 文件（不需要 MySQL），对每个规模和工作进程数报告：
+- 吞吐量（问答对/秒）和相对单进程（--workers 0）的加速比
+- 主进程峰值常驻内存（应与输入规模无关）
+- 抽取/拒绝/写入数量
+
+每次运行在独立子进程中进行，峰值内存互不影响。加速比受本机 CPU 核数限制。
+
+运行方式：
+    python -m benchmarks.bench_extract_corpus [--sizes 100000,400000] [--workers 0,1,2,4] [--chunk-size 500]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+
+from database.db_operation import DBOperation
+from database.extract_corpus import extract_corpus
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.synthetic import QUESTION_TEMPLATES, SyntheticKnowledgeGraph
+
+CHATTER = ["你好", "谢谢", "嗯嗯", "再见", "好的"]
+
+
+def write_corpus(path, size, seed):
+    """生成 size 个问答对，问题句式取自合成问题模板，答案为对应三元组的另一端"""
+    graph = SyntheticKnowledgeGraph(seed)
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for index, (e1, rel, e2) in enumerate(graph.triples(size)):
+            if index % 20 == 19:
+                record = {"question": rng.choice(CHATTER), "answer": "好"}
+            else:
+                template = rng.choice(QUESTION_TEMPLATES[:4])
+                record = {"question": template.format(e1=e1, rel=rel, e2=e2), "answer": e2}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def run_extraction(corpus, db_path, workers, chunk_size, conn):
+    """子进程：抽取整个语料，返回统计信息和峰值内存"""
+    db = DBOperation(backend=SQLiteBackend(db_path))
+    try:
+        with open(db_path + ".rejects.jsonl", "w", encoding="utf-8") as reject_file:
+            stats = extract_corpus(db, corpus, reject_file, workers=workers, chunk_size=chunk_size, batch_size=5000)
+    finally:
+        db.close()
+    stats["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    conn.send(stats)
+    conn.close()
+
+
+def run(corpus, db_path, workers, chunk_size):
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=run_extraction, args=(corpus, db_path, workers, chunk_size, child))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="问答语料并行抽取基准")
+    parser.add_argument('--sizes', default="100000,400000", help="逗号分隔的问答对数量")
+    parser.add_argument('--workers', default="0,1,2,4", help="逗号分隔的工作进程数（0 表示不使用进程池）")
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"本机 CPU 核数: {os.cpu_count()}")
+    print(f"{'规模':>8} {'进程':>4} {'对/秒':>9} {'加速比':>6} {'峰值内存(MB)':>12} {'抽取':>8} {'拒绝':>7} {'写入':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in (int(value) for value in args.sizes.split(",")):
+            corpus = os.path.join(work_dir, f"qa-{size}.jsonl")
+            write_corpus(corpus, size, args.seed)
+            baseline = None
+            for workers in (int(value) for value in args.workers.split(",")):
+                db_path = os.path.join(work_dir, f"extract-{size}-{workers}.db")
+                stats = run(corpus, db_path, workers, args.chunk_size)
+                baseline = baseline or stats["pairs_per_sec"]
+                print(f"{size:>8} {workers:>4} {stats['pairs_per_sec']:>9.0f} "
+                      f"{stats['pairs_per_sec'] / baseline:>6.2f} {stats['max_rss_mb']:>12.1f} "
+                      f"{stats['extracted']:>8} {stats['rejected']:>7} {stats['saved']:>8}")
+                os.remove(db_path)
+                os.remove(db_path + ".rejects.jsonl")
+
+
+if __name__ == "__main__":
+    main()
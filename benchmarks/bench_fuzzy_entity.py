@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相似实体索引基准
+================
+
+用 benchmarks/synthetic.py 生成 --entities 个中文实体构建 FuzzyEntityIndex，测量：
+- build: 构建耗时和进程内存增量
+- search: 各类拼写错误的查询延迟分位数与召回率（原实体出现在前 --limit 个结果中的比例；
+  合成实体名只用约 150 个常用字组合，编辑距离 1 以内的邻居很多，召回率受 --limit 影响）
+  - substitute / insert / delete: 随机替换、插入、删除一个字（编辑距离 1）
+  - width_space: 全角字符 + 多余空格（规范化后距离 0）
+  - miss: 与任何实体都不相近的字符串
+- add: 增量加入新实体的延迟
+
+不访问数据库，只测量索引本身。
+
+运行方式：
+    python -m benchmarks.bench_fuzzy_entity [--entities 1000000] [--queries 5000] [--limit 10]
+"""
+
+import argparse
+import random
+import resource
+import time
+
+from database.entity_index import FuzzyEntityIndex
+from benchmarks.common import latency_summary
+from benchmarks.synthetic import NAME_CHARS, SyntheticKnowledgeGraph
+
+
+def max_rss_mb():
+    """进程峰值常驻内存（MB，Linux 下 ru_maxrss 单位为 KB）"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def substitute(rng, name):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice([c for c in NAME_CHARS if c != name[i]]) + name[i + 1:]
+
+
+def insert(rng, name):
+    i = rng.randrange(len(name) + 1)
+    return name[:i] + rng.choice(NAME_CHARS) + name[i:]
+
+
+def delete(rng, name):
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def width_space(rng, name):
+    # ASCII 字母数字转为全角，并在随机位置插入空格
+    wide = ''.join(chr(ord(c) + 0xFEE0) if '!' <= c <= '~' else c for c in name)
+    i = rng.randrange(1, len(wide))
+    return wide[:i] + " " + wide[i:]
+
+
+def miss(rng, name):
+    return ''.join(rng.choice("甲乙丙丁戊己庚辛壬癸") for _ in range(len(name)))
+
+
+MUTATIONS = [("substitute", substitute), ("insert", insert), ("delete", delete),
+             ("width_space", width_space), ("miss", miss)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="相似实体索引基准")
+    parser.add_argument('--entities', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument("--max-distance", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=10, help="每次查询最多返回的实体数（召回率按此计算）")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    graph = SyntheticKnowledgeGraph(args.seed)
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    index = FuzzyEntityIndex(max_distance=args.max_distance)
+    index.load(graph.entity(i)[0] for i in range(args.entities))
+    build_seconds = time.perf_counter() - start
+    stats = index.stats()
+    print(f"✅ 构建完成：{stats['entities']} 个实体，{stats['compiled_entries']} 个删除串条目"
+          f"（{stats['compiled_mb']:.0f} MB），耗时 {build_seconds:.2f}s，峰值内存约 +{max_rss_mb() - rss_before:.0f} MB")
+
+    rng = random.Random(args.seed)
+    names = [graph.entity(rng.randrange(args.entities))[0] for _ in range(args.queries)]
+    print(f"{'查询类型':<12} {'p50(us)':>10} {'p90(us)':>10} {'p99(us)':>10} {'召回率':>8} {'平均结果数':>10}")
+    for label, mutate in MUTATIONS:
+        queries = [(name, mutate(rng, name)) for name in names]
+        samples = []
+        recalled = 0
+        returned = 0
+        for name, query in queries:
+            t0 = time.perf_counter()
+            results = index.search(query, limit=args.limit)
+            samples.append(time.perf_counter() - t0)
+            returned += len(results)
+            recalled += any(entity == name for entity, _ in results)
+        summary = latency_summary(samples)
+        recall = "-" if label == "miss" else f"{recalled / len(queries):.1%}"
+        print(f"{label:<12} {summary['p50_us']:>10.1f} {summary['p90_us']:>10.1f} {summary['p99_us']:>10.1f} "
+              f"{recall:>8} {returned / len(queries):>10.2f}")
+
+    samples = []
+    for i in range(args.queries):
+        name = f"新增实体{i}"
+        t0 = time.perf_counter()
+        index.add(name)
+        samples.append(time.perf_counter() - t0)
+    summary = latency_summary(samples)
+    print(f"{'add':<12} {summary['p50_us']:>10.1f} {summary['p90_us']:>10.1f} {summary['p99_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
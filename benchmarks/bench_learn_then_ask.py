@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+学习后立即提问基准
+==================
+
+在大规模关系词表下，测量"保存一条使用新关系词的知识 → 立即用该关系词提问"的端到端延迟：
+- incremental: QAEngine 通过 save_listeners 把新关系词增量加入抽取器（O(len(关系词))）
+- rebuild: 作为对照，测量每次学习后重新编译整个 RelationMatcher 的耗时
+
+使用嵌入式 SQLite 内存库（不需要 MySQL），词表由 --sizes 个合成关系词组成。
+
+运行方式：
+    python -m benchmarks.bench_learn_then_ask [--sizes 10000 100000] [--rounds 500] [--rebuild-rounds 3]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from core.qa_engine import QAEngine
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+from nlp.relation_matcher import RelationMatcher
+from benchmarks.bench_relation_matcher import CJK_START, CJK_END, make_relations
+from benchmarks.common import latency_summary
+
+
+def new_relation(rng, known):
+    """生成一个不在词表中的 6 字关系词"""
+    while True:
+        relation = ''.join(chr(rng.randint(CJK_START, CJK_END)) for _ in range(6))
+        if relation not in known:
+            known.add(relation)
+            return relation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="学习后立即提问基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--rounds', type=int, default=500)
+    parser.add_argument('--rebuild-rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'关系词数':>10} {'learn+ask p50(us)':>18} {'p99(us)':>10} {'错误':>6} {'rebuild(ms)':>12}")
+    for size in args.sizes:
+        relations = make_relations(size)
+        db = DBOperation(backend=SQLiteBackend(":memory:"))
+        # 静默写入：每条知识一个关系词，QAEngine 启动时从数据库读取完整词表
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.bulk_save_knowledge(((f"S{i}", rel, f"A{i}") for i, rel in enumerate(relations)), batch_size=10000)
+            engine = QAEngine(db_operation=db)
+
+        rng = random.Random(size)
+        known = set(relations)
+        samples = []
+        errors = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(args.rounds):
+                relation = new_relation(rng, known)
+                start = time.perf_counter()
+                db.save_knowledge(f"E{i}", relation, f"答案{i}")
+                answer, _ = engine.answer_question(f"E{i}{relation}是什么", silent=True)
+                samples.append(time.perf_counter() - start)
+                if answer != f"答案{i}":
+                    errors += 1
+
+        vocabulary = sorted(engine.triple_extractor.relation_matcher.relations)
+        start = time.perf_counter()
+        for _ in range(args.rebuild_rounds):
+            RelationMatcher(vocabulary)
+        rebuild_ms = (time.perf_counter() - start) / args.rebuild_rounds * 1000
+
+        summary = latency_summary(samples)
+        print(f"{size:>10} {summary['p50_us']:>18.1f} {summary['p99_us']:>10.1f} {errors:>6} {rebuild_ms:>12.1f}")
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
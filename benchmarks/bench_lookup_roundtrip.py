@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+查询往返次数基准
+================
+
+比较 DBOperation 两种数据库查询方式在各个回退分支上的延迟分位数：
+- chain: 依次执行正向、反向、正向无关系、反向无关系查询（最多 4 次往返）
+- union: 单条 UNION ALL 语句（1 次往返）
+
+场景：正向命中、反向命中、带关系完全未命中、无关系完全未命中（会进入学习模式的路径）。
+脚本会写入少量以 "__bench__" 开头的临时知识点，结束后删除。需要可用的 MySQL（见 config/db_config.py）。
+
+运行方式：
+    python -m benchmarks.bench_lookup_roundtrip [--rounds 2000]
+"""
+
+import argparse
+
+from database.db_operation import DBOperation
+from database.mysql_backend import MySQLBackend
+from benchmarks.common import latency_summary, measure
+
+PREFIX = "__bench__"
+
+FIXTURES = [
+    (f"{PREFIX}Python", "创始人", f"{PREFIX}吉多·范罗苏姆"),
+    (f"{PREFIX}北京", "是", f"{PREFIX}中国的首都"),
+]
+
+SCENARIOS = {
+    "forward_hit": (f"{PREFIX}Python", "创始"),
+    "reverse_hit": (f"{PREFIX}中国的首都", "是"),
+    "miss": (f"{PREFIX}不存在的实体", "创始人"),
+    "miss_no_relation": (f"{PREFIX}不存在的实体", ""),
+}
+
+
+def cleanup(db):
+    """删除基准测试写入的临时知识点"""
+    with db.backend.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM knowledge_triple WHERE entity1 LIKE %s", (f"{PREFIX}%",))
+            conn.commit()
+        finally:
+            cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询往返次数基准")
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    dbs = {mode: DBOperation(backend=MySQLBackend(lookup_mode=mode)) for mode in ("chain", "union")}
+    setup = dbs["chain"]
+    for triple in FIXTURES:
+        setup.save_knowledge(*triple)
+
+    try:
+        # 两种方式在每个场景下的答案必须一致
+        for name, (entity1, relation) in SCENARIOS.items():
+            chain_answer = dbs["chain"].backend.query_knowledge(entity1, relation)
+            union_answer = dbs["union"].backend.query_knowledge(entity1, relation)
+            assert chain_answer == union_answer, (name, chain_answer, union_answer)
+
+        print(f"{'场景':<18} {'方式':<6} {'p50(us)':>10} {'p90(us)':>10} {'p99(us)':>10}")
+        for name, params in SCENARIOS.items():
+            for mode, db in dbs.items():
+                samples = measure(db.backend.query_knowledge, [params], args.rounds)
+                summary = latency_summary(samples)
+                print(f"{name:<18} {mode:<6} {summary['p50_us']:>10.1f} "
+                      f"{summary['p90_us']:>10.1f} {summary['p99_us']:>10.1f}")
+    finally:
+        cleanup(setup)
+        for db in dbs.values():
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+问题解析缓存基准
+================
+
+从 --distinct 个不同的合成问题中按 Zipf 分布抽取 --questions 个问题（热门问题反复出现），
+每个问题随机加上近似写法（末尾问号、首尾空格），比较：
+- no_cache: 每次都执行完整的规则抽取
+- cache: ParseCache，规范化后相同的问题直接返回缓存结果
+
+报告解析吞吐量、缓存命中率，并确认两者抽取结果一致（按规范化后的问题比较）。不需要数据库。
+
+运行方式：
+    python -m benchmarks.bench_parse_cache [--distinct 5000] [--questions 100000] [--cache-size 4096]
+"""
+
+import argparse
+import random
+import time
+
+from nlp.parse_cache import ParseCache, normalize_question
+from nlp.triple_extractor import TripleExtractor
+from benchmarks.synthetic import SyntheticKnowledgeGraph
+
+
+def variant(rng, question):
+    """返回问题的一个近似写法"""
+    choice = rng.randrange(3)
+    if choice == 1:
+        return question + rng.choice(["？", "?", " ？", "。"])
+    if choice == 2:
+        return "  " + question + " "
+    return question
+
+
+def main():
+    parser = argparse.ArgumentParser(description="问题解析缓存基准")
+    parser.add_argument('--distinct', type=int, default=5000)
+    parser.add_argument('--questions', type=int, default=100_000)
+    parser.add_argument('--cache-size', type=int, default=4096)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    graph = SyntheticKnowledgeGraph(args.seed)
+    triples = list(graph.triples(args.distinct * 3))
+    distinct = graph.questions(triples, args.distinct)
+    rng = random.Random(args.seed)
+    weights = [1 / (rank + 1) for rank in range(len(distinct))]
+    stream = [variant(rng, question) for question in rng.choices(distinct, weights=weights, k=args.questions)]
+    relations = graph.relations()
+
+    plain = TripleExtractor(db_relations=relations)
+    cache = ParseCache(args.cache_size)
+    cached = TripleExtractor(db_relations=relations, parse_cache=cache)
+
+    print(f"{'方式':<10} {'问题/秒':>10} {'命中率':>8}")
+    start = time.perf_counter()
+    expected = [plain.extract_entity_and_relation(normalize_question(question)) for question in stream]
+    seconds = time.perf_counter() - start
+    print(f"{'no_cache':<10} {len(stream) / seconds:>10.0f} {'-':>8}")
+
+    start = time.perf_counter()
+    results = [cached.extract_entity_and_relation(question) for question in stream]
+    seconds = time.perf_counter() - start
+    print(f"{'cache':<10} {len(stream) / seconds:>10.0f} {cache.stats()['hit_rate']:>8.1%}")
+    agree = sum(1 for a, b in zip(expected, results) if a == b)
+    print(f"抽取结果一致 {agree}/{len(stream)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多跳查询基准
+============
+
+比较两种求解多跳问题（如 "X的创始人的国籍"）的方式：
+- manual: 调用方逐跳调用 query_knowledge，每跳至少一次数据库往返
+- query_paths: DBOperation.query_paths，每一跳把整批路径合并为一次批量查询
+
+用 benchmarks/synthetic.py 生成 --triples 个三元组写入临时 SQLite 文件（不需要 MySQL），
+从中采样真实存在的 --hops 跳路径；通过 sqlite3 的 trace 回调统计实际执行的 SQL 语句数，
+对于 MySQL 等网络数据库，语句数近似于往返次数。
+
+运行方式：
+    python -m benchmarks.bench_path_query [--triples 300000] [--paths 2000] [--hops 2] [--batch 200]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.synthetic import SyntheticKnowledgeGraph
+
+
+def sample_paths(graph, triple_count, size, hops, seed):
+    """从图谱中采样 size 条真实存在的 hops 跳路径 (entity, [relation, ...])"""
+    forward = {}
+    for entity1, relation, entity2 in graph.triples(triple_count):
+        forward.setdefault(entity1, []).append((relation, entity2))
+    rng = random.Random(seed)
+    starts = list(forward)
+    paths = []
+    attempts = 0
+    while len(paths) < size and attempts < size * 200:
+        attempts += 1
+        node = rng.choice(starts)
+        entity, relations = node, []
+        for _ in range(hops):
+            edges = forward.get(node)
+            if not edges:
+                break
+            relation, node = rng.choice(edges)
+            relations.append(relation)
+        if len(relations) == hops:
+            paths.append((entity, relations))
+    return paths
+
+
+class StatementCounter:
+    """统计当前线程 SQLite 连接上执行的 SQL 语句数"""
+
+    def __init__(self, backend):
+        self.count = 0
+        with backend.connection() as conn:
+            conn.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self.count += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多跳查询基准")
+    parser.add_argument('--triples', type=int, default=300_000)
+    parser.add_argument('--paths', type=int, default=2000)
+    parser.add_argument('--hops', type=int, default=2)
+    parser.add_argument('--batch', type=int, default=200, help="query_paths 每次求解的路径数")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    graph = SyntheticKnowledgeGraph(args.seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        db = DBOperation(backend=SQLiteBackend(os.path.join(work_dir, "paths.db")))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.bulk_save_knowledge(graph.triples(args.triples), batch_size=10000)
+            paths = sample_paths(graph, args.triples, args.paths, args.hops, args.seed)
+            print(f"✅ 已导入 {args.triples} 个三元组，采样 {len(paths)} 条 {args.hops} 跳路径")
+            counter = StatementCounter(db.backend)
+
+            counter.count = 0
+            start = time.perf_counter()
+            manual = []
+            for entity, relations in paths:
+                node = entity
+                for relation in relations:
+                    node = db.query_knowledge(node, relation) if node else None
+                manual.append(node)
+            manual_seconds = time.perf_counter() - start
+            manual_statements = counter.count
+
+            counter.count = 0
+            start = time.perf_counter()
+            batched = []
+            for i in range(0, len(paths), args.batch):
+                answers, _ = db.query_paths(paths[i:i + args.batch], max_hops=args.hops, time_budget=0)
+                batched.extend(answers)
+            batched_seconds = time.perf_counter() - start
+            batched_statements = counter.count
+        finally:
+            db.close()
+
+    agree = sum(1 for a, b in zip(manual, batched) if a == b)
+    resolved = sum(1 for answer in batched if answer)
+    print(f"{'方式':<12} {'每条路径(us)':>14} {'每条路径语句数':>14}")
+    print(f"{'manual':<12} {manual_seconds / len(paths) * 1e6:>14.1f} {manual_statements / len(paths):>14.2f}")
+    print(f"{'query_paths':<12} {batched_seconds / len(paths) * 1e6:>14.1f} {batched_statements / len(paths):>14.2f}")
+    print(f"结果一致 {agree}/{len(paths)}，求解成功 {resolved}/{len(paths)}")
+
+
+if __name__ == "__main__":
+    main()
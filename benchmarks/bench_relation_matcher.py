@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关系词匹配微基准
+================
+
+比较两种关系词匹配方式在不同词表规模下的单次提取耗时：
+- linear: 原实现，按长度排序后逐个执行 rel in question / question.find(rel)
+- automaton: RelationMatcher（Aho-Corasick 自动机）一次扫描
+
+运行方式：
+    python -m benchmarks.bench_relation_matcher [--sizes 100 10000 100000] [--rounds 2000]
+"""
+
+import argparse
+import random
+import time
+
+from nlp.relation_matcher import RelationMatcher
+
+# 常用汉字区间，用于生成合成关系词
+CJK_START, CJK_END = 0x4E00, 0x9FA5
+
+QUESTIONS = [
+    "Python的创始人是谁",
+    "人工智能英文缩写",
+    "北京是中国的什么",
+    "中国的首都是什么",
+    "爱因斯坦提出什么？",
+    "这是一个不包含任何已知关系词的很长很长的问题吗",
+]
+
+
+def make_relations(size, seed=42):
+    """生成 size 个长度 2~6 的随机中文关系词，并混入问题中真实出现的关系词"""
+    rng = random.Random(seed)
+    relations = {'创始人', '英文缩写', '是', '首都', '提出'}
+    while len(relations) < size:
+        length = rng.randint(2, 6)
+        relations.add(''.join(chr(rng.randint(CJK_START, CJK_END)) for _ in range(length)))
+    return sorted(relations, key=len, reverse=True)
+
+
+def linear_match(all_relations, question):
+    """原实现：逐个关系词线性匹配，返回 (relation, index) 或 None"""
+    for rel in all_relations:
+        if rel in question:
+            rel_index = question.find(rel)
+            if question[:rel_index].strip():
+                return rel, rel_index
+    return None
+
+
+def automaton_match(matcher, question):
+    """自动机实现：一次扫描后按长度挑选第一个前缀非空的关系词"""
+    for rel, rel_index in matcher.matches_longest_first(question):
+        if question[:rel_index].strip():
+            return rel, rel_index
+    return None
+
+
+def bench(func, arg, rounds):
+    """返回每次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(rounds):
+        func(arg, QUESTIONS[i % len(QUESTIONS)])
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关系词匹配微基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'关系词数':>10} {'编译(ms)':>10} {'linear(us)':>12} {'automaton(us)':>14} {'加速比':>8}")
+    for size in args.sizes:
+        relations = make_relations(size)
+        start = time.perf_counter()
+        matcher = RelationMatcher(relations)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # 两种实现在同一问题集上的结果（关系词长度与前缀）必须一致
+        for question in QUESTIONS:
+            expected = linear_match(relations, question)
+            actual = automaton_match(matcher, question)
+            assert (expected is None) == (actual is None), question
+            if expected:
+                assert len(expected[0]) == len(actual[0]) and expected[1] == actual[1], question
+
+        linear_us = bench(linear_match, relations, args.rounds)
+        automaton_us = bench(automaton_match, matcher, args.rounds)
+        print(f"{size:>10} {build_ms:>10.1f} {linear_us:>12.2f} {automaton_us:>14.2f} {linear_us / automaton_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识快照冷启动基准
+==================
+
+比较两种内存索引的启动耗时和查询延迟：
+- triple_index: TripleIndex 逐行加载全部三元组（启动耗时与行数成正比）
+- snapshot: KnowledgeSnapshot 映射快照文件（启动只读取文件头）
+
+数据为 --rows 条合成三元组，快照写入临时目录，不需要数据库。
+
+运行方式：
+    python -m benchmarks.bench_snapshot_startup [--rows 200000] [--rounds 5000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from database.knowledge_snapshot import KnowledgeSnapshot, write_snapshot
+from database.triple_index import TripleIndex
+from benchmarks.common import latency_summary, measure
+
+
+def make_triples(count):
+    """生成 count 条合成三元组"""
+    return [(f"实体{i}", f"关系{i % 100}", f"答案{i}") for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="知识快照冷启动基准")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--rounds', type=int, default=5000)
+    args = parser.parse_args()
+
+    triples = make_triples(args.rows)
+    rng = random.Random(42)
+    queries = [(f"实体{rng.randrange(args.rows)}", "关系") for _ in range(100)]
+    queries += [(f"答案{rng.randrange(args.rows)}", "") for _ in range(100)]
+    queries += [("不存在的实体", "关系")]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "knowledge.snap")
+        start = time.perf_counter()
+        write_snapshot(iter(triples), path)
+        export_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = TripleIndex()
+        index.load(iter(triples))
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        snapshot = KnowledgeSnapshot(path)
+        snapshot_time = time.perf_counter() - start
+
+        try:
+            for entity1, relation in queries:
+                assert index.lookup(entity1, relation) == snapshot.lookup(entity1, relation), (entity1, relation)
+
+            print(f"数据量 {args.rows} 条，快照 {os.path.getsize(path)} 字节（导出耗时 {export_time:.2f} 秒）")
+            print(f"{'索引':<14} {'启动(ms)':>10} {'p50(us)':>10} {'p90(us)':>10} {'p99(us)':>10}")
+            for name, startup, lookup in (("triple_index", index_time, index.lookup),
+                                          ("snapshot", snapshot_time, snapshot.lookup)):
+                summary = latency_summary(measure(lookup, queries, args.rounds))
+                print(f"{name:<14} {startup * 1000:>10.2f} {summary['p50_us']:>10.1f} "
+                      f"{summary['p90_us']:>10.1f} {summary['p99_us']:>10.1f}")
+        finally:
+            snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
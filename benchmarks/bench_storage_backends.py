@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储后端延迟基准
+================
+
+比较同一批查询在不同存储后端上的单次查询延迟分位数：
+- sqlite: 嵌入式 SQLite（进程内，无网络往返）
+- mysql: MySQL（经连接池，每个回退分支一次网络往返）
+
+两个后端写入相同的合成数据（--rows 条，以 "__bench__" 开头，结束后删除），
+场景：正向命中、反向命中、带关系完全未命中、无关系完全未命中。
+MySQL 不可用时跳过（见 config/db_config.py）。
+
+运行方式：
+    python -m benchmarks.bench_storage_backends [--rows 10000] [--rounds 2000] [--sqlite-path :memory:]
+"""
+
+import argparse
+import os
+import tempfile
+
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.common import latency_summary, measure
+
+PREFIX = "__bench__"
+
+SCENARIOS = {
+    "forward_hit": (f"{PREFIX}实体1", "关系"),
+    "reverse_hit": (f"{PREFIX}答案1", "关系"),
+    "miss": (f"{PREFIX}不存在的实体", "关系"),
+    "miss_no_relation": (f"{PREFIX}不存在的实体", ""),
+}
+
+
+def make_rows(count):
+    """生成 count 条合成三元组，供 save_batch 写入"""
+    return [(i, (f"{PREFIX}实体{i}", f"关系{i % 50}", f"{PREFIX}答案{i}")) for i in range(count)]
+
+
+def cleanup(backend):
+    """删除基准测试写入的临时知识点"""
+    with backend.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(backend._sql("DELETE FROM knowledge_triple WHERE entity1 LIKE %s"), (f"{PREFIX}%",))
+            conn.commit()
+        finally:
+            cursor.close()
+
+
+def open_mysql(lookup_mode):
+    """连接 MySQL 后端，不可用时返回 None"""
+    try:
+        from database.mysql_backend import MySQLBackend
+        backend = MySQLBackend(lookup_mode=lookup_mode)
+        backend.get_all_relations()
+        return backend
+    except Exception as e:
+        print(f"⚠️ MySQL 不可用，跳过: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="存储后端延迟基准")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--lookup-mode', choices=['chain', 'union'], default='chain')
+    parser.add_argument('--sqlite-path', help="SQLite 数据库路径（默认临时文件，可用 :memory:）")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    sqlite_path = args.sqlite_path
+    if not sqlite_path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        sqlite_path = os.path.join(tmp_dir.name, "bench.db")
+
+    backends = {"sqlite": SQLiteBackend(sqlite_path, lookup_mode=args.lookup_mode)}
+    mysql = open_mysql(args.lookup_mode)
+    if mysql is not None:
+        backends["mysql"] = mysql
+
+    rows = make_rows(args.rows)
+    try:
+        for backend in backends.values():
+            backend.save_batch(rows, {}, lambda *error: print(f"❌ 写入失败: {error}"))
+
+        # 各后端在每个场景下的答案必须一致
+        for name, params in SCENARIOS.items():
+            answers = {label: backend.query_knowledge(*params) for label, backend in backends.items()}
+            assert len(set(answers.values())) == 1, (name, answers)
+
+        print(f"数据量 {args.rows} 条，查询方式 {args.lookup_mode}")
+        print(f"{'场景':<18} {'后端':<7} {'p50(us)':>10} {'p90(us)':>10} {'p99(us)':>10}")
+        for name, params in SCENARIOS.items():
+            for label, backend in backends.items():
+                summary = latency_summary(measure(backend.query_knowledge, [params], args.rounds))
+                print(f"{name:<18} {label:<7} {summary['p50_us']:>10.1f} "
+                      f"{summary['p90_us']:>10.1f} {summary['p99_us']:>10.1f}")
+    finally:
+        for backend in backends.values():
+            cleanup(backend)
+            backend.close()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+写后队列基准
+============
+
+--threads 个线程同时调用 DBOperation.save_knowledge 各保存 --per-thread 个三元组（模拟多人同时教学），比较：
+- sync: 每次保存执行 INSERT + commit 后返回
+- write_behind: 写入本地日志并入队后返回，后台线程按 --max-batch / --max-delay 组提交
+
+报告每次保存的延迟分位数、吞吐量、提交次数，以及 flush 等待剩余写入提交的耗时；
+最后确认数据库中的三元组数与保存的数量一致。使用临时 SQLite 文件（不需要 MySQL），
+对于 MySQL，每次提交还包含一次网络往返，组提交的收益更大。
+
+运行方式：
+    python -m benchmarks.bench_write_behind [--threads 8] [--per-thread 500] [--max-batch 200] [--max-delay 0.05]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.common import latency_summary
+from monitoring import METRICS
+
+
+def run(db, threads, per_thread, tag):
+    """多线程保存，返回 (每次保存的耗时列表, 总耗时)"""
+    samples = [[] for _ in range(threads)]
+
+    def worker(index):
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            db.save_knowledge(f"{tag}实体{index}_{i}", "属性", f"{tag}值{index}_{i}")
+            samples[index].append(time.perf_counter() - t0)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return [s for thread_samples in samples for s in thread_samples], time.perf_counter() - start
+
+
+def count_rows(db):
+    with db.backend.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM knowledge_triple").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="写后队列基准")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--per-thread', type=int, default=500)
+    parser.add_argument('--max-batch', type=int, default=200)
+    parser.add_argument('--max-delay', type=float, default=0.05)
+    args = parser.parse_args()
+    total = args.threads * args.per_thread
+
+    print(f"{'模式':<14} {'p50(us)':>10} {'p99(us)':>10} {'吞吐(条/s)':>12} {'提交次数':>8} {'flush(ms)':>10}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for mode in ("sync", "write_behind"):
+            db = DBOperation(backend=SQLiteBackend(os.path.join(work_dir, f"{mode}.db")))
+            try:
+                if mode == "write_behind":
+                    db.enable_write_behind(os.path.join(work_dir, "write_behind.journal"),
+                                           max_batch=args.max_batch, max_delay=args.max_delay)
+                METRICS.reset()
+                samples, seconds = run(db, args.threads, args.per_thread, mode)
+                start = time.perf_counter()
+                db.flush()
+                flush_seconds = time.perf_counter() - start
+                commits = METRICS.snapshot().get("db.commit", {}).get("count", 0)
+                summary = latency_summary(samples)
+                print(f"{mode:<14} {summary['p50_us']:>10.1f} {summary['p99_us']:>10.1f} "
+                      f"{total / (seconds + flush_seconds):>12.0f} {commits:>8} {flush_seconds * 1000:>10.1f}")
+                rows = count_rows(db)
+                assert rows == total, f"{mode}: 数据库中有 {rows} 条，应为 {total} 条"
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# 基准测试公共工具：计时与分位数统计
+import math
+import time
+
+
+def percentile(sorted_samples, pct):
+    """返回已排序样本的 pct 分位数（最近秩法）"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, math.ceil(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def latency_summary(samples):
+    """
+    汇总延迟样本（秒），返回以微秒为单位的 p50/p90/p99/mean
+    :param samples: 每次调用的耗时列表（秒）
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "count": count,
+        "p50_us": percentile(ordered, 50) * 1e6,
+        "p90_us": percentile(ordered, 90) * 1e6,
+        "p99_us": percentile(ordered, 99) * 1e6,
+        "mean_us": (sum(ordered) / count * 1e6) if count else 0.0,
+    }
+
+
+def measure(func, args_list, rounds):
+    """
+    依次循环 args_list 调用 func 共 rounds 次，返回每次调用的耗时列表（秒）
+    """
+    samples = []
+    perf_counter = time.perf_counter
+    for i in range(rounds):
+        args = args_list[i % len(args_list)]
+        start = perf_counter()
+        func(*args)
+        samples.append(perf_counter() - start)
+    return samples
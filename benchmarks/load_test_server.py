@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 服务压测脚本
+================
+
+用多个并发客户端（每个客户端一条 keep-alive 连接）向 server.py 发送问答请求，
+结束后打印客户端侧的吞吐量和延迟分位数，并附上服务端 /stats 的统计。
+
+运行方式（先启动 python server.py）：
+    python -m benchmarks.load_test_server [--url http://127.0.0.1:8000] [--clients 32] [--requests 200]
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+from benchmarks.common import latency_summary
+
+QUESTIONS = [
+    "Python的创始人是谁",
+    "人工智能英文缩写",
+    "北京是中国的什么",
+    "中国的首都是什么",
+    "爱因斯坦提出什么？",
+]
+
+
+def run_client(host, port, requests, batch, samples, errors):
+    """单个客户端：在同一条连接上连续发送请求"""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for i in range(requests):
+        if batch:
+            path, payload = "/answer/batch", {"questions": QUESTIONS}
+        else:
+            path, payload = "/answer", {"question": QUESTIONS[i % len(QUESTIONS)]}
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        samples.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 服务压测")
+    parser.add_argument('--url', default="http://127.0.0.1:8000")
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help="每个客户端的请求数")
+    parser.add_argument('--batch', action='store_true', help="压测 /answer/batch 接口")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    samples, errors = [], []
+    threads = [
+        threading.Thread(target=run_client, args=(url.hostname, url.port or 80, args.requests, args.batch, samples, errors))
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    summary = latency_summary(samples)
+    print(f"请求数 {summary['count']}，错误 {len(errors)}，耗时 {elapsed:.2f} 秒，吞吐 {summary['count'] / elapsed:.0f} 请求/秒")
+    print(f"延迟 p50 {summary['p50_us'] / 1000:.2f} ms, p90 {summary['p90_us'] / 1000:.2f} ms, "
+          f"p99 {summary['p99_us'] / 1000:.2f} ms")
+
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    conn.request("GET", "/stats")
+    print(json.dumps(json.loads(conn.getresponse().read()), ensure_ascii=False, indent=2))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
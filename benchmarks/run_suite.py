@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成规模基准套件
+================
+
+用 benchmarks/synthetic.py 按固定种子生成 10k / 1M / 10M 规模的中文知识图谱，写入本地 SQLite
+（嵌入式存储后端，不需要 MySQL 或其他外部服务），然后测量：
+- load: bulk_save_knowledge 导入速度
+- startup: QAEngine 启动耗时（读取关系词表、构建抽取器）
+- extract: extract_entity_and_relation 吞吐量（问题语料覆盖抽取器支持的句式）
+- query_hit / query_miss: query_knowledge 命中与未命中的延迟分位数（不启用答案缓存）
+- save: save_knowledge 单条保存吞吐量
+
+结果写入 JSON 文件，可用 --compare 与之前的结果对比。
+
+运行方式：
+    python -m benchmarks.run_suite [--scales 10k 1m] [--output bench_results.json]
+    python -m benchmarks.run_suite --scales 10k --compare bench_results.json
+    python -m benchmarks.run_suite --scales 10m --work-dir /data/bench --reuse   # 复用已导入的数据库
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+from core.qa_engine import QAEngine
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+from benchmarks.common import latency_summary, measure
+from benchmarks.synthetic import SyntheticKnowledgeGraph
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def quiet():
+    """屏蔽被测代码的逐条打印，避免终端输出影响计时"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def git_commit():
+    """返回当前 git 提交（不在仓库中时返回None）"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_graph(graph, count, path, sample_size, reuse):
+    """
+    把 count 个三元组导入 path，同时等间隔抽取 sample_size 个样本
+    :return: (样本列表, 导入统计或None（复用已有数据库时）)
+    """
+    samples = []
+    step = max(1, count // sample_size)
+
+    def tapped():
+        for i, triple in enumerate(graph.triples(count)):
+            if i % step == 0 and len(samples) < sample_size:
+                samples.append(triple)
+            yield triple
+
+    if reuse and os.path.exists(path):
+        for _ in tapped():
+            pass
+        return samples, None
+
+    db = DBOperation(backend=SQLiteBackend(path))
+    try:
+        with quiet():
+            stats = db.bulk_save_knowledge(tapped(), batch_size=10000)
+    finally:
+        db.close()
+    return samples, {"rows": stats["saved"], "seconds": stats["elapsed"], "rows_per_sec": stats["rows_per_sec"]}
+
+
+def run_scale(name, count, args, work_dir):
+    """运行一个规模的全部测量，返回结果字典"""
+    graph = SyntheticKnowledgeGraph(args.seed)
+    path = os.path.join(work_dir, f"synthetic_{name}_{args.seed}.db")
+    result = {"triples": count}
+
+    print(f"⏳ [{name}] 生成并导入 {count} 个三元组...")
+    samples, load_stats = load_graph(graph, count, path, args.samples, args.reuse)
+    if load_stats:
+        result["load"] = load_stats
+
+    start = time.perf_counter()
+    with quiet():
+        engine = QAEngine(db_operation=DBOperation(backend=SQLiteBackend(path)))
+    result["startup"] = {"seconds": time.perf_counter() - start,
+                         "relations": len(engine.triple_extractor.relation_matcher)}
+
+    try:
+        print(f"⏳ [{name}] 抽取 / 查询 / 保存...")
+        extractor = engine.triple_extractor
+        questions = graph.questions(samples, args.questions)
+        start = time.perf_counter()
+        for question in questions:
+            extractor.extract_entity_and_relation(question)
+        elapsed = time.perf_counter() - start
+        result["extract"] = {"questions": len(questions), "questions_per_sec": len(questions) / elapsed,
+                             "mean_us": elapsed / len(questions) * 1e6}
+
+        db = engine.db_operation
+        hits = [(entity1, relation) for entity1, relation, _ in samples]
+        misses = [(entity1, hits[i % len(hits)][1]) for i, entity1 in enumerate(graph.missing_entities(len(hits)))]
+        found = sum(1 for key in hits if db.query_knowledge(*key) is not None)
+        result["query_hit"] = dict(latency_summary(measure(db.query_knowledge, hits, args.rounds)),
+                                   hit_rate=found / len(hits))
+        result["query_miss"] = latency_summary(measure(db.query_knowledge, misses, args.rounds))
+
+        new_triples = [(f"{entity1}新", relation, entity2) for entity1, relation, entity2 in samples[:args.saves]]
+        with quiet():
+            start = time.perf_counter()
+            saved = sum(1 for triple in new_triples if db.save_knowledge(*triple))
+            elapsed = time.perf_counter() - start
+        result["save"] = {"rows": saved, "rows_per_sec": saved / elapsed if elapsed else 0.0}
+    finally:
+        with quiet():
+            engine.close()
+        if not args.work_dir:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+    return result
+
+
+def flatten(prefix, value, out):
+    """把嵌套结果展开为 {"10k.query_hit.p50_us": 数值}，便于对比"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flatten(f"{prefix}.{key}" if prefix else key, item, out)
+    elif isinstance(value, (int, float)):
+        out[prefix] = value
+    return out
+
+
+def compare(baseline_path, report):
+    """打印与之前结果相比的变化（百分比）"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = flatten("", json.load(f)["scales"], {})
+    current = flatten("", report["scales"], {})
+    print(f"\n与 {baseline_path} 对比：")
+    print(f"{'指标':<40} {'之前':>14} {'现在':>14} {'变化':>9}")
+    for key in sorted(current.keys() & baseline.keys()):
+        old, new = baseline[key], current[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+        print(f"{key:<40} {old:>14.2f} {new:>14.2f} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成规模基准套件")
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=["10k"])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--samples', type=int, default=1000, help="用于查询和提问的三元组样本数")
+    parser.add_argument('--questions', type=int, default=20000, help="抽取吞吐量测试的问题数")
+    parser.add_argument('--rounds', type=int, default=5000, help="每种查询的计时次数")
+    parser.add_argument('--saves', type=int, default=500, help="单条保存的次数")
+    parser.add_argument('--output', default="bench_results.json", help="结果 JSON 路径")
+    parser.add_argument('--compare', help="之前的结果 JSON，输出对比")
+    parser.add_argument('--work-dir', help="SQLite 数据库目录（默认临时目录，结束后删除）")
+    parser.add_argument('--reuse', action='store_true', help="work-dir 中已有同规模同种子的数据库时跳过导入")
+    args = parser.parse_args()
+
+    report = {
+        "suite": "knowledge_qa_synthetic",
+        "format_version": 1,
+        "seed": args.seed,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "store": "sqlite",
+        "scales": {},
+    }
+    with contextlib.ExitStack() as stack:
+        work_dir = args.work_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(work_dir, exist_ok=True)
+        for name in args.scales:
+            report["scales"][name] = run_scale(name, SCALES[name], args, work_dir)
+            scale = report["scales"][name]
+            print(f"✅ [{name}] 启动 {scale['startup']['seconds']:.2f}s，"
+                  f"抽取 {scale['extract']['questions_per_sec']:.0f} 问/秒，"
+                  f"命中 p50 {scale['query_hit']['p50_us']:.1f}us，"
+                  f"未命中 p50 {scale['query_miss']['p50_us']:.1f}us，"
+                  f"保存 {scale['save']['rows_per_sec']:.0f} 条/秒")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 结果已写入 {args.output}")
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# 合成知识图谱生成器：给定种子生成可复现的中文三元组和问题语料，供基准测试使用
+import math
+import random
+
+# 常用汉字（实体名由其中 3 个字组合而成，去重后使用；不含类别后缀用字，避免人名与其他类别重名）
+NAME_CHARS = ''.join(dict.fromkeys(
+    "安白北宝博长晨成春辰东德方芳飞丰高光广国海航浩和恒红宏华辉慧佳嘉建江金锦京晶静九俊凯康兰蓝乐"
+    "力立丽良林玲龙隆明铭南宁鹏平奇启庆秋瑞润尚胜盛世泰天通伟文武西祥翔新鑫星兴秀旭雪阳耀野毅"
+    "英永宇玉元远云泽长正志智中忠洲舟竹卓子紫湖河川峰岭原州城港湾岛谷溪泉石松梅荷杨柳桂兰菊月"
+))
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏"
+
+# 实体类别后缀：人名不加后缀，其余按类别追加
+CATEGORIES = [
+    ("人物", ""),
+    ("城市", "市"),
+    ("公司", "科技公司"),
+    ("大学", "大学"),
+    ("山川", "山"),
+    ("作品", "传"),
+    ("产品", "系统"),
+]
+
+# 真实感关系词，按实体类别划分；答案类型为 "entity"（另一个实体）或取值生成器名称
+RELATIONS = {
+    "人物": [("国籍", "country"), ("职业", "job"), ("出生地", "entity"), ("代表作品", "entity"),
+             ("毕业院校", "entity"), ("生日", "date"), ("配偶", "entity")],
+    "城市": [("所属国家", "country"), ("人口", "number"), ("面积", "area"), ("市长", "entity"),
+             ("别称", "entity"), ("著名景点", "entity")],
+    "公司": [("创始人", "entity"), ("总部", "entity"), ("成立时间", "date"), ("英文缩写", "abbr"),
+             ("主要产品", "entity"), ("首席执行官", "entity")],
+    "大学": [("校长", "entity"), ("所在城市", "entity"), ("创办时间", "date"), ("英文缩写", "abbr"),
+             ("校训", "entity")],
+    "山川": [("海拔", "height"), ("所在城市", "entity"), ("别称", "entity")],
+    "作品": [("作者", "entity"), ("导演", "entity"), ("主演", "entity"), ("出版时间", "date"),
+             ("朝代", "dynasty")],
+    "产品": [("开发者", "entity"), ("发明人", "entity"), ("发布时间", "date"), ("编程语言", "language")],
+}
+
+COUNTRIES = ["中国", "日本", "美国", "英国", "法国", "德国", "意大利", "加拿大", "澳大利亚", "新加坡"]
+JOBS = ["作家", "导演", "演员", "工程师", "教师", "医生", "科学家", "画家", "歌手", "律师"]
+DYNASTIES = ["秦朝", "汉朝", "唐朝", "宋朝", "元朝", "明朝", "清朝"]
+LANGUAGES = ["Python", "Java", "C++", "Go", "Rust", "JavaScript"]
+
+# 问题模板：覆盖抽取器支持的句式
+QUESTION_TEMPLATES = [
+    "{e1}的{rel}是谁",
+    "{e1}的{rel}是什么",
+    "{e1}{rel}",
+    "{e1}{rel}是什么？",
+    "{e1}是什么",
+    "{e2}是谁",
+]
+
+
+class SyntheticKnowledgeGraph:
+    def __init__(self, seed=42):
+        """
+        :param seed: 随机种子，相同种子生成完全相同的三元组和问题
+        """
+        self.seed = seed
+        base = len(NAME_CHARS)
+        self._space = base ** 3
+        # 与 _space 互素的乘数：把序号打散到整个名字空间，保证不同序号得到不同名字
+        self._multiplier = 2654435761 % self._space
+        while math.gcd(self._multiplier, self._space) != 1:
+            self._multiplier += 1
+
+    def entity(self, index):
+        """返回第 index 个实体的 (名称, 类别)，不同序号的名称互不相同"""
+        category, suffix = CATEGORIES[index % len(CATEGORIES)]
+        code = (index // len(CATEGORIES) * self._multiplier + self.seed) % self._space
+        base = len(NAME_CHARS)
+        chars = NAME_CHARS[code % base] + NAME_CHARS[code // base % base] + NAME_CHARS[code // base // base]
+        if category == "人物":
+            # 人名：姓氏 + 名字，名字需要保持唯一，因此保留全部三个字
+            return SURNAMES[index // len(CATEGORIES) % len(SURNAMES)] + chars, category
+        return chars + suffix, category
+
+    def _value(self, rng, kind, entity_count):
+        if kind == "entity":
+            return self.entity(rng.randrange(entity_count))[0]
+        if kind == "country":
+            return rng.choice(COUNTRIES)
+        if kind == "job":
+            return rng.choice(JOBS)
+        if kind == "date":
+            return f"{rng.randint(1900, 2024)}年{rng.randint(1, 12)}月"
+        if kind == "number":
+            return f"约{rng.randint(10, 3000)}万"
+        if kind == "area":
+            return f"{rng.randint(100, 20000)}平方公里"
+        if kind == "height":
+            return f"{rng.randint(200, 8848)}米"
+        if kind == "abbr":
+            return ''.join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 4)))
+        if kind == "dynasty":
+            return rng.choice(DYNASTIES)
+        return rng.choice(LANGUAGES)
+
+    def triples(self, count):
+        """
+        逐个产出 count 个三元组 (entity1, relation, entity2)，每个实体带 3 个不同关系
+        :param count: 三元组数量
+        """
+        rng = random.Random(self.seed)
+        entity_count = max(1, -(-count // 3))
+        for index in range(entity_count):
+            name, category = self.entity(index)
+            relations = RELATIONS[category]
+            for relation, kind in rng.sample(relations, min(3, len(relations))):
+                if count <= 0:
+                    return
+                count -= 1
+                yield name, relation, self._value(rng, kind, entity_count)
+
+    def relations(self):
+        """返回全部关系词"""
+        return sorted({relation for relations in RELATIONS.values() for relation, _ in relations})
+
+    def missing_entities(self, size):
+        """返回 size 个不在图谱中的实体名（带图谱中不会出现的后缀）"""
+        return [self.entity(i)[0] + "未知" for i in range(size)]
+
+    def questions(self, triples, size):
+        """
+        基于给定三元组生成 size 个问题，句式覆盖抽取器支持的格式
+        :param triples: 三元组样本
+        :return: 问题列表
+        """
+        rng = random.Random(self.seed + 1)
+        questions = []
+        for _ in range(size):
+            e1, rel, e2 = rng.choice(triples)
+            questions.append(rng.choice(QUESTION_TEMPLATES).format(e1=e1, rel=rel, e2=e2))
+        return questions
+
@@ -11,6 +11,9 @@
 主要组件：
     DB_CONFIG: 数据库连接配置字典
     DB_INIT_SQL: 数据库初始化SQL脚本
+    SQLITE_INIT_SQL: 嵌入式 SQLite 后端的表结构
+    SCHEMA_VERSION_SQL: 表结构迁移记录表
+    SYSTEM_CONFIG: 系统运行配置字典（内存索引等可选功能开关）
     
 使用示例：
     from config.db_config import DB_CONFIG
@@ -22,9 +25,11 @@
 版本: 1.0.0
 """
 
-from .db_config import DB_CONFIG, DB_INIT_SQL
+from .db_config import DB_CONFIG, DB_INIT_SQL, SQLITE_INIT_SQL, SCHEMA_VERSION_SQL
+from .system_config import SYSTEM_CONFIG
+from monitoring import get_logger
 
 # 定义模块的公共API
-__all__ = ['DB_CONFIG', 'DB_INIT_SQL']
+__all__ = ['DB_CONFIG', 'DB_INIT_SQL', 'SQLITE_INIT_SQL', 'SCHEMA_VERSION_SQL', 'SYSTEM_CONFIG']
 
-print("✅ Config 模块初始化完成 - 配置管理器已就绪")
\ No newline at end of file
+get_logger("config").debug("Config 模块初始化完成 - 配置管理器已就绪")
\ No newline at end of file
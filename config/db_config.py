@@ -30,4 +30,59 @@ CREATE TABLE IF NOT EXISTS knowledge_triple (
     INDEX idx_entity2 (entity2),
     UNIQUE KEY uk_triple (entity1, relation, entity2)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='知识三元组表';
-"""
\ No newline at end of file
+
+CREATE TABLE IF NOT EXISTS relation_alias (
+    alias VARCHAR(255) NOT NULL PRIMARY KEY COMMENT '关系别名（规范关系自身也登记为别名）',
+    canonical VARCHAR(255) NOT NULL COMMENT '规范关系',
+    create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    INDEX idx_canonical (canonical)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='关系别名表';
+"""
+
+# 表结构迁移记录：每个已执行的迁移版本一行（database/init_database.py 按版本执行迁移）
+SCHEMA_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT NOT NULL PRIMARY KEY COMMENT '迁移版本',
+    description VARCHAR(255) NOT NULL COMMENT '迁移说明',
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '执行时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='表结构迁移记录'
+"""
+
+# 关系别名迁移（登记别名并把以别名保存的已有三元组改写为规范关系）完成后记录的版本。
+# 只有记录了该版本的数据库才启用关系规范化：否则查询时关系被改写为规范关系（创办人 → 创始人），
+# 以别名保存、尚未改写的旧数据就查不到了。relation_alias 表存在（哪怕为空）并不代表已经改写
+RELATION_ALIAS_SCHEMA_VERSION = 4
+RELATION_ALIAS_SCHEMA_DESCRIPTION = "登记关系别名并把已有三元组改写为规范关系"
+
+# 嵌入式 SQLite 后端的表结构（与 DB_INIT_SQL 迁移到最新版本后相同的表和索引）
+# NOCASE 对应 MySQL utf8mb4_unicode_ci 的大小写不敏感比较，等值查询和唯一约束都使用同一排序规则
+SQLITE_INIT_SQL = """
+CREATE TABLE IF NOT EXISTS knowledge_triple (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity1 VARCHAR(255) NOT NULL COLLATE NOCASE,
+    relation VARCHAR(255) NOT NULL COLLATE NOCASE,
+    entity2 VARCHAR(255) NOT NULL COLLATE NOCASE,
+    create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uk_triple UNIQUE (entity1, relation, entity2)
+);
+CREATE INDEX IF NOT EXISTS idx_relation ON knowledge_triple (relation);
+-- 覆盖索引（与 database/init_database.py 的 MySQL 迁移一致）：正向查询由 uk_triple 覆盖，反向查询走 idx_reverse，
+-- 单列索引 idx_entity1 / idx_entity2 是它们的最左前缀，已有数据库文件中的直接删除
+CREATE INDEX IF NOT EXISTS idx_reverse ON knowledge_triple (entity2, relation, entity1);
+DROP INDEX IF EXISTS idx_entity1;
+DROP INDEX IF EXISTS idx_entity2;
+
+CREATE TABLE IF NOT EXISTS relation_alias (
+    alias VARCHAR(255) NOT NULL PRIMARY KEY COLLATE NOCASE,
+    canonical VARCHAR(255) NOT NULL COLLATE NOCASE,
+    create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_canonical ON relation_alias (canonical);
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER NOT NULL PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
@@ -0,0 +1,112 @@
+# 系统运行配置（性能相关的可选功能，根据部署规模调整）
+SYSTEM_CONFIG = {
+    # 存储后端："mysql" 使用 DB_CONFIG 连接 MySQL；"sqlite" 使用嵌入式 SQLite 文件（进程内查询，无网络往返）
+    "storage_backend": "mysql",
+    "sqlite_path": "knowledge_graph.db",  # ":memory:" 表示进程内临时数据库
+    "sqlite_cached_statements": 256,  # 每个连接缓存的预编译语句数
+
+    # 数据库连接池：连接数取 DB_CONFIG["pool_size"]，连接耗尽时最长等待时间（秒）
+    "db_pool_max_wait": 10,
+    # 借出空闲超过该时间（秒）的连接前先检查连接是否存活（一次往返），已断开的连接丢弃并重新创建；
+    # 刚归还的连接跳过检查，避免每次借出都多一次往返
+    "db_pool_check_idle": 0.5,
+    # 异步引擎（AsyncQAEngine）的 aiomysql 连接池最大连接数
+    "async_pool_size": 20,
+    # 数据库查询方式："chain" 依次执行最多四条回退查询；"union" 合并为一条 UNION ALL，只需一次往返
+    "db_lookup_mode": "chain",
+    # 批量问答时每条 IN 查询包含的实体数
+    "batch_query_chunk": 500,
+    # 关系匹配方式："like" 使用 relation LIKE '%关系%'（无法使用 idx_relation）；
+    # "exact" 对已知关系（含别名）使用 relation = 规范关系 的等值匹配，需先运行 python -m database.migrate_relations
+    "relation_match": "like",
+    # 关系别名 → 规范关系，保存和查询时统一使用规范关系
+    "relation_aliases": {
+        "创办人": "创始人",
+        "创立者": "创始人",
+        "创建者": "创始人",
+        "开发人": "开发者",
+        "发明者": "发明人",
+        "首府": "首都",
+    },
+
+    # 内存三元组索引：启动时全量加载 knowledge_triple，查询直接走内存字典
+    "use_triple_index": False,
+    "triple_index_load_batch": 10000,  # 加载索引时每批拉取的行数
+    # 内存索引结构："dict" 为字符串字典（加载快）；"compact" 为字符串驻留 + CSR 类型化数组，
+    # 每个三元组约 40 字节，内存约为 dict 的几分之一，适合千万级三元组（见 benchmarks/bench_compact_index.py）
+    "triple_index_type": "dict",
+
+    # 知识快照：python -m database.export_snapshot export 导出的文件路径，为空时不使用
+    # 启动时 mmap 映射快照作为内存索引（优先于 use_triple_index），启动耗时与知识点数量无关
+    "snapshot_path": "",
+
+    # 相似实体回退：启动时为全部实体构建删除邻域索引，问题中的实体未知时（错别字、全角、空格）
+    # 用编辑距离不超过 fuzzy_max_distance 的已知实体重新查询，避免进入学习模式产生重复知识
+    "use_fuzzy_entity_index": False,
+    "fuzzy_max_distance": 1,  # 每个长度为 L 的实体登记约 L^k 个删除串，建议保持 1
+    "fuzzy_max_candidates": 3,  # 最多尝试的相似实体数
+
+    # 实体过滤器：启动时为全部实体构建布隆过滤器，问题中的实体一定不存在时不访问数据库
+    # 位数组大小按容量和误判率计算（100 万实体、1% 约 1.2 MB），实体数超过容量后误判率上升，需调大容量
+    "use_entity_filter": False,
+    "entity_filter_capacity": 1_000_000,
+    "entity_filter_fpr": 0.01,
+    # 过滤器文件路径，为空时每次启动都从数据库重建；文件存在时加载并只补充之后新增的三元组
+    "entity_filter_path": "",
+    # 过滤器假设本进程是主要写入者：其他进程新增的实体通过按 id 增量补读发现。过滤器判定不存在时，
+    # 距上次补读超过该间隔（秒）则补读一次再判断（0 表示不补读）；补读从已读到的最大 id 回看 id_margin 个 id，
+    # 覆盖 id 较小但提交较晚的事务
+    "entity_filter_refresh_interval": 1.0,
+    "entity_filter_id_margin": 1000,
+
+    # 写后模式：学习的知识写入本地日志并入队后立即返回，后台线程合并为多行事务提交（组提交）
+    # 入队的知识对本进程的查询立即可见；进程崩溃后日志中未提交的写入在下次启动时重放
+    "write_behind": False,
+    # 日志路径：为空时在项目根目录下按数据库位置派生（write_behind-<后端>-<摘要>.journal）；
+    # 运行期间对日志加排他锁，同一日志只能由一个进程使用，其他进程启用写后模式失败时继续同步保存
+    "write_behind_journal": "",
+    "write_behind_max_batch": 200,  # 每个事务最多包含的三元组数
+    "write_behind_max_delay": 0.05,  # 第一条入队后最多等待的秒数
+    "write_behind_max_queue": 10000,  # 队列上限，队列满时保存操作等待（背压）
+    "write_behind_fsync": False,  # 每条日志 fsync（断电不丢失，但每次保存多一次磁盘同步）
+    "write_behind_close_timeout": 30,  # 关闭时等待剩余写入提交的最长秒数，超时的写入留在日志中
+
+    # 已知实体识别：启动时把全部实体构建为字符字典树，解析问题时最长匹配到的已知实体优先于规则切分
+    # 短于 entity_recognizer_min_length 的实体不参与识别（单字实体容易误匹配问题中的普通字）
+    "use_entity_recognizer": False,
+    "entity_recognizer_min_length": 2,
+
+    # 问题解析缓存：按规范化后的问题文本（首尾空白、末尾问号）缓存实体/关系抽取结果，
+    # 关系词表或已知实体变化时整体失效；0 表示不启用
+    "parse_cache_size": 4096,
+
+    # 多跳问题（"Python的创始人的国籍是什么"）：关系链最多跳数，以及单次查询的时间预算（秒，0 表示不限制）
+    "path_query_max_hops": 4,
+    "path_query_time_budget": 0.5,
+
+    # 答案缓存：按 (entity1, relation) 缓存查询结果（含"无答案"），本进程学习新知识时自动失效。
+    # 其他进程写入的知识（bulk_import、extract_corpus、另一个 GUI 或服务进程）不会使本进程的缓存失效，
+    # 在条目过期前查不到，因此默认关闭；多进程共用一个数据库时应保持较短的 negative_ttl
+    "use_answer_cache": False,
+    "answer_cache_size": 1024,  # 最多缓存的键数量（LRU 淘汰）
+    "answer_cache_ttl": 300,  # 正结果有效期（秒），0 表示永不过期
+    "answer_cache_negative_ttl": 5,  # "无答案"结果有效期（秒），0 表示不缓存"无答案"
+
+    # 日志与监控：日志级别（DEBUG/INFO/WARNING/ERROR）和格式（"text" 为 key=value，"json" 每行一个对象）
+    "log_level": "WARNING",
+    "log_format": "text",
+    # 分阶段耗时直方图（抽取、查询各分支、连接借出、提交、请求总耗时），通过 QAEngine.stats() 查看
+    "metrics_enabled": True,
+    # 启动时开启 tracemalloc（有运行开销，仅排查内存问题时使用），QAEngine.dump_memory_report() 输出报告
+    "tracemalloc": False,
+
+    # HTTP 服务（server.py）：监听地址、同时处理的请求数、连接空闲超时（秒）、同时保持的连接数上限、
+    # 请求体大小上限（字节，超过时返回 413）
+    # 空闲超时只限制单次套接字读取（慢客户端、空闲的 keep-alive 连接），不限制请求处理耗时
+    "server_host": "127.0.0.1",
+    "server_port": 8000,
+    "server_workers": 16,
+    "server_idle_timeout": 30,
+    "server_max_connections": 1024,
+    "server_max_body_bytes": 1024 * 1024,
+}
@@ -5,21 +5,27 @@
 本模块包含智能问答系统的核心功能组件：
 
 - QAEngine: 问答引擎主类，整合各模块功能
-  - 处理用户问题查询
+  - 处理用户问题查询（包括沿关系链逐跳求解的多跳问题）
   - 管理知识学习流程
   - 协调数据库和NLP模块
 
+- AsyncQAEngine: asyncio 版本的问答引擎
+  - 基于异步数据库连接池，单个事件循环可同时处理大量问题
+
 主要类和函数：
     QAEngine: 问答引擎类，提供问答和学习功能
+    AsyncQAEngine: 异步问答引擎类，提供 async 问答和学习接口
 """
 
 from .qa_engine import QAEngine
+from .async_qa_engine import AsyncQAEngine
+from monitoring import get_logger
 
 # 定义模块的公共API
-__all__ = ['QAEngine']
+__all__ = ['QAEngine', 'AsyncQAEngine']
 
 # 版本信息
 __version__ = '1.0.0'
 __author__ = 'Knowledge QA System'
 
-print("✅ Core 模块初始化完成 - 问答引擎已就绪")
\ No newline at end of file
+get_logger("core").debug("Core 模块初始化完成 - 问答引擎已就绪")
\ No newline at end of file
@@ -0,0 +1,152 @@
+# 异步问答引擎：asyncio 版本的 QAEngine，一个事件循环即可同时处理大量问题，无需每个问题一个线程
+from database.async_db_operation import AsyncDBOperation, unsupported_async_config
+from database.answer_cache import AnswerCache
+from core.qa_engine import QAEngine
+from nlp.triple_extractor import TripleExtractor
+from nlp.parse_cache import ParseCache
+from config.system_config import SYSTEM_CONFIG
+from monitoring import METRICS
+
+
+class AsyncQAEngine:
+    def __init__(self, db_operation=None):
+        """
+        构造后需调用 await engine.start()（或使用 await AsyncQAEngine.create()）完成初始化
+        不支持知识快照、内存三元组索引和已知实体识别器：配置启用了这些功能时抛出 ValueError（请使用 QAEngine）
+        :param db_operation: 可选的 AsyncDBOperation（例如注入替身连接池），默认按配置创建
+        """
+        unsupported = unsupported_async_config(("snapshot_path", "use_triple_index", "use_entity_recognizer"))
+        if unsupported:
+            raise ValueError(f"异步问答引擎不支持以下配置: {', '.join(unsupported)}（请使用 QAEngine）")
+        if db_operation is None:
+            answer_cache = None
+            if SYSTEM_CONFIG.get("use_answer_cache"):
+                answer_cache = AnswerCache(
+                    max_size=SYSTEM_CONFIG.get("answer_cache_size", 1024),
+                    ttl=SYSTEM_CONFIG.get("answer_cache_ttl", 300),
+                    negative_ttl=SYSTEM_CONFIG.get("answer_cache_negative_ttl", 5),
+                )
+            db_operation = AsyncDBOperation(answer_cache=answer_cache)
+        self.db_operation = db_operation
+        self.triple_extractor = None
+
+    @classmethod
+    async def create(cls, db_operation=None):
+        """创建并初始化异步问答引擎"""
+        engine = cls(db_operation)
+        await engine.start()
+        return engine
+
+    async def start(self):
+        """连接数据库并加载关系词表（与 QAEngine.__init__ 的初始化步骤一致）"""
+        await self.db_operation.connect()
+        if await self.db_operation.load_relation_aliases():
+            relation_aliases = self.db_operation.relation_normalizer.aliases()
+        else:
+            relation_aliases = []
+        db_relations = await self.db_operation.get_all_relations()
+        # 可选：构建相似实体索引，问题中的实体有错别字时仍能找到答案
+        if SYSTEM_CONFIG.get("use_fuzzy_entity_index"):
+            await self.db_operation.load_entity_index(batch_size=SYSTEM_CONFIG.get("triple_index_load_batch", 10000))
+        parse_cache_size = SYSTEM_CONFIG.get("parse_cache_size", 4096)
+        self.triple_extractor = TripleExtractor(db_relations=db_relations + relation_aliases,
+                                                parse_cache=ParseCache(parse_cache_size) if parse_cache_size else None)
+        self.db_operation.save_listeners.append(self._on_knowledge_saved)
+
+    def _on_knowledge_saved(self, entity1, relation, entity2):
+        """保存成功回调：新关系词加入抽取器词表"""
+        self.triple_extractor.add_relation(relation)
+
+    async def answer_question(self, question, silent=False):
+        """
+        处理用户问题，步骤和返回值同 QAEngine.answer_question（多跳问题、单跳查询、相似实体回退）
+        :return: (answer, status_message)
+        """
+        with METRICS.timer("request.answer"):
+            # 实体/关系抽取是纯内存计算，直接在事件循环中执行
+            with METRICS.timer("extract"):
+                chain = self.triple_extractor.extract_relation_chain(question)
+            if chain:
+                result = await self._answer_path(chain)
+                if result:
+                    if result[1] and not silent:
+                        print(result[1])
+                    return result
+
+            with METRICS.timer("extract"):
+                entity1, relation = self.triple_extractor.extract_entity_and_relation(question)
+            if not entity1:
+                msg = "无法识别问题中的核心实体，请换种方式提问～"
+                if not silent:
+                    print(msg)
+                return None, msg
+
+            answer = await self.db_operation.query_knowledge(entity1, relation)
+            if answer:
+                return answer, None
+
+            # 未命中时尝试拼写相近的已知实体，再决定是否进入学习模式
+            similar, answer = await self.db_operation.query_similar(entity1, relation)
+            if answer:
+                return answer, QAEngine._similar_message(similar)
+            return None, None
+
+    async def _answer_path(self, chain):
+        """
+        求解一个多跳问题，提示消息同 QAEngine._answer_paths
+        :param chain: (entity, [relation, ...])
+        :return: (answer, status_message)；查无结果时为None，由调用方按单跳问题继续处理
+        """
+        max_hops = SYSTEM_CONFIG.get("path_query_max_hops", 4)
+        answers, stats = await self.db_operation.query_paths([chain], max_hops=max_hops)
+        relations = chain[1]
+        if answers[0]:
+            return answers[0], None
+        if len(relations) > max_hops:
+            return None, f"问题包含 {len(relations)} 层关系，最多支持 {max_hops} 层，请拆开提问～"
+        if stats["timed_out"]:
+            return None, "多跳查询超时，请稍后重试～"
+        return None
+
+    async def learn_knowledge(self, question, user_answer, silent=True, input_callback=None):
+        """
+        学习新知识点并保存到数据库，返回值同 QAEngine.learn_knowledge
+        默认静默模式：非静默模式下抽取失败会调用阻塞的 input()，不适合在事件循环中使用
+        :return: (success, message)
+        """
+        if not user_answer.strip():
+            msg = "答案不能为空，本次学习取消～"
+            if not silent:
+                print(msg)
+            return False, msg
+
+        entity1, relation, entity2 = self.triple_extractor.extract_triple(
+            question, user_answer, silent=silent, input_callback=input_callback
+        )
+
+        with METRICS.timer("request.learn"):
+            success = await self.db_operation.save_knowledge(entity1, relation, entity2)
+        if success:
+            msg = f"学习成功！下次再问'{question}'我就知道啦～"
+            if not silent:
+                print(msg)
+            return True, msg
+        else:
+            msg = "学习失败，请重试～"
+            if not silent:
+                print(msg)
+            return False, msg
+
+    def stats(self):
+        """返回运行统计：各阶段耗时、答案缓存和问题解析缓存（各阶段名称同 QAEngine.stats）"""
+        answer_cache = self.db_operation.answer_cache
+        parse_cache = self.triple_extractor.parse_cache if self.triple_extractor is not None else None
+        return {
+            "timings": METRICS.snapshot(),
+            "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+            "parse_cache": parse_cache.stats() if parse_cache is not None else None,
+        }
+
+    async def close(self):
+        """关闭资源（数据库连接池）"""
+        await self.db_operation.close()
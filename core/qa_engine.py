@@ -1,13 +1,87 @@
 # 核心问答引擎：整合各模块，实现问答主逻辑（查询→无答案→学习→保存）
+import logging
+
 from database.db_operation import DBOperation
+from database.answer_cache import AnswerCache
 from nlp.triple_extractor import TripleExtractor
+from nlp.entity_recognizer import EntityRecognizer
+from nlp.parse_cache import ParseCache
+from config.system_config import SYSTEM_CONFIG
+from monitoring import METRICS, get_logger, log_event, memory_report, dump_memory_report, start_memory_tracing
+
+logger = get_logger("core.engine")
 
 class QAEngine:
-    def __init__(self):
-        self.db_operation = DBOperation()
-        # 从数据库获取关系词列表，提高实体识别准确性
-        db_relations = self.db_operation.get_all_relations()
-        self.triple_extractor = TripleExtractor(db_relations=db_relations)
+    def __init__(self, db_operation=None):
+        """
+        :param db_operation: 可选的 DBOperation（例如使用 SQLite 后端），默认按配置创建
+        """
+        METRICS.enabled = SYSTEM_CONFIG.get("metrics_enabled", True)
+        if SYSTEM_CONFIG.get("tracemalloc"):
+            start_memory_tracing()
+        if db_operation is None:
+            answer_cache = None
+            if SYSTEM_CONFIG.get("use_answer_cache"):
+                answer_cache = AnswerCache(
+                    max_size=SYSTEM_CONFIG.get("answer_cache_size", 1024),
+                    ttl=SYSTEM_CONFIG.get("answer_cache_ttl", 300),
+                    negative_ttl=SYSTEM_CONFIG.get("answer_cache_negative_ttl", 5),
+                )
+            db_operation = DBOperation(answer_cache=answer_cache)
+        self.db_operation = db_operation
+        # 加载关系别名映射（relation_alias 表不存在时保持原有匹配行为）
+        if self.db_operation.load_relation_aliases():
+            relation_aliases = self.db_operation.relation_normalizer.aliases()
+        else:
+            relation_aliases = []
+        # 可选：启动时映射知识快照或加载内存三元组索引，之后的查询不再访问数据库
+        snapshot_path = SYSTEM_CONFIG.get("snapshot_path")
+        if snapshot_path and self.db_operation.load_snapshot(snapshot_path):
+            db_relations = self.db_operation.triple_index.relations()
+        elif SYSTEM_CONFIG.get("use_triple_index") and self.db_operation.load_triple_index(
+                batch_size=SYSTEM_CONFIG.get("triple_index_load_batch", 10000)):
+            db_relations = self.db_operation.triple_index.relations()
+        else:
+            # 从数据库获取关系词列表，提高实体识别准确性
+            db_relations = self.db_operation.get_all_relations()
+        # 可选：构建相似实体索引，问题中的实体有错别字时仍能找到答案
+        if SYSTEM_CONFIG.get("use_fuzzy_entity_index"):
+            self.db_operation.load_entity_index(batch_size=SYSTEM_CONFIG.get("triple_index_load_batch", 10000))
+        # 可选：加载实体过滤器，未知实体的查询不访问数据库
+        if SYSTEM_CONFIG.get("use_entity_filter"):
+            self.db_operation.load_entity_filter(batch_size=SYSTEM_CONFIG.get("triple_index_load_batch", 10000))
+        # 可选：写后模式，学习知识时不等待数据库提交
+        if SYSTEM_CONFIG.get("write_behind"):
+            self.db_operation.enable_write_behind()
+        # 可选：已知实体识别器，从数据库流式构建字符字典树
+        entity_recognizer = None
+        if SYSTEM_CONFIG.get("use_entity_recognizer"):
+            entity_recognizer = self._load_entity_recognizer()
+        # 别名也加入抽取器词表，"创办人"这样的问法同样能被识别为关系
+        parse_cache_size = SYSTEM_CONFIG.get("parse_cache_size", 4096)
+        self.triple_extractor = TripleExtractor(db_relations=db_relations + relation_aliases,
+                                                entity_recognizer=entity_recognizer,
+                                                parse_cache=ParseCache(parse_cache_size) if parse_cache_size else None)
+        # 新保存的关系词立即加入抽取器词表（包括 GUI/服务直接调用 save_knowledge 的情况）
+        self.db_operation.save_listeners.append(self._on_knowledge_saved)
+
+    def _load_entity_recognizer(self):
+        """从数据库流式读取全部实体构建已知实体识别器，失败时返回None（只使用规则解析）"""
+        recognizer = EntityRecognizer(min_length=SYSTEM_CONFIG.get("entity_recognizer_min_length", 2))
+        try:
+            recognizer.load(self.db_operation.iter_entities(
+                batch_size=SYSTEM_CONFIG.get("triple_index_load_batch", 10000)))
+        except self.db_operation.backend.Error as e:
+            log_event(logger, logging.ERROR, "构建实体识别器失败", error=e)
+            return None
+        log_event(logger, logging.INFO, "实体识别器构建完成", **recognizer.stats())
+        return recognizer
+
+    def _on_knowledge_saved(self, entity1, relation, entity2):
+        """保存成功回调：新关系词加入抽取器词表，新实体加入实体识别器"""
+        self.triple_extractor.add_relation(relation)
+        self.triple_extractor.add_entity(entity1)
+        self.triple_extractor.add_entity(entity2)
 
     def answer_question(self, question, silent=False):
         """
@@ -18,19 +92,99 @@ class QAEngine:
                 - answer: 存在答案返回字符串，无答案返回None（触发学习流程）
                 - status_message: 状态消息（如"无法识别实体"等）
         """
-        # 1. 提取问题中的实体和关系
-        entity1, relation = self.triple_extractor.extract_entity_and_relation(question)
-        if not entity1:
-            msg = "无法识别问题中的核心实体，请换种方式提问～"
-            if not silent:
-                print(msg)
-            return None, msg
+        with METRICS.timer("request.answer"):
+            # 0. 多跳问题（"Python的创始人的国籍是什么"）沿关系链逐跳查询；无结果时仍按单跳问题处理
+            with METRICS.timer("extract"):
+                chain = self.triple_extractor.extract_relation_chain(question)
+            if chain:
+                result = self._answer_paths([chain])[0]
+                if result:
+                    if result[1] and not silent:
+                        print(result[1])
+                    return result
+
+            # 1. 提取问题中的实体和关系
+            with METRICS.timer("extract"):
+                entity1, relation = self.triple_extractor.extract_entity_and_relation(question)
+            if not entity1:
+                msg = "无法识别问题中的核心实体，请换种方式提问～"
+                if not silent:
+                    print(msg)
+                return None, msg
+
+            # 2. 查询数据库
+            answer = self.db_operation.query_knowledge(entity1, relation)
+            if answer:
+                return answer, None
 
-        # 2. 查询数据库
-        answer = self.db_operation.query_knowledge(entity1, relation)
-        if answer:
-            return answer, None
-        return None, None
+            # 3. 未命中时尝试拼写相近的已知实体，再决定是否进入学习模式
+            similar, answer = self.db_operation.query_similar(entity1, relation)
+            if answer:
+                return answer, self._similar_message(similar)
+            return None, None
+
+    def _answer_paths(self, chains):
+        """
+        批量求解多跳问题，每一跳对全部问题只做一次批量查询
+        :param chains: [(entity, [relation, ...]), ...]
+        :return: 与 chains 顺序一致的 (answer, status_message)；查无结果时为None，由调用方按单跳问题继续处理
+        """
+        max_hops = SYSTEM_CONFIG.get("path_query_max_hops", 4)
+        answers, stats = self.db_operation.query_paths(chains, max_hops=max_hops)
+        results = []
+        for (entity, relations), answer in zip(chains, answers):
+            if answer:
+                results.append((answer, None))
+            elif len(relations) > max_hops:
+                results.append((None, f"问题包含 {len(relations)} 层关系，最多支持 {max_hops} 层，请拆开提问～"))
+            elif stats["timed_out"]:
+                results.append((None, "多跳查询超时，请稍后重试～"))
+            else:
+                results.append(None)
+        return results
+
+    @staticmethod
+    def _similar_message(similar):
+        """按相似实体回答时的提示消息"""
+        return f"（没有找到完全匹配的内容，已按相近的“{similar}”回答）"
+
+    def answer_questions(self, questions):
+        """
+        批量回答问题（静默模式），用于离线评测等大批量场景
+        先对整批问题做实体/关系抽取，去重后的 (entity1, relation) 通过少量集合查询一次性求解；
+        多跳问题每一跳对整批问题只做一次批量查询
+        :param questions: 可迭代的问题
+        :return: [(answer, status_message), ...]，与输入顺序一致，每项与 answer_question(q, silent=True) 相同
+        """
+        with METRICS.timer("request.answer_batch"):
+            questions = list(questions)
+            results = [None] * len(questions)
+
+            # 多跳问题一起逐跳求解，查无结果的再和其他问题一起按单跳处理
+            chains = [self.triple_extractor.extract_relation_chain(q) for q in questions]
+            path_indexes = [i for i, chain in enumerate(chains) if chain]
+            if path_indexes:
+                for i, result in zip(path_indexes, self._answer_paths([chains[i] for i in path_indexes])):
+                    results[i] = result
+
+            pending = [i for i, result in enumerate(results) if result is None]
+            extracted = {i: self.triple_extractor.extract_entity_and_relation(questions[i]) for i in pending}
+            keys = {(entity1, relation) for entity1, relation in extracted.values() if entity1}
+            answers = self.db_operation.query_knowledge_batch(keys)
+
+            for i, (entity1, relation) in extracted.items():
+                if not entity1:
+                    results[i] = (None, "无法识别问题中的核心实体，请换种方式提问～")
+                    continue
+                answer = answers.get((entity1, relation))
+                if not answer:
+                    # 未命中的键逐个尝试相似实体（未启用相似实体索引时直接返回）
+                    similar, answer = self.db_operation.query_similar(entity1, relation)
+                    if answer:
+                        results[i] = (answer, self._similar_message(similar))
+                        continue
+                results[i] = (answer or None, None)
+            return results
 
     def learn_knowledge(self, question, user_answer, silent=False, input_callback=None):
         """
@@ -50,8 +204,9 @@ class QAEngine:
         # 1. 提取三元组（需要处理手动输入的情况）
         entity1, relation, entity2 = self.triple_extractor.extract_triple(question, user_answer, silent=silent, input_callback=input_callback)
 
-        # 2. 保存到数据库
-        success = self.db_operation.save_knowledge(entity1, relation, entity2)
+        # 2. 保存到数据库（手动输入的等待时间不计入学习耗时）
+        with METRICS.timer("request.learn"):
+            success = self.db_operation.save_knowledge(entity1, relation, entity2)
         if success:
             msg = f"学习成功！下次再问'{question}'我就知道啦～"
             if not silent:
@@ -63,6 +218,46 @@ class QAEngine:
                 print(msg)
             return False, msg
 
+    def stats(self, memory=False):
+        """
+        返回运行统计
+        :param memory: 为True时附带 tracemalloc 内存报告（未开启跟踪时为None）
+        :return: {"timings": 各阶段耗时快照, "answer_cache": ..., "storage": ..., "relations": 抽取器词表大小,
+                  "entity_filter": 实体过滤器的内存占用和误判率（未启用时为None）,
+                  "write_behind": 写后队列的排队数和提交批次（未启用时为None）,
+                  "entity_recognizer": 实体识别器的实体数、内存和构建耗时（未启用时为None）,
+                  "parse_cache": 问题解析缓存的命中率（未启用时为None）}
+        """
+        answer_cache = self.db_operation.answer_cache
+        entity_filter = self.db_operation.entity_filter
+        write_behind = self.db_operation.write_behind
+        entity_recognizer = self.triple_extractor.entity_recognizer
+        parse_cache = self.triple_extractor.parse_cache
+        stats = {
+            "timings": METRICS.snapshot(),
+            "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+            "storage": self.db_operation.backend.stats(),
+            "relations": len(self.triple_extractor.relation_matcher),
+            "entity_filter": entity_filter.stats() if entity_filter is not None else None,
+            "write_behind": write_behind.stats() if write_behind is not None else None,
+            "entity_recognizer": entity_recognizer.stats() if entity_recognizer is not None else None,
+            "parse_cache": parse_cache.stats() if parse_cache is not None else None,
+        }
+        if memory:
+            stats["memory"] = memory_report()
+        return stats
+
+    def dump_memory_report(self, path="memory_report.txt", limit=25):
+        """
+        把 tracemalloc 内存分配报告写入文件（需开启 SYSTEM_CONFIG["tracemalloc"]）
+        :return: 写入成功返回True，未开启跟踪时返回False
+        """
+        return dump_memory_report(path, limit)
+
+    def flush(self, timeout=None):
+        """写后模式下等待已学习的知识全部提交到数据库，返回值同 DBOperation.flush"""
+        return self.db_operation.flush(timeout)
+
     def close(self):
-        """关闭资源（数据库连接）"""
+        """关闭资源（提交写后队列中的剩余写入，关闭数据库连接）"""
         self.db_operation.close()
\ No newline at end of file
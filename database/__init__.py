@@ -7,22 +7,87 @@
 - DBConnector: 数据库连接管理器
   - 处理MySQL连接
   - 管理连接池和连接生命周期
-  - 提供cursor对象
+  - 线程安全的借出/归还语义，等待超时与连接池统计
 
 - DBOperation: 数据库操作封装
   - 知识查询：支持模糊匹配和精确查询
   - 知识保存：支持插入和更新操作
   - 事务管理：确保数据一致性
+  - SQL 访问委托给可配置的存储后端
+
+- StorageBackend: 存储后端接口
+  - MySQLBackend: 通过 DBConnector 连接池访问 MySQL
+  - SQLiteBackend: 嵌入式 SQLite（WAL 模式、预编译语句缓存），无需 MySQL 服务
+  - create_backend: 按 SYSTEM_CONFIG["storage_backend"] 创建后端
+
+- TripleIndex: 内存三元组索引
+  - 正向 (entity1, relation) → entity2、反向 (entity2, relation) → entity1
+  - 复现 relation LIKE '%relation%' 的子串匹配语义
+  - 实体和关系按数据库排序规则归一化为键（collation.fold_key），大小写不同的问法与 SQL 查询结果一致
+  - 由 save_knowledge 同步写入
+
+- CompactTripleIndex: 紧凑三元组索引
+  - 实体/关系驻留为整数 id（单一字符串表），正向/反向邻接按 CSR 存放在 array 中
+  - 查询语义与 TripleIndex 相同，新知识写入增量层，compact() 合并
+
+- KnowledgeSnapshot / SnapshotIndex: 知识快照
+  - 导出为字符串表 + 排序数组的版本化二进制文件，mmap 映射后二分查找
+  - 启动耗时与知识点数量无关，多进程共享页缓存；新知识写入内存增量层
+
+- FuzzyEntityIndex: 相似实体索引
+  - 删除邻域哈希（排序数组二分查找）+ 有界编辑距离，实体拼写有误（错别字、全角、空格）时找出相近的已知实体
+  - 由保存操作增量维护
+
+- EntityBloomFilter: 实体布隆过滤器
+  - 记录全部 entity1/entity2，判定"一定不存在"的实体查询不访问数据库
+  - 大小由配置的容量和误判率决定，可持久化到文件并按 id 增量补齐
+
+- WriteBehindQueue: 写后队列
+  - save_knowledge 写入本地追加日志并入队后立即返回，后台线程按批大小/最长延迟组提交
+  - 未提交的写入对本进程查询立即可见，崩溃后重放日志；flush/close 作为提交屏障
+
+- AnswerCache: 答案缓存
+  - LRU 淘汰 + TTL 过期，缓存正负查询结果
+  - 保存知识时按实体失效，提供命中/未命中/淘汰计数
+
+- RelationNormalizer: 关系词规范化
+  - 维护"别名 → 规范关系"映射，使已知关系可以走等值索引
 
 主要类：
     DBConnector: 数据库连接器
     DBOperation: 数据库操作类
+    StorageBackend: 存储后端接口
+    MySQLBackend: MySQL 存储后端
+    SQLiteBackend: SQLite 存储后端
+    TripleIndex: 内存三元组索引
+    CompactTripleIndex: 紧凑三元组索引
+    KnowledgeSnapshot: 知识快照（只读映射）
+    SnapshotIndex: 快照 + 内存增量层索引
+    FuzzyEntityIndex: 相似实体索引
+    EntityBloomFilter: 实体布隆过滤器
+    WriteBehindQueue: 写后队列（组提交）
+    AnswerCache: 答案缓存
+    RelationNormalizer: 关系词规范化器
 """
 
 from .db_connect import DBConnector
 from .db_operation import DBOperation
+from .storage_backend import StorageBackend, create_backend
+from .mysql_backend import MySQLBackend
+from .sqlite_backend import SQLiteBackend
+from .triple_index import TripleIndex
+from .compact_index import CompactTripleIndex
+from .knowledge_snapshot import KnowledgeSnapshot, SnapshotIndex
+from .entity_index import FuzzyEntityIndex
+from .entity_filter import EntityBloomFilter
+from .write_behind import WriteBehindQueue
+from .answer_cache import AnswerCache
+from .relation_alias import RelationNormalizer
+from monitoring import get_logger
 
 # 定义模块的公共API
-__all__ = ['DBConnector', 'DBOperation']
+__all__ = ['DBConnector', 'DBOperation', 'StorageBackend', 'MySQLBackend', 'SQLiteBackend', 'create_backend',
+           'TripleIndex', 'CompactTripleIndex', 'KnowledgeSnapshot', 'SnapshotIndex', 'FuzzyEntityIndex', 'EntityBloomFilter', 'WriteBehindQueue', 'AnswerCache',
+           'RelationNormalizer']
 
-print("✅ Database 模块初始化完成 - 数据库连接器已就绪")
\ No newline at end of file
+get_logger("database").debug("Database 模块初始化完成 - 数据库连接器已就绪")
\ No newline at end of file
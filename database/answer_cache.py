@@ -0,0 +1,117 @@
+# 答案缓存：位于 query_knowledge 之前的 LRU/TTL 缓存，同时缓存"查无答案"的结果
+import threading
+import time
+from collections import OrderedDict
+
+# 负缓存标记：区分"缓存了 None 答案"和"缓存未命中"
+_NEGATIVE = object()
+
+
+class AnswerCache:
+    def __init__(self, max_size=1024, ttl=300, negative_ttl=5):
+        """
+        初始化答案缓存
+        失效只发生在调用 save_knowledge 的进程内：其他进程（bulk_import、extract_corpus、另一个 GUI 或服务进程）
+        写入的知识要等到缓存条目过期后才能查到，因此"无答案"条目的有效期应远短于正结果
+        :param max_size: 最多缓存的 (entity1, relation) 键数量，超出后淘汰最久未使用的键
+        :param ttl: 正结果的有效期（秒），None 或 0 表示永不过期
+        :param negative_ttl: "无答案"结果的有效期（秒），None 或 0 表示不缓存"无答案"
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # (entity1, relation) → (answer, 过期时间)
+        self._entries = OrderedDict()
+        # entity → {(entity, relation), ...}，用于按实体失效
+        self._keys_by_entity = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, entity1, relation):
+        """
+        查询缓存
+        :return: (found, answer) found 为 False 表示未命中；answer 为 None 表示缓存的是"无答案"
+        """
+        key = (entity1, relation)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            answer, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, (None if answer is _NEGATIVE else answer)
+
+    def put(self, entity1, relation, answer):
+        """写入缓存（answer 为 None 时按 negative_ttl 作为负缓存保存）"""
+        if not self.max_size:
+            return
+        if answer is None:
+            if not self.negative_ttl:
+                return
+            expires_at = time.monotonic() + self.negative_ttl
+        else:
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+        key = (entity1, relation)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._keys_by_entity.setdefault(entity1, set()).add(key)
+            self._entries[key] = (_NEGATIVE if answer is None else answer, expires_at)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_entity(self, entity):
+        """
+        使与某个实体相关的所有缓存键失效
+        问题中的实体既可能命中三元组的 entity1（正向），也可能命中 entity2（反向），
+        所以保存 (entity1, relation, entity2) 时需要分别对 entity1 和 entity2 调用
+        """
+        with self._lock:
+            for key in list(self._keys_by_entity.get(entity, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        """清空缓存（统计计数保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_entity.clear()
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_entity.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_entity[key[0]]
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,307 @@
+#异步数据库操作：基于 aiomysql 连接池的 asyncio 版本，语义与 DBOperation 一致，供异步服务嵌入
+import asyncio
+import logging
+import time
+from datetime import datetime
+from config.db_config import DB_CONFIG, RELATION_ALIAS_SCHEMA_VERSION
+from config.system_config import SYSTEM_CONFIG
+from database.storage_backend import relation_condition
+from database.mysql_backend import UNION_LOOKUP_SQL, UNION_LOOKUP_NO_REL_SQL, UPSERT_TRIPLE_SQL, INSERT_ALIAS_SQL
+from database.relation_alias import RelationNormalizer
+from database.entity_index import FuzzyEntityIndex
+from monitoring import METRICS, get_logger, log_event
+
+
+
+class StandInDBError(Exception):
+    """注入的替身连接池表示数据库错误时抛出的异常（其他异常类型视为程序错误，不会被吞掉）"""
+
+
+try:
+    import aiomysql
+    _DB_ERROR = (aiomysql.MySQLError, StandInDBError)
+except ImportError:  # 可选依赖：只有使用异步引擎时才需要
+    aiomysql = None
+    _DB_ERROR = StandInDBError  # 仅在注入替身连接池时使用
+
+logger = get_logger("database.async")
+
+
+def unsupported_async_config(keys):
+    """
+    返回 keys 中已启用、但异步版本没有实现的配置项（异步版本静默忽略它们会使结果与同步版本不一致）
+    :param keys: 需要检查的开关配置项
+    """
+    return [key for key in keys if SYSTEM_CONFIG.get(key)]
+
+
+class AsyncDBOperation:
+    def __init__(self, answer_cache=None, relation_match=None, pool=None):
+        """
+        只支持 MySQL（aiomysql），不支持 SQLite 后端、实体过滤器和写后模式：配置启用了这些功能时抛出 ValueError，
+        需要它们时请使用同步的 DBOperation / QAEngine
+        :param answer_cache: 可选的 AnswerCache（线程安全，可与同步版本共用）
+        :param relation_match: 关系匹配方式 "like" / "exact"，默认取系统配置
+        :param pool: 已创建的 aiomysql 连接池（或兼容的替身，数据库错误需抛出 StandInDBError），
+                     为空时在 connect() 中按 DB_CONFIG 创建
+        """
+        unsupported = unsupported_async_config(("use_entity_filter", "write_behind"))
+        if SYSTEM_CONFIG.get("storage_backend", "mysql") != "mysql":
+            unsupported.insert(0, f"storage_backend={SYSTEM_CONFIG['storage_backend']}")
+        if unsupported:
+            raise ValueError(f"异步数据库访问不支持以下配置: {', '.join(unsupported)}（请使用 DBOperation）")
+        if aiomysql is None and pool is None:
+            raise ImportError("异步数据库访问需要安装 aiomysql：pip install aiomysql")
+        self.pool = pool
+        self.answer_cache = answer_cache
+        self.relation_match = relation_match or SYSTEM_CONFIG.get("relation_match", "like")
+        self.relation_normalizer = RelationNormalizer(SYSTEM_CONFIG.get("relation_aliases"))
+        self.alias_table_ready = False
+        # 可选的内存三元组索引（由调用方加载后赋值，与同步版本相同）
+        self.triple_index = None
+        # 可选的相似实体索引（调用 load_entity_index 后启用），查询未命中时查找拼写相近的实体
+        self.entity_index = None
+        # 保存成功后的回调 listener(entity1, relation, entity2)，与同步版本相同
+        self.save_listeners = []
+
+    async def connect(self):
+        """创建连接池（已创建时直接返回）"""
+        if self.pool is None:
+            self.pool = await aiomysql.create_pool(
+                host=DB_CONFIG["host"],
+                port=DB_CONFIG.get("port", 3306),
+                user=DB_CONFIG["user"],
+                password=DB_CONFIG["password"],
+                db=DB_CONFIG["database"],
+                charset=DB_CONFIG.get("charset", "utf8mb4"),
+                connect_timeout=DB_CONFIG.get("connection_timeout", 10),
+                # 读操作自动提交，避免复用连接时读到旧快照；写操作显式开启事务
+                autocommit=True,
+                minsize=1,
+                maxsize=SYSTEM_CONFIG.get("async_pool_size", 20),
+            )
+            log_event(logger, logging.INFO, "成功创建MySQL异步连接池", maxsize=SYSTEM_CONFIG.get("async_pool_size", 20))
+        return self.pool
+
+    async def _fetchone(self, sql, params):
+        pool = await self.connect()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                return await cursor.fetchone()
+
+    async def load_relation_aliases(self):
+        """从 relation_alias 表加载关系别名映射，语义同 DBOperation.load_relation_aliases"""
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT 1 FROM schema_version WHERE version = %s",
+                                         (RELATION_ALIAS_SCHEMA_VERSION,))
+                    migrated = await cursor.fetchone() is not None
+                    if migrated:
+                        await cursor.execute("SELECT alias, canonical FROM relation_alias")
+                        self.relation_normalizer.load(await cursor.fetchall())
+        except _DB_ERROR as e:
+            log_event(logger, logging.WARNING, "加载关系别名失败（请运行 python -m database.migrate_relations）", error=e)
+            return False
+        if not migrated:
+            # 已有三元组尚未改写为规范关系，此时规范化查询会找不到以别名保存的记录
+            log_event(logger, logging.WARNING, "关系别名迁移尚未执行，保持原始关系匹配（请运行 python -m database.migrate_relations）")
+            return False
+        self.alias_table_ready = True
+        return True
+
+    async def load_entity_index(self, batch_size=10000):
+        """
+        按主键分批读取全部实体（entity1 和 entity2），构建相似实体索引，之后由保存操作增量维护，语义同 DBOperation.load_entity_index
+        每批实体直接送入索引的分批加载器，内存中不保留全部实体的列表
+        :param batch_size: 每批拉取的行数
+        :return: 加载成功返回True，失败返回False（不启用相似实体回退）
+        """
+        index = FuzzyEntityIndex(max_distance=SYSTEM_CONFIG.get("fuzzy_max_distance", 1))
+        loader = index.loader()
+        start = time.perf_counter()
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    last_id = 0
+                    while True:
+                        await cursor.execute(
+                            "SELECT id, entity1, entity2 FROM knowledge_triple WHERE id > %s ORDER BY id LIMIT %s",
+                            (last_id, batch_size))
+                        rows = await cursor.fetchall()
+                        if not rows:
+                            break
+                        loader.feed(entity for _, entity1, entity2 in rows for entity in (entity1, entity2))
+                        last_id = rows[-1][0]
+        except _DB_ERROR as e:
+            log_event(logger, logging.ERROR, "加载相似实体索引失败", error=e)
+            return False
+        count = loader.finish()
+        self.entity_index = index
+        log_event(logger, logging.INFO, "相似实体索引加载完成", entities=count,
+                  elapsed_s=round(time.perf_counter() - start, 3))
+        return True
+
+    def _normalize_relation(self, relation):
+        if relation and self.alias_table_ready:
+            return self.relation_normalizer.canonical(relation)
+        return relation
+
+    def _use_exact_relation(self, relation):
+        return (self.relation_match == "exact" and self.alias_table_ready and bool(relation)
+                and self.relation_normalizer.is_known(relation))
+
+    async def query_knowledge(self, entity1, relation):
+        """
+        根据实体和关系查询答案（支持正向和反向查询）
+        全部回退分支合并为一条 UNION ALL 语句，结果与 DBOperation.query_knowledge 的分支顺序一致
+        :return: 答案或None
+        """
+        relation = self._normalize_relation(relation)
+        if self.answer_cache is not None:
+            found, answer = self.answer_cache.get(entity1, relation)
+            if found:
+                return answer
+
+        if self.triple_index is not None:
+            answer = self.triple_index.lookup(entity1, relation, exact=self._use_exact_relation(relation))
+        else:
+            relation_cond, rel_param = relation_condition(relation, self._use_exact_relation(relation))
+            if not relation or relation.strip() == '':
+                sql = UNION_LOOKUP_NO_REL_SQL.format(relation_cond=relation_cond)
+                params = (entity1, rel_param, entity1, rel_param, entity1, entity1)
+            else:
+                sql = UNION_LOOKUP_SQL.format(relation_cond=relation_cond)
+                params = (entity1, rel_param, entity1, rel_param)
+            try:
+                with METRICS.timer("db.query.union"):
+                    row = await self._fetchone(sql, params)
+            except _DB_ERROR as e:
+                log_event(logger, logging.ERROR, "数据库查询失败", entity1=entity1, relation=relation, error=e)
+                return None  # 查询出错不写入缓存
+            answer = row[0] if row else None
+
+        if self.answer_cache is not None:
+            self.answer_cache.put(entity1, relation, answer)
+        return answer
+
+    async def query_similar(self, entity1, relation, max_distance=None, max_candidates=None):
+        """
+        相似实体回退，语义同 DBOperation.query_similar
+        :return: (相似实体, 答案)，没有可用的相似实体时返回 (None, None)
+        """
+        if self.entity_index is None or not entity1 or entity1 in self.entity_index:
+            return None, None
+        max_distance = SYSTEM_CONFIG.get("fuzzy_max_distance", 1) if max_distance is None else max_distance
+        max_candidates = max_candidates or SYSTEM_CONFIG.get("fuzzy_max_candidates", 3)
+        with METRICS.timer("query.similar"):
+            candidates = self.entity_index.search(entity1, max_distance=max_distance, limit=max_candidates)
+        for candidate, _ in candidates:
+            answer = await self.query_knowledge(candidate, relation)
+            if answer:
+                return candidate, answer
+        return None, None
+
+    async def query_paths(self, paths, max_hops=None, time_budget=None):
+        """
+        多跳查询，参数和返回值同 DBOperation.query_paths
+        每一跳把所有路径当前节点的 (节点, 关系) 去重后并发执行 query_knowledge（异步连接池没有批量 IN 查询），
+        同一次调用内重复出现的 (节点, 关系) 只查询一次
+        :return: (answers, stats)
+        """
+        max_hops = max_hops or SYSTEM_CONFIG.get("path_query_max_hops", 4)
+        time_budget = SYSTEM_CONFIG.get("path_query_time_budget", 0.5) if time_budget is None else time_budget
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        stats = {"hops": 0, "lookups": 0, "memo_hits": 0, "timed_out": False}
+
+        # 每条路径的当前节点，None 表示已中断（查无结果或超过跳数上限）
+        nodes = [entity if relations and len(relations) <= max_hops else None for entity, relations in paths]
+        memo = {}  # (节点, 关系) → 答案，本次调用内复用
+        longest = max((len(relations) for _, relations in paths if len(relations) <= max_hops), default=0)
+        for hop in range(longest):
+            active = [i for i, (_, relations) in enumerate(paths) if nodes[i] is not None and hop < len(relations)]
+            if not active:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                stats["timed_out"] = True
+                for i in active:
+                    nodes[i] = None
+                break
+            keys = {(nodes[i], paths[i][1][hop]) for i in active}
+            pending = [key for key in keys if key not in memo]
+            stats["memo_hits"] += len(keys) - len(pending)
+            if pending:
+                with METRICS.timer("query.path_hop"):
+                    # 查询出错时 query_knowledge 返回None，按查无结果处理
+                    answers = await asyncio.gather(*(self.query_knowledge(*key) for key in pending))
+                memo.update(zip(pending, answers))
+                stats["lookups"] += len(pending)
+            stats["hops"] += 1
+            for i in active:
+                nodes[i] = memo[(nodes[i], paths[i][1][hop])] or None
+        return nodes, stats
+
+    async def save_knowledge(self, entity1, relation, entity2):
+        """
+        保存知识三元组（存在则更新），语义同 DBOperation.save_knowledge
+        :return: 保存成功返回True，失败返回False
+        """
+        raw_relation = relation
+        relation = self._normalize_relation(relation)
+        new_alias = self.alias_table_ready and not self.relation_normalizer.is_known(raw_relation)
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as conn:
+                await conn.begin()
+                try:
+                    async with conn.cursor() as cursor:
+                        if new_alias:
+                            await cursor.execute(INSERT_ALIAS_SQL, (raw_relation, relation))
+                        await cursor.execute(UPSERT_TRIPLE_SQL, (entity1, relation, entity2, datetime.now()))
+                    with METRICS.timer("db.commit"):
+                        await conn.commit()
+                except BaseException:
+                    await conn.rollback()
+                    raise
+        except _DB_ERROR as e:
+            log_event(logger, logging.ERROR, "数据库保存失败", entity1=entity1, relation=relation, error=e)
+            return False
+
+        if new_alias:
+            self.relation_normalizer.register(raw_relation, relation)
+        if self.triple_index is not None:
+            self.triple_index.add(entity1, relation, entity2)
+        if self.entity_index is not None:
+            self.entity_index.add(entity1)
+            self.entity_index.add(entity2)
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate_entity(entity1)
+            self.answer_cache.invalidate_entity(entity2)
+        for listener in self.save_listeners:
+            listener(entity1, relation, entity2)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("知识点已保存", extra={"fields": {"entity1": entity1, "relation": relation, "entity2": entity2}})
+        return True
+
+    async def get_all_relations(self):
+        """获取数据库中所有不重复的关系词列表"""
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT DISTINCT relation FROM knowledge_triple ORDER BY relation")
+                    return [row[0] for row in await cursor.fetchall()]
+        except _DB_ERROR as e:
+            log_event(logger, logging.ERROR, "获取关系词列表失败", error=e)
+            return []
+
+    async def close(self):
+        """关闭连接池"""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            log_event(logger, logging.INFO, "数据库连接池已关闭")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识批量导入脚本
+================
+
+从 CSV 或 JSONL 文件流式读取三元组，按批写入 knowledge_triple。
+
+文件格式：
+- CSV：每行 entity1,relation,entity2（可带表头 entity1,relation,entity2）
+- JSONL：每行一个对象 {"entity1": ..., "relation": ..., "entity2": ...}
+
+特性：
+- 生成器逐行读取，内存占用与文件大小无关
+- 多行 executemany 写入，每批提交一次（--batch-size）
+- 每批提交后写入断点文件，中断后用 --resume 从断点继续
+- 出错的行写入错误报告（JSONL），不会中断整个导入
+
+使用方式（在项目根目录下）：
+    python -m database.bulk_import data/triples.csv
+    python -m database.bulk_import data/triples.jsonl --batch-size 5000 --resume
+
+作者: Knowledge QA System
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from database.db_operation import DBOperation
+
+CSV_HEADER = ['entity1', 'relation', 'entity2']
+
+
+def iter_csv_triples(path):
+    """逐行读取 CSV 三元组（自动跳过表头）"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for i, row in enumerate(csv.reader(f)):
+            if i == 0 and [col.strip().lower() for col in row] == CSV_HEADER:
+                continue
+            yield tuple(row) if len(row) == 3 else row
+
+
+def iter_jsonl_triples(path):
+    """逐行读取 JSONL 三元组；无法解析的行原样产出，由导入流程记入错误报告"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                yield (record['entity1'], record['relation'], record['entity2'])
+            except (ValueError, KeyError, TypeError):
+                yield line
+
+
+def iter_triples_from_file(path, fmt=None):
+    """
+    根据文件格式选择读取器
+    :param fmt: "csv" 或 "jsonl"，为空时按扩展名判断
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+    if fmt == 'jsonl':
+        return iter_jsonl_triples(path)
+    return iter_csv_triples(path)
+
+
+def read_checkpoint(path):
+    """读取断点文件中的偏移量（不存在时返回0）"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, offset):
+    """原子写入断点偏移量，避免中断时留下半截文件"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(str(offset))
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="知识批量导入")
+    parser.add_argument('path', help="CSV 或 JSONL 文件路径")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="文件格式（默认按扩展名判断）")
+    parser.add_argument('--batch-size', type=int, default=1000, help="每批提交的行数")
+    parser.add_argument('--checkpoint', help="断点文件路径（默认 <path>.offset）")
+    parser.add_argument('--resume', action='store_true', help="从断点文件记录的偏移量继续导入")
+    parser.add_argument('--error-report', help="错误报告路径（默认 <path>.errors.jsonl）")
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or args.path + '.offset'
+    error_report = args.error_report or args.path + '.errors.jsonl'
+    start_offset = read_checkpoint(checkpoint) if args.resume else 0
+
+    print("=" * 50)
+    print("🧠 知识问答系统 - 批量导入工具")
+    print("=" * 50)
+    print(f"📄 文件: {args.path}  批大小: {args.batch_size}  起始偏移: {start_offset}")
+
+    db = DBOperation()
+    db.load_relation_aliases()
+    batch_errors = []
+
+    with open(error_report, 'a', encoding='utf-8') as error_file:
+        def on_error(offset, item, message):
+            batch_errors.append(offset)
+            error_file.write(json.dumps(
+                {"offset": offset, "row": item if isinstance(item, str) else list(item), "error": message},
+                ensure_ascii=False
+            ) + '\n')
+
+        def on_progress(stats):
+            write_checkpoint(checkpoint, stats["offset"])
+            error_file.flush()
+            line = (f"   📦 批次 {stats['batches']}: 偏移 {stats['offset']}, 已写入 {stats['saved']}, "
+                    f"失败 {stats['failed']}, {stats['rows_per_sec']:.0f} 行/秒")
+            if batch_errors:
+                line += f"（本批出错 {len(batch_errors)} 行，见 {error_report}）"
+                batch_errors.clear()
+            print(line)
+
+        try:
+            stats = db.bulk_save_knowledge(
+                iter_triples_from_file(args.path, args.format),
+                batch_size=args.batch_size,
+                start_offset=start_offset,
+                progress_callback=on_progress,
+                error_callback=on_error,
+            )
+        except db.backend.Error as e:
+            print(f"❌ 导入中断: {e}")
+            print(f"💡 修复后使用 --resume 从偏移 {read_checkpoint(checkpoint)} 继续")
+            db.close()
+            sys.exit(1)
+
+    db.close()
+    print(f"\n🎉 导入完成：写入 {stats['saved']} 条，失败 {stats['failed']} 条，"
+          f"耗时 {stats['elapsed']:.1f} 秒（{stats['rows_per_sec']:.0f} 行/秒）")
+
+
+if __name__ == "__main__":
+    main()
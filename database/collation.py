@@ -0,0 +1,25 @@
+# 排序规则键：按数据库排序规则归一化实体/关系，内存中的各类索引用它作为键，查询结果与 SQL 的 = / LIKE 一致
+import unicodedata
+
+
+def fold_key(text):
+    """
+    按 MySQL utf8mb4_unicode_ci 的比较规则归一化字符串：大小写、全半角、重音不同的字符串视为相等，
+    末尾空格忽略（PAD SPACE）；中间的空白保持不变（数据库中同样有区别）
+    SQLite 的 NOCASE 只忽略 ASCII 大小写，全角/重音不同的字符串在 SQLite 中不相等，此时以 MySQL 的语义为准
+    :param text: 实体或关系
+    :return: 归一化后的键（只用于比较，返回给用户的始终是原始字符串）
+    """
+    if text.isascii():
+        folded = text.lower()
+    else:
+        original = text
+        if not unicodedata.is_normalized("NFKD", text):
+            text = unicodedata.normalize("NFKD", text)
+        # 中文等没有组合字符的文本跳过逐字符过滤
+        if any(map(unicodedata.combining, text)):
+            text = ''.join(char for char in text if not unicodedata.combining(char))
+        folded = text.casefold()
+        text = original
+    # 与原字符串相同时返回原对象，索引中的键和值共用同一个字符串
+    return (text if folded == text else folded).rstrip(' ')
@@ -0,0 +1,389 @@
+# 紧凑三元组索引：字符串驻留为整数 id，三元组按 CSR（压缩稀疏行）存放在类型化数组中，内存约为字典索引的几分之一
+import bisect
+import threading
+from array import array
+
+from database.collation import fold_key
+from database.triple_index import TripleIndex
+
+# 行内三元组超过该数量时按关系排序并二分查找，较短的行直接顺序扫描
+_SCAN_LIMIT = 8
+
+
+class _Tables:
+    """一次构建的全部数组；重建时整体替换引用，查询开始时取一次引用，不会读到新旧混合的数组"""
+    __slots__ = ("data", "offsets", "display_ids", "display_offsets", "display_data", "slots", "mask",
+                 "forward", "reverse", "relation_ids", "relation_names", "substrings", "size")
+
+    def __init__(self):
+        # 字符串表存放按排序规则归一化后的键（fold_key），哈希表按键查找，与数据库的 = / LIKE 一致
+        self.data = b""
+        self.offsets = array('Q', [0])
+        # 原始写法与键不同的字符串（如大小写不同）另存一份，按 id 排序，返回答案时使用
+        self.display_ids = array('I')
+        self.display_offsets = array('Q', [0])
+        self.display_data = b""
+        self.slots = array('I')
+        self.mask = 0
+        self.forward = (array('I', [0]), array('I'), array('I'))  # (起始位置, 关系 id, 另一端实体 id)
+        self.reverse = (array('I', [0]), array('I'), array('I'))
+        self.relation_ids = {}  # 关系词键 → id（关系词很少，直接用字典）
+        self.relation_names = {}  # id → 原始关系词
+        self.substrings = {}  # 关系词键的子串 → {关系 id}，复现 relation LIKE '%relation%' 的语义
+        self.size = 0
+
+
+def _string(tables, string_id):
+    """返回 id 对应的原始字符串"""
+    display_ids = tables.display_ids
+    i = bisect.bisect_left(display_ids, string_id)
+    if i < len(display_ids) and display_ids[i] == string_id:
+        return tables.display_data[tables.display_offsets[i]:tables.display_offsets[i + 1]].decode("utf-8")
+    return tables.data[tables.offsets[string_id]:tables.offsets[string_id + 1]].decode("utf-8")
+
+
+def _string_id(tables, value):
+    """返回键（fold_key 归一化后的字符串）的 id，不在字符串表中时返回None"""
+    if not tables.mask:
+        return None
+    key = value.encode("utf-8")
+    data, offsets, slots, mask = tables.data, tables.offsets, tables.slots, tables.mask
+    position = hash(value) & mask
+    while True:
+        slot = slots[position]
+        if not slot:
+            return None
+        string_id = slot - 1
+        if data[offsets[string_id]:offsets[string_id + 1]] == key:
+            return string_id
+        position = (position + 1) & mask
+
+
+class CompactTripleIndex:
+    def __init__(self):
+        """
+        与 TripleIndex 接口一致的只读紧凑索引，可直接作为 DBOperation.triple_index 使用
+        - 字符串表：全部实体/关系按排序规则归一化后的键（fold_key）的 UTF-8 字节拼接为一个 bytes，
+          array('Q') 记录偏移，开放寻址哈希表 array('I') 把键映射为 id（槽位存 id + 1，0 表示空）；
+          原始写法与键不同的字符串另存一份，查询结果返回原始写法
+        - 正向：起始位置数组 start[entity1] 到 start[entity1 + 1] 之间是 entity1 的全部 (relation, entity2)
+        - 反向：同样结构，存放 entity2 的全部 (relation, entity1)
+        load 之后通过 add 写入的三元组放在内存增量层（TripleIndex），compact() 时合并
+        """
+        self._tables = _Tables()
+        self._delta = TripleIndex()
+        self._delta.loaded = True
+        self._delta_triples = []
+        # _lock 保护增量层的写入和数组替换（持有时间很短）；_build_lock 保证同一时间只有一次重建
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.loaded = False
+
+    @property
+    def size(self):
+        return self._tables.size + self._delta.size
+
+    def load(self, triples):
+        """
+        全量加载三元组并构建紧凑数组（重复的三元组只保留一份），已有的三元组和增量层一并重建
+        构建期间需要一个临时的字符串 → id 字典，构建完成后释放；构建期间的查询仍使用旧数组
+        构建不持有 _lock，期间的 add 照常写入增量层，替换数组时再把这些三元组转入新的增量层
+        :param triples: 可迭代的 (entity1, relation, entity2)，可以是生成器
+        :return: 加载的三元组数量
+        """
+        with self._build_lock:
+            with self._lock:
+                base = self._tables
+                merged = len(self._delta_triples)
+                delta_triples = self._delta_triples[:merged]
+            tables = self._build((self._iter_base(base), delta_triples, triples))
+            with self._lock:
+                # 构建期间 add 的三元组（紧凑数组中没有的）转入新的增量层
+                delta = TripleIndex()
+                delta.loaded = True
+                pending = []
+                for triple in self._delta_triples[merged:]:
+                    if not self._contains(tables, *triple):
+                        delta.add(*triple)
+                        pending.append(triple)
+                # 先替换数组再替换增量层：替换后到替换增量层之前两边都能查到，不会出现查不到的窗口
+                self._tables = tables
+                self._delta = delta
+                self._delta_triples = pending
+                self.loaded = True
+            return tables.size
+
+    @classmethod
+    def _build(cls, sources):
+        """
+        由若干个三元组来源构建一组新的紧凑数组（不访问实例状态，可以不加锁执行）
+        :param sources: 可迭代的三元组来源，每个来源产出 (entity1, relation, entity2)
+        :return: _Tables
+        """
+        ids = {}  # 键 → id
+        originals = {}  # id → 与键不同的原始写法（排序规则下相等的字符串保留第一次出现的写法）
+        raw = array('I')
+        for source in sources:
+            for triple in source:
+                for value in triple:
+                    key = fold_key(value)
+                    string_id = ids.get(key)
+                    if string_id is None:
+                        string_id = ids[key] = len(ids)
+                        if key != value:
+                            originals[string_id] = value
+                    raw.append(string_id)
+        tables = _Tables()
+        relation_ids = {raw[i] for i in range(1, len(raw), 3)}
+        cls._build_strings(tables, ids, originals)
+        del ids, originals
+        cls._build_adjacency(tables, raw, len(tables.offsets) - 1)
+        tables.relation_names = {relation_id: _string(tables, relation_id) for relation_id in relation_ids}
+        tables.relation_ids = {
+            tables.data[tables.offsets[relation_id]:tables.offsets[relation_id + 1]].decode("utf-8"): relation_id
+            for relation_id in relation_ids
+        }
+        for relation, relation_id in tables.relation_ids.items():
+            length = len(relation)
+            for i in range(length):
+                for j in range(i + 1, length + 1):
+                    tables.substrings.setdefault(relation[i:j], set()).add(relation_id)
+        return tables
+
+    @staticmethod
+    def _build_strings(tables, ids, originals):
+        """由构建期字典生成字符串表、原始写法表和哈希表（字典按插入顺序即 id 顺序遍历）"""
+        display_ids = array('I', sorted(originals))
+        display_encoded = [originals[string_id].encode("utf-8") for string_id in display_ids]
+        display_offsets = array('Q', [0])
+        for value in display_encoded:
+            display_offsets.append(display_offsets[-1] + len(value))
+        tables.display_ids = display_ids
+        tables.display_offsets = display_offsets
+        tables.display_data = b"".join(display_encoded)
+        del display_encoded
+        encoded = [value.encode("utf-8") for value in ids]
+        offsets = array('Q', [0])
+        position = 0
+        for value in encoded:
+            position += len(value)
+            offsets.append(position)
+        tables.data = b"".join(encoded)
+        del encoded
+        tables.offsets = offsets
+        # 装载因子不超过 0.5，线性探测
+        capacity = 8
+        while capacity < 2 * len(ids):
+            capacity <<= 1
+        slots = array('I', bytes(4 * capacity))
+        mask = capacity - 1
+        for value, string_id in ids.items():
+            position = hash(value) & mask
+            while slots[position]:
+                position = (position + 1) & mask
+            slots[position] = string_id + 1
+        tables.slots = slots
+        tables.mask = mask
+
+    @staticmethod
+    def _build_adjacency(tables, raw, string_count):
+        """
+        计数排序构建正向 CSR（行内保持输入顺序），去掉重复三元组，再由正向数组构建反向 CSR
+        较长的行按关系排序，查询时二分查找
+        """
+        count = len(raw) // 3
+        start = array('I', bytes(4 * (string_count + 1)))
+        for i in range(0, len(raw), 3):
+            start[raw[i] + 1] += 1
+        for i in range(string_count):
+            start[i + 1] += start[i]
+        cursor = array('I', start)
+        relations = array('I', bytes(4 * count))
+        targets = array('I', bytes(4 * count))
+        for i in range(0, len(raw), 3):
+            position = cursor[raw[i]]
+            relations[position] = raw[i + 1]
+            targets[position] = raw[i + 2]
+            cursor[raw[i]] += 1
+        del cursor
+        raw[:] = array('I')
+
+        # 去重并原地压缩（写入位置不超过读取位置），长行按关系排序
+        write = 0
+        for entity in range(string_count):
+            begin, end = start[entity], start[entity + 1]
+            start[entity] = write
+            if end - begin > 1:
+                pairs = list(dict.fromkeys(zip(relations[begin:end], targets[begin:end])))
+                if len(pairs) > _SCAN_LIMIT:
+                    pairs.sort(key=lambda pair: pair[0])
+                for relation, target in pairs:
+                    relations[write] = relation
+                    targets[write] = target
+                    write += 1
+            elif end > begin:
+                relations[write] = relations[begin]
+                targets[write] = targets[begin]
+                write += 1
+        start[string_count] = write
+        del relations[write:]
+        del targets[write:]
+        tables.forward = (start, relations, targets)
+        tables.size = write
+
+        reverse_start = array('I', bytes(4 * (string_count + 1)))
+        for target in targets:
+            reverse_start[target + 1] += 1
+        for i in range(string_count):
+            reverse_start[i + 1] += reverse_start[i]
+        cursor = array('I', reverse_start)
+        reverse_relations = array('I', bytes(4 * write))
+        reverse_targets = array('I', bytes(4 * write))
+        for entity in range(string_count):
+            for i in range(start[entity], start[entity + 1]):
+                target = targets[i]
+                position = cursor[target]
+                reverse_relations[position] = relations[i]
+                reverse_targets[position] = entity
+                cursor[target] += 1
+        del cursor
+        for entity in range(string_count):
+            begin, end = reverse_start[entity], reverse_start[entity + 1]
+            if end - begin > _SCAN_LIMIT:
+                pairs = sorted(zip(reverse_relations[begin:end], reverse_targets[begin:end]), key=lambda pair: pair[0])
+                reverse_relations[begin:end] = array('I', (relation for relation, _ in pairs))
+                reverse_targets[begin:end] = array('I', (target for _, target in pairs))
+        tables.reverse = (reverse_start, reverse_relations, reverse_targets)
+
+    def string_id(self, value):
+        """返回字符串的 id（排序规则下相等的字符串 id 相同），不在字符串表中时返回None"""
+        return _string_id(self._tables, fold_key(value))
+
+    @staticmethod
+    def _iter_base(tables):
+        """逐个产出一组紧凑数组中的三元组 (entity1, relation, entity2)"""
+        start, relations, targets = tables.forward
+        for entity in range(len(start) - 1):
+            begin, end = start[entity], start[entity + 1]
+            if begin == end:
+                continue
+            name = _string(tables, entity)
+            for i in range(begin, end):
+                yield name, tables.relation_names[relations[i]], _string(tables, targets[i])
+
+    @staticmethod
+    def _find(tables, direction, entity, relation, exact):
+        """
+        在一个方向的 CSR 中查找 entity 的一条关系匹配记录，返回另一端实体
+        匹配语义与 TripleIndex._match 一致：exact 时等值，否则子串（空关系匹配任意关系），均按 fold_key 比较
+        """
+        entity_id = _string_id(tables, fold_key(entity))
+        if entity_id is None:
+            return None
+        start, relations, targets = direction
+        begin, end = start[entity_id], start[entity_id + 1]
+        if begin == end:
+            return None
+        if exact or relation:
+            relation = fold_key(relation) if relation else relation
+            if exact:
+                relation_id = tables.relation_ids.get(relation) if relation else None
+                candidates = () if relation_id is None else (relation_id,)
+            else:
+                candidates = tables.substrings.get(relation, ())
+            if not candidates:
+                return None
+            if end - begin > _SCAN_LIMIT:
+                # 长行按关系排序，对每个候选关系二分查找
+                for relation_id in candidates:
+                    i = bisect.bisect_left(relations, relation_id, begin, end)
+                    if i < end and relations[i] == relation_id:
+                        return _string(tables, targets[i])
+                return None
+            for i in range(begin, end):
+                if relations[i] in candidates:
+                    return _string(tables, targets[i])
+            return None
+        return _string(tables, targets[begin])
+
+    @staticmethod
+    def _contains(tables, entity1, relation, entity2):
+        """一组紧凑数组中是否包含该三元组"""
+        entity_id, relation_id, target_id = (_string_id(tables, fold_key(entity1)),
+                                             tables.relation_ids.get(fold_key(relation)),
+                                             _string_id(tables, fold_key(entity2)))
+        if entity_id is None or relation_id is None or target_id is None:
+            return False
+        start, relations, targets = tables.forward
+        for i in range(start[entity_id], start[entity_id + 1]):
+            if relations[i] == relation_id and targets[i] == target_id:
+                return True
+        return False
+
+    def add(self, entity1, relation, entity2):
+        """写入一个三元组（已存在时不变），新三元组放在增量层"""
+        if self._contains(self._tables, entity1, relation, entity2):
+            return
+        with self._lock:
+            before = self._delta.size
+            self._delta.add(entity1, relation, entity2)
+            if self._delta.size != before:
+                self._delta_triples.append((entity1, relation, entity2))
+
+    def compact(self):
+        """把增量层合并进紧凑数组（重新构建，期间的查询仍使用旧数组，写入不被阻塞）"""
+        if self._delta_triples:
+            self.load(())
+
+    def relations(self):
+        """返回索引中所有不重复的关系词（排序规则下相等的关系词只返回一种写法）"""
+        names = {fold_key(name): name for name in self._delta.relations()}
+        names.update((key, self._tables.relation_names[relation_id])
+                     for key, relation_id in self._tables.relation_ids.items())
+        return sorted(names.values())
+
+    def lookup_forward(self, entity1, relation, exact=False):
+        """只查正向：entity1 → entity2（增量层优先）"""
+        answer = self._delta.lookup_forward(entity1, relation, exact)
+        if answer is not None:
+            return answer
+        return self._find(self._tables, self._tables.forward, entity1, relation, exact)
+
+    def lookup_reverse(self, entity2, relation, exact=False):
+        """只查反向：entity2 → entity1（增量层优先）"""
+        answer = self._delta.lookup_reverse(entity2, relation, exact)
+        if answer is not None:
+            return answer
+        tables = self._tables
+        return self._find(tables, tables.reverse, entity2, relation, exact)
+
+    def lookup(self, entity1, relation, exact=False):
+        """按 query_knowledge 的语义查询答案：先正向（entity1 → entity2），再反向（entity2 → entity1）"""
+        answer = self.lookup_forward(entity1, relation, exact)
+        if answer is not None:
+            return answer
+        return self.lookup_reverse(entity1, relation, exact)
+
+    def stats(self):
+        """返回各部分的内存占用（字节）和每个三元组的平均字节数"""
+        tables = self._tables
+        parts = {
+            "strings_bytes": (len(tables.data) + len(tables.offsets) * tables.offsets.itemsize
+                              + len(tables.display_data) + len(tables.display_ids) * tables.display_ids.itemsize
+                              + len(tables.display_offsets) * tables.display_offsets.itemsize),
+            "hash_bytes": len(tables.slots) * tables.slots.itemsize,
+            "forward_bytes": sum(len(a) * a.itemsize for a in tables.forward),
+            "reverse_bytes": sum(len(a) * a.itemsize for a in tables.reverse),
+        }
+        total = sum(parts.values())
+        return {
+            "triples": tables.size,
+            "delta_triples": self._delta.size,
+            "strings": len(tables.offsets) - 1,
+            **parts,
+            "total_bytes": total,
+            "bytes_per_triple": total / tables.size if tables.size else 0.0,
+        }
+
+    def close(self):
+        """紧凑索引无需释放资源（与 SnapshotIndex 接口一致）"""
@@ -1,31 +1,193 @@
 #数据库连接管理：负责数据库连接的创建和关闭，解耦连接逻辑
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, PoolError
 from config.db_config import DB_CONFIG
+from config.system_config import SYSTEM_CONFIG
+from monitoring import METRICS, get_logger, log_event
+
+logger = get_logger("database.pool")
+
+# 连接池参数由 DBConnector 自己管理，不传给 mysql.connector.connect
+_POOL_KEYS = ("pool_name", "pool_size")
+
 
 class DBConnector:
-    def __init__(self):
-        self.connection = None
-        self.config = DB_CONFIG
+    def __init__(self, config=None, pool_size=None, max_wait=None, connection_factory=None, check_idle=None):
+        """
+        线程安全的数据库连接池：每次调用借出一个连接，用完归还
+        :param config: 数据库连接配置，默认使用 DB_CONFIG
+        :param pool_size: 连接池大小，默认取配置中的 pool_size
+        :param max_wait: 连接池耗尽时最长等待时间（秒），超时抛出 PoolError，默认取系统配置
+        :param connection_factory: 创建新连接的函数（无参数），默认使用 mysql.connector.connect
+        :param check_idle: 空闲超过该时间（秒）的连接借出前检查是否存活，默认取系统配置
+        """
+        self.config = config or DB_CONFIG
+        self.pool_size = pool_size or self.config.get("pool_size", 5)
+        self.max_wait = SYSTEM_CONFIG.get("db_pool_max_wait", 10) if max_wait is None else max_wait
+        self.check_idle = SYSTEM_CONFIG.get("db_pool_check_idle", 0.5) if check_idle is None else check_idle
+        self._connect_args = {k: v for k, v in self.config.items() if k not in _POOL_KEYS}
+        self._connection_factory = connection_factory or (lambda: mysql.connector.connect(**self._connect_args))
+        self._idle = []  # 空闲连接及其归还时间 (conn, released_at)（后进先出，优先复用最近用过的连接）
+        self._created = 0  # 已创建且未销毁的连接数
+        self._closed = False
+        self._cond = threading.Condition()
+        # 连接池统计
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._timeouts = 0
+        self._stale = 0
+
+    def acquire(self, timeout=None):
+        """
+        从连接池借出一个连接
+        :param timeout: 最长等待时间（秒），默认使用 max_wait
+        :return: 数据库连接
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        start = time.perf_counter()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("连接池已关闭")
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    break
+                if self._created < self.pool_size:
+                    # 先占位，在锁外创建连接，避免阻塞其他线程归还连接
+                    self._created += 1
+                    conn = None
+                    break
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolError(f"等待数据库连接超时（{timeout}秒，连接池大小 {self.pool_size}）")
+                waited = True
+                self._cond.wait(remaining)
+
+            elapsed = time.perf_counter() - start
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_time += elapsed
+                self._max_wait_time = max(self._max_wait_time, elapsed)
+        METRICS.record("db.acquire", elapsed)
+
+        # 空闲期间连接可能已被服务端关闭（wait_timeout、重启、网络中断），借出前检查，断开的连接在原名额上重建
+        if conn is not None and time.monotonic() - released_at >= self.check_idle and not self._alive(conn):
+            try:
+                conn.close()
+            except Error:
+                pass
+            with self._cond:
+                self._stale += 1
+            log_event(logger, logging.WARNING, "丢弃已断开的空闲连接", idle_s=round(time.monotonic() - released_at, 1))
+            conn = None
 
-    def connect(self):
-        """创建数据库连接"""
+        if conn is None:
+            try:
+                conn = self._connection_factory()
+                log_event(logger, logging.INFO, "成功连接到MySQL数据库", connections=self._created)
+            except Error as e:
+                self._discard()
+                log_event(logger, logging.ERROR, "数据库连接失败", error=e)
+                raise  # 终止程序，必须解决连接问题
+        return conn
+
+    @staticmethod
+    def _alive(conn):
+        """连接是否仍然可用（is_connected 会向服务端发送 ping）"""
+        try:
+            return conn.is_connected()
+        except Error:
+            return False
+
+    def release(self, conn, discard=False):
+        """
+        归还连接
+        :param conn: 借出的连接
+        :param discard: 为True时关闭该连接而不放回池中（连接已损坏时使用）
+        """
+        if discard or self._closed:
+            try:
+                conn.close()
+            except Error:
+                pass
+            self._discard()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self):
+        """释放一个连接名额，唤醒等待者"""
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        借出连接的上下文管理器，退出时自动归还；出现异常时回滚，连接断开则丢弃
+        用法：
+            with connector.connection() as conn:
+                cursor = conn.cursor()
+        """
+        conn = self.acquire(timeout)
         try:
-            if not self.connection or not self.connection.is_connected():
-                self.connection = mysql.connector.connect(**self.config)
-                print("✅ 成功连接到MySQL数据库")
-            return self.connection
-        except Error as e:
-            print(f"❌ 数据库连接失败: {e}")
-            raise  # 终止程序，必须解决连接问题
+            yield conn
+        except BaseException:
+            broken = False
+            try:
+                conn.rollback()
+            except Error:
+                broken = True
+            self.release(conn, discard=broken)
+            raise
+        else:
+            # 结束未提交的读事务（autocommit=False），避免连接复用时读到旧的一致性快照
+            broken = False
+            if getattr(conn, "in_transaction", False):
+                try:
+                    conn.rollback()
+                except Error:
+                    broken = True
+            self.release(conn, discard=broken)
+
+    def stats(self):
+        """返回连接池统计信息"""
+        with self._cond:
+            return {
+                "pool_size": self.pool_size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time": self._wait_time,
+                "max_wait_time": self._max_wait_time,
+                "timeouts": self._timeouts,
+                "stale_discarded": self._stale,
+            }
 
     def close(self):
-        """关闭数据库连接"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("✅ 数据库连接已关闭")
-
-    def get_cursor(self, dictionary=True):
-        """获取游标（默认返回字典格式结果）"""
-        self.connect()  # 确保连接有效
-        return self.connection.cursor(dictionary=dictionary)
\ No newline at end of file
+        """关闭连接池中的所有空闲连接（借出中的连接归还时关闭）"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Error:
+                pass
+        if idle:
+            log_event(logger, logging.INFO, "数据库连接已关闭", closed=len(idle))
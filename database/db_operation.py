@@ -1,11 +1,335 @@
 #数据库操作：封装数据查询、保存的 SQL 操作，隔离数据层与业务层
-from datetime import datetime
-from mysql.connector import Error
-from database.db_connect import DBConnector
+import hashlib
+import logging
+import os
+import threading
+import time
+from database.storage_backend import create_backend
+from database.triple_index import TripleIndex
+from database.compact_index import CompactTripleIndex
+from database.entity_index import FuzzyEntityIndex
+from database.entity_filter import EntityBloomFilter
+from database.write_behind import JournalLockedError, WriteBehindQueue
+from database.knowledge_snapshot import KnowledgeSnapshot, SnapshotIndex
+from database.relation_alias import RelationNormalizer
+from config.db_config import RELATION_ALIAS_SCHEMA_VERSION
+from config.system_config import SYSTEM_CONFIG
+from monitoring import METRICS, get_logger, log_event
+
+logger = get_logger("database.operation")
+
+# 项目根目录：未配置写后日志路径时日志放在这里，不随启动时的工作目录变化
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 class DBOperation:
-    def __init__(self):
-        self.connector = DBConnector()
+    def __init__(self, answer_cache=None, lookup_mode=None, relation_match=None, backend=None):
+        """
+        :param answer_cache: 可选的 AnswerCache，位于查询之前，缓存正负结果
+        :param lookup_mode: 数据库查询方式，"chain" 逐条执行回退查询，"union" 合并为一次往返；默认取系统配置
+        :param relation_match: 关系匹配方式，"like" 子串模糊匹配，"exact" 已知关系走等值索引；默认取系统配置
+        :param backend: 存储后端（StorageBackend），默认按 SYSTEM_CONFIG["storage_backend"] 创建
+        """
+        self.backend = backend or create_backend(lookup_mode=lookup_mode)
+        self.answer_cache = answer_cache
+        self.relation_match = relation_match or SYSTEM_CONFIG.get("relation_match", "like")
+        # 关系词规范化（别名 → 规范关系），relation_alias 表可用时由 save_knowledge 同步维护
+        self.relation_normalizer = RelationNormalizer(SYSTEM_CONFIG.get("relation_aliases"))
+        self.alias_table_ready = False
+        self._aliases_loaded = False
+        # 可选的内存三元组索引（调用 load_triple_index 后启用）
+        self.triple_index = None
+        # 可选的相似实体索引（调用 load_entity_index 后启用），查询未命中时查找拼写相近的实体
+        self.entity_index = None
+        # 可选的实体布隆过滤器（调用 load_entity_filter 后启用），一定不存在的实体不访问数据库
+        self.entity_filter = None
+        # 过滤器已读到的最大 id 和上次增量补读的时间，见 _refresh_entity_filter
+        self._filter_watermark = 0
+        self._filter_refreshed_at = 0.0
+        self._filter_refresh_lock = threading.Lock()
+        # 可选的写后队列（调用 enable_write_behind 后启用），save_knowledge 入队即返回，由后台线程组提交
+        self.write_behind = None
+        # 保存成功后的回调 listener(entity1, relation, entity2)，relation 为规范关系；单条保存和批量导入都会触发
+        self.save_listeners = []
+
+    def load_triple_index(self, batch_size=10000):
+        """
+        从数据库全量加载内存三元组索引，加载成功后查询不再访问数据库
+        SYSTEM_CONFIG["triple_index_type"] 为 "compact" 时使用整数驻留 + CSR 数组的紧凑索引
+        :param batch_size: 每批拉取的行数
+        :return: 加载成功返回True，失败返回False（继续使用数据库查询）
+        """
+        index = CompactTripleIndex() if SYSTEM_CONFIG.get("triple_index_type") == "compact" else TripleIndex()
+        try:
+            count = index.load(self.iter_triples(batch_size=batch_size))
+        except self.backend.Error as e:
+            log_event(logger, logging.ERROR, "加载内存索引失败", error=e)
+            return False
+        self.triple_index = index
+        log_event(logger, logging.INFO, "内存索引加载完成", triples=count, type=type(index).__name__)
+        return True
+
+    def load_snapshot(self, path, batch_size=10000):
+        """
+        映射知识快照（python -m database.export_snapshot export 生成）作为内存索引，启动时不再全量读取数据库
+        导出之后写入的三元组（id 大于快照头部记录的 max(id)）按 id 增量补入快照索引的增量层，
+        之后保存的知识同样写入增量层，查询结果与 load_triple_index 一致
+        :param path: 快照文件路径
+        :param batch_size: 增量补读时每批拉取的行数
+        :return: 加载成功返回True，文件不存在、无效或与数据库不一致时返回False（继续使用其他查询方式）
+        """
+        try:
+            snapshot = KnowledgeSnapshot(path)
+        except (OSError, ValueError) as e:
+            log_event(logger, logging.WARNING, "加载知识快照失败", path=path, error=e)
+            return False
+        index = SnapshotIndex(snapshot)
+        try:
+            # 指纹大于当前 max(id)：数据库被重建过，快照中可能有已不存在的知识
+            if snapshot.max_triple_id > self.backend.max_triple_id():
+                log_event(logger, logging.WARNING, "知识快照与数据库不一致，请重新导出", path=path,
+                          fingerprint=snapshot.max_triple_id)
+                index.close()
+                return False
+            replayed = 0
+            for _, entity1, relation, entity2 in self.backend.iter_triples_after(snapshot.max_triple_id, batch_size):
+                index.add(entity1, relation, entity2)
+                replayed += 1
+        except self.backend.Error as e:
+            index.close()
+            log_event(logger, logging.ERROR, "加载知识快照失败", path=path, error=e)
+            return False
+        self.triple_index = index
+        log_event(logger, logging.INFO, "知识快照已映射", path=path, triples=len(snapshot), replayed=replayed,
+                  created_at=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.created_at)))
+        return True
+
+    def load_entity_index(self, batch_size=10000):
+        """
+        从数据库流式读取全部实体（entity1 和 entity2），构建相似实体索引，之后由保存操作增量维护
+        :param batch_size: 每批拉取的行数
+        :return: 加载成功返回True，失败返回False（不启用相似实体回退）
+        """
+        index = FuzzyEntityIndex(max_distance=SYSTEM_CONFIG.get("fuzzy_max_distance", 1))
+        start = time.perf_counter()
+        try:
+            count = index.load(self.iter_entities(batch_size=batch_size))
+        except self.backend.Error as e:
+            log_event(logger, logging.ERROR, "加载相似实体索引失败", error=e)
+            return False
+        self.entity_index = index
+        log_event(logger, logging.INFO, "相似实体索引加载完成", entities=count,
+                  elapsed_s=round(time.perf_counter() - start, 3))
+        return True
+
+    def load_entity_filter(self, path=None, batch_size=10000):
+        """
+        启用实体布隆过滤器：path 指向的文件存在且与配置的容量、误判率一致时直接加载，
+        并补充加入文件生成之后新增的三元组（按 id 增量读取）；否则从数据库流式读取全部实体重建，
+        加载后写回 path（带上新的指纹），下次启动无需全量扫描
+        本进程保存的实体由 _after_save 即时加入；其他进程（或直接写库）新增的实体只能靠按 id 增量补读发现，
+        见 _refresh_entity_filter：在补读之前，这些实体的查询会被误判为不存在
+        :param path: 过滤器文件路径，默认取 SYSTEM_CONFIG["entity_filter_path"]，为空时不读写文件
+        :param batch_size: 每批拉取的行数
+        :return: 启用成功返回True，失败返回False（查询照常访问数据库）
+        """
+        path = SYSTEM_CONFIG.get("entity_filter_path", "") if path is None else path
+        expected = EntityBloomFilter(SYSTEM_CONFIG.get("entity_filter_capacity", 1_000_000),
+                                     SYSTEM_CONFIG.get("entity_filter_fpr", 0.01))
+        start = time.perf_counter()
+        try:
+            # 先取指纹再扫描：扫描期间写入的行 id 更大，下次加载时会被增量补上
+            max_id = self.backend.max_triple_id()
+            bloom = self._open_entity_filter(path, expected, max_id)
+            if bloom is not None:
+                source = "file"
+                self._catch_up_entity_filter(bloom, bloom.fingerprint - self._filter_id_margin(), batch_size)
+            else:
+                source = "database"
+                bloom = expected
+                bloom.load(self.iter_entities(batch_size=batch_size))
+        except self.backend.Error as e:
+            log_event(logger, logging.ERROR, "加载实体过滤器失败", error=e)
+            return False
+        bloom.fingerprint = max_id
+        if path:
+            try:
+                bloom.save(path)
+            except OSError as e:
+                log_event(logger, logging.WARNING, "保存实体过滤器失败", path=path, error=e)
+        self.entity_filter = bloom
+        # 启用前保存的三元组没有经过 _after_save 写入过滤器，启用后再按 id 补一次
+        try:
+            self._filter_watermark = self._catch_up_entity_filter(bloom, max_id - self._filter_id_margin(),
+                                                                  batch_size, max_id)
+        except self.backend.Error as e:
+            self.entity_filter = None
+            log_event(logger, logging.ERROR, "加载实体过滤器失败", error=e)
+            return False
+        self._filter_refreshed_at = time.monotonic()
+        log_event(logger, logging.INFO, "实体过滤器加载完成", source=source, entities=bloom.count,
+                  memory_bytes=bloom.stats()["memory_bytes"], elapsed_s=round(time.perf_counter() - start, 3))
+        return True
+
+    def _catch_up_entity_filter(self, bloom, last_id, batch_size, watermark=0):
+        """
+        把 id 大于 last_id 的三元组的实体加入过滤器（重复加入是幂等的）
+        :return: 读到的最大 id 与 watermark 中的较大者
+        """
+        for triple_id, entity1, _, entity2 in self.backend.iter_triples_after(max(0, last_id), batch_size):
+            bloom.add(entity1)
+            bloom.add(entity2)
+            watermark = max(watermark, triple_id)
+        return watermark
+
+    @staticmethod
+    def _filter_id_margin():
+        """
+        增量补读时回看的 id 数：自增 id 在插入时分配，事务却可能按其他顺序提交，
+        上次补读时尚未提交的较小 id 稍后才可见，只读 id 大于水位线的行会漏掉它们
+        """
+        return SYSTEM_CONFIG.get("entity_filter_id_margin", 1000)
+
+    def _refresh_entity_filter(self, batch_size=10000):
+        """
+        过滤器判定实体不存在时调用：距上次补读超过 entity_filter_refresh_interval 秒则按 id 增量补读
+        （从水位线回看 _filter_id_margin 个 id），把其他进程新增的实体加入过滤器
+        过滤器假设本进程是主要写入者：其他进程写入的实体最多延迟一个刷新间隔可见；
+        提交晚于回看范围的事务（期间已有超过 margin 个更大的 id 提交）中的实体要到重新加载过滤器才可见
+        :return: 本次执行了补读返回True（调用方重新判断一次）
+        """
+        interval = SYSTEM_CONFIG.get("entity_filter_refresh_interval", 1.0)
+        bloom = self.entity_filter
+        if bloom is None or not interval or time.monotonic() - self._filter_refreshed_at < interval:
+            return False
+        # 只让一个线程补读，其他线程沿用过滤器当前的判断
+        if not self._filter_refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            if time.monotonic() - self._filter_refreshed_at < interval:
+                return False
+            with METRICS.timer("entity_filter.refresh"):
+                self._filter_watermark = self._catch_up_entity_filter(
+                    bloom, self._filter_watermark - self._filter_id_margin(), batch_size, self._filter_watermark)
+            return True
+        except self.backend.Error as e:
+            log_event(logger, logging.WARNING, "实体过滤器增量补读失败", error=e)
+            return False
+        finally:
+            self._filter_refreshed_at = time.monotonic()
+            self._filter_refresh_lock.release()
+
+    @staticmethod
+    def _open_entity_filter(path, expected, max_id):
+        """
+        读取过滤器文件，文件不存在、无效、参数与配置不一致或指纹大于当前 max(id)（数据库被重建过）时返回None
+        """
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            bloom = EntityBloomFilter.open(path)
+        except (OSError, ValueError) as e:
+            log_event(logger, logging.WARNING, "实体过滤器文件无效，将重建", path=path, error=e)
+            return None
+        if (bloom.bits, bloom.hashes) != (expected.bits, expected.hashes):
+            log_event(logger, logging.INFO, "实体过滤器容量配置已变化，将重建", path=path)
+            return None
+        if bloom.fingerprint is None or bloom.fingerprint > max_id:
+            log_event(logger, logging.INFO, "实体过滤器与数据库不一致，将重建", path=path,
+                      fingerprint=bloom.fingerprint, max_id=max_id)
+            return None
+        return bloom
+
+    def _known_entity(self, entity):
+        """
+        未启用过滤器，或过滤器判断实体可能存在时返回True；返回False时实体不在过滤器已读到的数据中
+        （不在数据库中，或是其他进程在下一次增量补读之前新增的实体）
+        """
+        bloom = self.entity_filter
+        if bloom is None or entity in bloom:
+            return True
+        return self._refresh_entity_filter() and entity in bloom
+
+    def enable_write_behind(self, journal_path=None, max_batch=None, max_delay=None, max_queue=None, fsync=None):
+        """
+        启用写后模式：save_knowledge 写入本地日志并入队后立即返回，后台线程把队列合并为多行事务提交
+        日志中上次未提交的写入先重放；入队的三元组对本进程的查询立即可见
+        参数默认取 SYSTEM_CONFIG 中 write_behind_* 配置
+        :param journal_path: 日志路径，未指定且未配置时按数据库位置派生（见 default_journal_path）
+        :return: WriteBehindQueue；日志正被另一个进程使用时返回None（继续同步保存）
+        """
+        if self.write_behind is not None:
+            return self.write_behind
+        journal_path = os.path.abspath(journal_path or SYSTEM_CONFIG.get("write_behind_journal")
+                                       or self.default_journal_path())
+        queue = WriteBehindQueue(
+            self,
+            journal_path,
+            max_batch=max_batch or SYSTEM_CONFIG.get("write_behind_max_batch", 200),
+            max_delay=SYSTEM_CONFIG.get("write_behind_max_delay", 0.05) if max_delay is None else max_delay,
+            max_queue=max_queue or SYSTEM_CONFIG.get("write_behind_max_queue", 10000),
+            fsync=SYSTEM_CONFIG.get("write_behind_fsync", False) if fsync is None else fsync,
+        )
+        try:
+            self.write_behind = queue.start()
+        except JournalLockedError as e:
+            log_event(logger, logging.WARNING, "写后日志已被占用，继续同步保存", path=journal_path, error=e)
+            return None
+        log_event(logger, logging.INFO, "写后模式已启用", path=journal_path)
+        return self.write_behind
+
+    def default_journal_path(self):
+        """
+        默认写后日志路径：项目根目录下按数据库位置区分的文件，崩溃后连接同一数据库的下一次启动会重放它，
+        连接其他数据库的进程不会把它重放到错误的库中
+        :return: 绝对路径
+        """
+        digest = hashlib.sha1(self.backend.location().encode("utf-8")).hexdigest()[:12]
+        return os.path.join(PROJECT_ROOT, f"write_behind-{self.backend.name}-{digest}.journal")
+
+    def flush(self, timeout=None):
+        """
+        写后模式下等待此前保存的知识全部提交到数据库；未启用写后模式时直接返回True
+        :param timeout: 最长等待秒数，None 表示一直等待
+        :return: 全部提交返回True，超时返回False
+        """
+        if self.write_behind is None:
+            return True
+        return self.write_behind.flush(timeout)
+
+    def load_relation_aliases(self):
+        """
+        从 relation_alias 表加载关系别名映射
+        只有关系别名迁移（database/migrate_relations.py）已记录在 schema_version 中时才启用规范化：
+        表存在但已有三元组尚未改写时，查询改写为规范关系会找不到以别名保存的旧数据
+        首次查询或保存时自动调用一次
+        :return: 加载成功返回True；未迁移或出错返回False（此时关系词按原样匹配，保存知识不维护别名表）
+        """
+        self._aliases_loaded = True
+        try:
+            if not self.backend.has_schema_version(RELATION_ALIAS_SCHEMA_VERSION):
+                log_event(logger, logging.WARNING,
+                          "关系别名迁移尚未执行，关系词按原样匹配（请运行 python -m database.migrate_relations）")
+                return False
+            self.relation_normalizer.load(self.backend.load_relation_aliases())
+        except self.backend.Error as e:
+            log_event(logger, logging.WARNING, "加载关系别名失败（请运行 python -m database.migrate_relations）", error=e)
+            return False
+        self.alias_table_ready = True
+        return True
+
+    def _normalize_relation(self, relation):
+        """关系别名迁移已完成时返回规范关系，否则原样返回，保证未迁移的数据行为不变"""
+        if not self._aliases_loaded:
+            # 保存和查询必须使用同一套规范化，不能依赖调用方先调用 load_relation_aliases
+            self.load_relation_aliases()
+        if relation and self.alias_table_ready:
+            return self.relation_normalizer.canonical(relation)
+        return relation
+
+    def _use_exact_relation(self, relation):
+        """已知关系（在别名映射中）在 exact 模式下使用等值匹配，未知关系仍按子串模糊匹配"""
+        return (self.relation_match == "exact" and self.alias_table_ready and bool(relation)
+                and self.relation_normalizer.is_known(relation))
 
     def query_knowledge(self, entity1, relation):
         """
@@ -14,65 +338,169 @@ class DBOperation:
         :param relation: 关系
         :return: 实体2（答案）或None
         """
-        cursor = None
-        try:
-            cursor = self.connector.get_cursor()
-            
-            # 正向查询：entity1 → entity2
-            query_sql = """
-                SELECT entity2 FROM knowledge_triple 
-                WHERE entity1 = %s AND relation LIKE %s
-                LIMIT 1
-            """
-            # 模糊匹配关系，提升容错率
-            cursor.execute(query_sql, (entity1, f'%{relation}%'))
-            result = cursor.fetchone()
-            if result:
-                return result['entity2']
-            
-            # 反向查询：entity2 → entity1（当正向查询失败时）
-            # 例如："中国的首都是什么？" → 查询 entity2="中国的首都" 的记录，返回 entity1="北京"
-            reverse_query_sql = """
-                SELECT entity1 FROM knowledge_triple 
-                WHERE entity2 = %s AND relation LIKE %s
-                LIMIT 1
-            """
-            cursor.execute(reverse_query_sql, (entity1, f'%{relation}%'))
-            result = cursor.fetchone()
-            if result:
-                return result['entity1']
-            
-            # 如果关系为空或匹配失败，尝试无关系匹配
-            if not relation or relation.strip() == '':
-                # 正向无关系查询
-                query_sql_no_rel = """
-                    SELECT entity2 FROM knowledge_triple 
-                    WHERE entity1 = %s
-                    LIMIT 1
-                """
-                cursor.execute(query_sql_no_rel, (entity1,))
-                result = cursor.fetchone()
-                if result:
-                    return result['entity2']
-                
-                # 反向无关系查询
-                reverse_query_sql_no_rel = """
-                    SELECT entity1 FROM knowledge_triple 
-                    WHERE entity2 = %s
-                    LIMIT 1
-                """
-                cursor.execute(reverse_query_sql_no_rel, (entity1,))
-                result = cursor.fetchone()
-                if result:
-                    return result['entity1']
-            
-            return None
-        except Error as e:
-            print(f"❌ 数据库查询失败: {e}")
+        # 关系别名统一为规范关系（如 创办人 → 创始人），与保存时一致
+        relation = self._normalize_relation(relation)
+
+        # 写后队列中尚未提交的知识优先（比缓存和数据库中的结果更新）
+        if self.write_behind is not None:
+            answer = self.write_behind.lookup(entity1, relation, exact=self._use_exact_relation(relation))
+            if answer is not None:
+                return answer
+
+        # 先查答案缓存（包括"查无答案"的负缓存）
+        if self.answer_cache is not None:
+            found, answer = self.answer_cache.get(entity1, relation)
+            if found:
+                return answer
+
+        # 过滤器判定实体一定不存在（正向、反向都查不到），直接返回，不写入缓存以免挤掉有效条目
+        if not self._known_entity(entity1):
             return None
-        finally:
-            if cursor:
-                cursor.close()
+
+        # 内存索引已加载时直接查字典（索引与数据库同步写入，未命中即数据库中也不存在）
+        if self.triple_index is not None:
+            with METRICS.timer("query.index"):
+                answer = self.triple_index.lookup(entity1, relation, exact=self._use_exact_relation(relation))
+        else:
+            try:
+                with METRICS.timer("query.backend"):
+                    answer = self.backend.query_knowledge(entity1, relation, exact=self._use_exact_relation(relation))
+            except self.backend.Error as e:
+                log_event(logger, logging.ERROR, "数据库查询失败", entity1=entity1, relation=relation, error=e)
+                return None  # 查询出错不写入缓存
+
+        if self.answer_cache is not None:
+            self.answer_cache.put(entity1, relation, answer)
+        return answer
+
+    def query_similar(self, entity1, relation, max_distance=None, max_candidates=None):
+        """
+        相似实体回退：entity1 不是已知实体（拼写错误、全角字符、多余空格等）时，
+        按编辑距离从近到远依次用相似实体查询，返回第一个有答案的结果
+        已知实体不做回退，避免把"查无此关系"误答为另一个相似实体的答案
+        :param max_distance: 编辑距离上限，默认取系统配置（不超过构建索引时的上限）
+        :param max_candidates: 最多尝试的相似实体数，默认取系统配置
+        :return: (相似实体, 答案)，没有可用的相似实体时返回 (None, None)
+        """
+        if self.entity_index is None or not entity1 or entity1 in self.entity_index:
+            return None, None
+        max_distance = SYSTEM_CONFIG.get("fuzzy_max_distance", 1) if max_distance is None else max_distance
+        max_candidates = max_candidates or SYSTEM_CONFIG.get("fuzzy_max_candidates", 3)
+        with METRICS.timer("query.similar"):
+            candidates = self.entity_index.search(entity1, max_distance=max_distance, limit=max_candidates)
+        for candidate, _ in candidates:
+            answer = self.query_knowledge(candidate, relation)
+            if answer:
+                return candidate, answer
+        return None, None
+
+    def query_knowledge_batch(self, keys, chunk_size=None):
+        """
+        批量查询多个 (entity1, relation) 的答案，结果与逐个调用 query_knowledge 一致
+        未命中缓存/内存索引的键按实体分块，用 IN 列表一次取回相关三元组，再在内存中按原查询语义求解
+        :param keys: 可迭代的 (entity1, relation)
+        :param chunk_size: 每条 IN 查询包含的实体数，默认取系统配置
+        :return: {(entity1, relation): 答案或None}；查询出错的键不在结果中
+        """
+        chunk_size = chunk_size or SYSTEM_CONFIG.get("batch_query_chunk", 500)
+        results = {}
+        pending = {}  # (entity1, 规范关系) → [原始键, ...]
+        for key in set(keys):
+            entity1, relation = key
+            relation = self._normalize_relation(relation)
+            if self.write_behind is not None:
+                answer = self.write_behind.lookup(entity1, relation, exact=self._use_exact_relation(relation))
+                if answer is not None:
+                    results[key] = answer
+                    continue
+            if self.answer_cache is not None:
+                found, answer = self.answer_cache.get(entity1, relation)
+                if found:
+                    results[key] = answer
+                    continue
+            if not self._known_entity(entity1):
+                results[key] = None
+                continue
+            pending.setdefault((entity1, relation), []).append(key)
+
+        if not pending:
+            return results
+
+        if self.triple_index is not None:
+            index = self.triple_index
+        else:
+            try:
+                index = self._fetch_entity_triples({entity1 for entity1, _ in pending}, chunk_size)
+            except self.backend.Error as e:
+                log_event(logger, logging.ERROR, "数据库批量查询失败", entities=len(pending), error=e)
+                return results
+
+        for (entity1, relation), original_keys in pending.items():
+            answer = index.lookup(entity1, relation, exact=self._use_exact_relation(relation))
+            if self.answer_cache is not None:
+                self.answer_cache.put(entity1, relation, answer)
+            for key in original_keys:
+                results[key] = answer
+        return results
+
+    def query_paths(self, paths, max_hops=None, time_budget=None):
+        """
+        多跳查询：沿关系链逐跳求解，例如 ("Python", ["创始人", "国籍"]) 先查 Python 的创始人，再查其国籍
+        每一跳把所有路径当前节点的 (节点, 关系) 合并为一次 query_knowledge_batch（与逐个 query_knowledge 语义一致），
+        同一次调用内重复出现的 (节点, 关系) 只查询一次
+        :param paths: [(entity, [relation, ...]), ...]
+        :param max_hops: 关系链长度上限，超过上限的路径不查询，默认取系统配置
+        :param time_budget: 整次调用的时间预算（秒），每一跳开始前检查，超时后未完成的路径结果为None；0 表示不限制
+        :return: (answers, stats)
+                 - answers: 与 paths 顺序一致的最终答案，任何一跳查无结果时为None
+                 - stats: {"hops": 执行的跳数, "lookups": 实际查询的键数, "memo_hits": 复用的键数, "timed_out": 是否超时}
+        """
+        max_hops = max_hops or SYSTEM_CONFIG.get("path_query_max_hops", 4)
+        time_budget = SYSTEM_CONFIG.get("path_query_time_budget", 0.5) if time_budget is None else time_budget
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        stats = {"hops": 0, "lookups": 0, "memo_hits": 0, "timed_out": False}
+
+        # 每条路径的当前节点，None 表示已中断（查无结果或超过跳数上限）
+        nodes = [entity if relations and len(relations) <= max_hops else None for entity, relations in paths]
+        memo = {}  # (节点, 关系) → 答案，本次调用内复用
+        longest = max((len(relations) for _, relations in paths if len(relations) <= max_hops), default=0)
+        for hop in range(longest):
+            active = [i for i, (_, relations) in enumerate(paths) if nodes[i] is not None and hop < len(relations)]
+            if not active:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                stats["timed_out"] = True
+                for i in active:
+                    nodes[i] = None
+                break
+            keys = {(nodes[i], paths[i][1][hop]) for i in active}
+            pending = [key for key in keys if key not in memo]
+            stats["memo_hits"] += len(keys) - len(pending)
+            if pending:
+                with METRICS.timer("query.path_hop"):
+                    answers = self.query_knowledge_batch(pending)
+                for key in pending:
+                    # 查询出错的键不在结果中，按查无结果处理
+                    memo[key] = answers.get(key)
+                stats["lookups"] += len(pending)
+            stats["hops"] += 1
+            for i in active:
+                nodes[i] = memo[(nodes[i], paths[i][1][hop])] or None
+        return nodes, stats
+
+    def _fetch_entity_triples(self, entities, chunk_size):
+        """
+        取回以这些实体为 entity1 或 entity2 的全部三元组，构建一个临时内存索引
+        每个分块只需两条 IN 查询（正向、反向），与键的数量无关
+        IN 按数据库排序规则匹配（会取回大小写不同的实体），TripleIndex 同样按 fold_key 归一化后的键查找，
+        因此批量结果与逐个 query_knowledge 一致
+        :return: 仅包含相关三元组的 TripleIndex
+        """
+        index = TripleIndex()
+        for entity1, relation, entity2 in self.backend.iter_entity_triples(entities, chunk_size):
+            index.add(entity1, relation, entity2)
+        index.loaded = True
+        return index
 
     def save_knowledge(self, entity1, relation, entity2):
         """
@@ -80,51 +508,182 @@ class DBOperation:
         :param entity1: 实体1
         :param relation: 关系
         :param entity2: 实体2（答案）
-        :return: 保存成功返回True，失败返回False
+        :return: 保存成功返回True，失败返回False；写后模式下入队即返回True
         """
-        cursor = None
+        if self.write_behind is not None:
+            return self.write_behind.submit(entity1, relation, entity2)
+        # 关系别名统一保存为规范关系，查询时才能走等值匹配
+        raw_relation = relation
+        relation = self._normalize_relation(relation)
+        new_alias = self.alias_table_ready and not self.relation_normalizer.is_known(raw_relation)
         try:
-            cursor = self.connector.get_cursor(dictionary=False)
-            insert_sql = """
-                INSERT INTO knowledge_triple (entity1, relation, entity2, create_time)
-                VALUES (%s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE entity2 = %s, create_time = %s
-            """
-            now = datetime.now()
-            cursor.execute(
-                insert_sql,
-                (entity1, relation, entity2, now, entity2, now)
-            )
-            self.connector.connection.commit()
-            print(f"✅ 知识点已保存：{entity1} - {relation} - {entity2}")
+            # 新关系词登记为自身的规范关系，与三元组在同一事务中提交
+            self.backend.save_knowledge(entity1, relation, entity2,
+                                        alias=(raw_relation, relation) if new_alias else None)
+            if new_alias:
+                self.relation_normalizer.register(raw_relation, relation)
+            self._after_save(entity1, relation, entity2)
+            # 每次保存都会经过这里，级别未启用时不构建字段
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("知识点已保存", extra={"fields": {"entity1": entity1, "relation": relation, "entity2": entity2}})
             return True
-        except Error as e:
-            self.connector.connection.rollback()
-            print(f"❌ 数据库保存失败: {e}")
+        except self.backend.Error as e:
+            log_event(logger, logging.ERROR, "数据库保存失败", entity1=entity1, relation=relation, error=e)
             return False
-        finally:
-            if cursor:
-                cursor.close()
+
+    def _after_save(self, entity1, relation, entity2):
+        """三元组提交后同步内存结构：写穿内存索引、相似实体索引和实体过滤器，失效相关缓存，通知 save_listeners"""
+        # 写穿内存索引，保证新知识立即可查
+        if self.triple_index is not None:
+            self.triple_index.add(entity1, relation, entity2)
+        self._after_enqueue(entity1, relation, entity2)
+
+    def _after_enqueue(self, entity1, relation, entity2):
+        """
+        三元组已提交或已进入写后队列（relation 为规范关系）：实体加入相似实体索引和实体过滤器，失效相关缓存，
+        通知 save_listeners；写后模式下入队和提交时各执行一次，均为幂等操作
+        """
+        if self.entity_index is not None:
+            self.entity_index.add(entity1)
+            self.entity_index.add(entity2)
+        if self.entity_filter is not None:
+            self.entity_filter.add(entity1)
+            self.entity_filter.add(entity2)
+        # 新知识可能同时影响正向（entity1）和反向（entity2）查询的缓存结果
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate_entity(entity1)
+            self.answer_cache.invalidate_entity(entity2)
+        for listener in self.save_listeners:
+            listener(entity1, relation, entity2)
+
+    def bulk_save_knowledge(self, triples, batch_size=1000, start_offset=0,
+                            progress_callback=None, error_callback=None):
+        """
+        批量导入知识三元组：多行 executemany 写入，每批提交一次
+        单批写入失败时回滚并逐行重试，只跳过出错的行，不中断整个导入
+        :param triples: 可迭代的 (entity1, relation, entity2)，可以是生成器（流式读取，不整体加载）
+        :param batch_size: 每批写入并提交的行数
+        :param start_offset: 跳过前 start_offset 行（用于断点续传）
+        :param progress_callback: 每批提交后调用 progress_callback(stats)，stats 同返回值
+        :param error_callback: 出错行回调 error_callback(offset, item, message)，offset 为该行在输入中的序号
+        :return: 统计信息 {"offset", "saved", "failed", "batches", "elapsed", "rows_per_sec"}
+                 offset 为下一个待处理行的序号，可作为续传的 start_offset
+        :raises backend.Error: 数据库不可用时抛出，此前已提交的批次已通过 progress_callback 报告
+        """
+        stats = {"offset": start_offset, "saved": 0, "failed": 0, "batches": 0,
+                 "elapsed": 0.0, "rows_per_sec": 0.0}
+        start = time.perf_counter()
+        batch = []  # [(offset, (entity1, relation, entity2)), ...]
+
+        def report_error(offset, item, message):
+            stats["failed"] += 1
+            if error_callback:
+                error_callback(offset, item, message)
+
+        reported = [start_offset]
+
+        def flush():
+            if not batch and stats["offset"] == reported[0]:
+                return
+            if batch:
+                saved = self._save_batch(batch, report_error)
+                stats["saved"] += saved
+                stats["batches"] += 1
+                stats["offset"] = max(stats["offset"], batch[-1][0] + 1)
+                batch.clear()
+            reported[0] = stats["offset"]
+            stats["elapsed"] = time.perf_counter() - start
+            processed = stats["offset"] - start_offset
+            stats["rows_per_sec"] = processed / stats["elapsed"] if stats["elapsed"] else 0.0
+            if progress_callback:
+                progress_callback(dict(stats))
+
+        for offset, item in enumerate(triples):
+            if offset < start_offset:
+                continue
+            if (not isinstance(item, (tuple, list)) or len(item) != 3
+                    or not all(isinstance(v, str) and v.strip() for v in item)):
+                report_error(offset, item, "格式错误：需要非空的 (entity1, relation, entity2)")
+                stats["offset"] = offset + 1
+                continue
+            batch.append((offset, tuple(v.strip() for v in item)))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        return stats
+
+    def _save_batch(self, batch, report_error):
+        """
+        写入一批三元组并提交
+        :param batch: [(offset, (entity1, relation, entity2)), ...]
+        :param report_error: 出错行回调
+        :return: 成功写入的行数
+        """
+        rows = []
+        new_aliases = {}
+        for offset, (entity1, relation, entity2) in batch:
+            canonical = self._normalize_relation(relation)
+            if self.alias_table_ready and not self.relation_normalizer.is_known(relation):
+                new_aliases[relation] = canonical
+            rows.append((offset, (entity1, canonical, entity2)))
+        # 整批失败时由后端逐行重试，出错的行交给 report_error
+        saved_rows = self.backend.save_batch(rows, new_aliases, report_error)
+
+        for alias, canonical in new_aliases.items():
+            self.relation_normalizer.register(alias, canonical)
+        for _, (entity1, relation, entity2) in saved_rows:
+            self._after_save(entity1, relation, entity2)
+        return len(saved_rows)
 
     def get_all_relations(self):
         """
         获取数据库中所有不重复的关系词列表
         :return: 关系词列表
         """
-        cursor = None
         try:
-            cursor = self.connector.get_cursor()
-            query_sql = "SELECT DISTINCT relation FROM knowledge_triple ORDER BY relation"
-            cursor.execute(query_sql)
-            results = cursor.fetchall()
-            return [row['relation'] for row in results] if results else []
-        except Error as e:
-            print(f"❌ 获取关系词列表失败: {e}")
+            return self.backend.get_all_relations()
+        except self.backend.Error as e:
+            log_event(logger, logging.ERROR, "获取关系词列表失败", error=e)
             return []
-        finally:
-            if cursor:
-                cursor.close()
+
+    def iter_triples(self, batch_size=10000):
+        """
+        分批遍历数据库中的全部三元组（不一次性加载到内存）
+        遍历期间占用后端的一个连接，生成器结束或关闭时归还
+        :param batch_size: 每批拉取的行数
+        :return: 生成器，逐个产出 (entity1, relation, entity2)
+        """
+        yield from self.backend.iter_triples(batch_size)
+
+    def export_triples(self, after_id=0, until_id=None, batch_size=10000):
+        """
+        按 id 顺序流式导出三元组（主键分页，每批一次短查询，不占用长事务，内存与表大小无关）
+        :param after_id: 只导出 id 大于 after_id 的三元组（断点续传时传入上次导出的最大 id）
+        :param until_id: 只导出 id 不超过 until_id 的三元组，为空时取开始导出时的最大 id，
+                         导出期间新增的三元组不在本次导出范围内
+        :param batch_size: 每批拉取的行数
+        :return: 生成器，逐个产出 (id, entity1, relation, entity2)
+        """
+        if until_id is None:
+            until_id = self.backend.max_triple_id()
+        for row in self.backend.iter_triples_after(after_id, batch_size):
+            if row[0] > until_id:
+                return
+            yield row
+
+    def iter_entities(self, batch_size=10000):
+        """
+        分批遍历全部三元组的 entity1 和 entity2（可能重复），用于构建各类实体索引
+        :return: 生成器，逐个产出实体
+        """
+        for entity1, _, entity2 in self.backend.iter_triples(batch_size):
+            yield entity1
+            yield entity2
 
     def close(self):
-        """关闭数据库连接"""
-        self.connector.close()
\ No newline at end of file
+        """提交写后队列中的剩余写入，关闭存储后端（数据库连接池或 SQLite 连接）和内存索引"""
+        if self.write_behind is not None:
+            self.write_behind.close(timeout=SYSTEM_CONFIG.get("write_behind_close_timeout", 30))
+        if self.triple_index is not None:
+            self.triple_index.close()
+        self.backend.close()
@@ -0,0 +1,156 @@
+# 实体布隆过滤器：记录 knowledge_triple 中出现过的全部实体，"一定不存在"的实体查询无需访问数据库
+import math
+import os
+import struct
+import threading
+import time
+import unicodedata
+from hashlib import blake2b
+
+MAGIC = b"KQBF"
+VERSION = 1
+# 文件头：魔数、版本、哈希函数个数、位数、容量、已加入次数、目标误判率、数据库指纹（max(id)，-1 表示未知）、生成时间
+_HEADER = struct.Struct("<4sHHQQQdqd")
+# 每个字节中置位的个数，用于加载后统计已置位的位数
+_POPCOUNT = bytes(bin(i).count("1") for i in range(256))
+
+
+def fold_entity(text):
+    """
+    按数据库排序规则归一化实体，作为过滤器的键
+    MySQL utf8mb4_unicode_ci / SQLite NOCASE 下大小写、全半角、重音不同的实体被视为相等，
+    过滤器的键必须至少同样宽松，否则会把数据库能查到的实体误判为不存在
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ''.join(stripped.split()).casefold()
+
+
+class EntityBloomFilter:
+    def __init__(self, capacity=1_000_000, false_positive_rate=0.01, bits=None, hashes=None):
+        """
+        :param capacity: 预计的实体数量，实体数超过容量后误判率随之上升
+        :param false_positive_rate: 容量内的目标误判率
+        :param bits: 位数组大小（从文件加载时使用），默认按容量和误判率计算
+        :param hashes: 哈希函数个数（从文件加载时使用），默认按容量和位数计算
+        """
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.bits = bits or max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self._set_bits = 0
+        self.count = 0  # 新置位的加入次数，约等于不同实体数（重复实体和被误判为已存在的实体不计）
+        # 文件对应的数据库指纹：生成时 knowledge_triple 的 max(id)，之后新增的行需要补充加入
+        self.fingerprint = None
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+        # 查询统计
+        self.checks = 0
+        self.negatives = 0
+
+    def _positions(self, key):
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def add(self, entity):
+        """
+        加入一个实体
+        :return: 至少新置位一位时返回True（实体此前一定不在过滤器中）
+        """
+        if not entity:
+            return False
+        positions = self._positions(fold_entity(entity))
+        array = self._array
+        with self._lock:
+            added = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not array[position >> 3] & mask:
+                    array[position >> 3] |= mask
+                    self._set_bits += 1
+                    added = True
+            if added:
+                self.count += 1
+            return added
+
+    def load(self, entities):
+        """批量加入实体，返回加入后的计数"""
+        for entity in entities:
+            self.add(entity)
+        return self.count
+
+    def __contains__(self, entity):
+        """实体可能存在返回True；返回False时实体一定不存在"""
+        if not entity:
+            return False
+        array = self._array
+        self.checks += 1
+        for position in self._positions(fold_entity(entity)):
+            if not array[position >> 3] & (1 << (position & 7)):
+                self.negatives += 1
+                return False
+        return True
+
+    def estimated_false_positive_rate(self):
+        """按当前置位比例估计的误判率：(已置位位数 / 总位数) ^ 哈希函数个数"""
+        return (self._set_bits / self.bits) ** self.hashes
+
+    def stats(self):
+        """返回过滤器统计：容量、实体数、内存占用、置位比例、估计误判率和查询拦截数"""
+        return {
+            "capacity": self.capacity,
+            "entities": self.count,
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "memory_bytes": len(self._array),
+            "fill_ratio": self._set_bits / self.bits,
+            "target_false_positive_rate": self.false_positive_rate,
+            "estimated_false_positive_rate": self.estimated_false_positive_rate(),
+            "checks": self.checks,
+            "negatives": self.negatives,
+            "fingerprint": self.fingerprint,
+        }
+
+    def save(self, path):
+        """写入文件（先写临时文件再替换，避免读到写了一半的文件）"""
+        fingerprint = -1 if self.fingerprint is None else self.fingerprint
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            header = _HEADER.pack(MAGIC, VERSION, self.hashes, self.bits, self.capacity, self.count,
+                                  self.false_positive_rate, fingerprint, self.created_at)
+            data = bytes(self._array)
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        从文件加载过滤器
+        :raises ValueError: 文件格式或版本不正确
+        """
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError(f"{path} 不是有效的实体过滤器文件")
+            magic, version, hashes, bits, capacity, count, rate, fingerprint, created_at = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} 不是有效的实体过滤器文件")
+            if version != VERSION:
+                raise ValueError(f"不支持的实体过滤器版本 {version}（当前版本 {VERSION}）")
+            data = f.read()
+        if len(data) != (bits + 7) // 8:
+            raise ValueError(f"{path} 已损坏：位数组长度不符")
+        bloom = cls(capacity, rate, bits=bits, hashes=hashes)
+        bloom._array = bytearray(data)
+        bloom._set_bits = sum(data.translate(_POPCOUNT))
+        bloom.count = count
+        bloom.fingerprint = None if fingerprint < 0 else fingerprint
+        bloom.created_at = created_at
+        return bloom
@@ -0,0 +1,294 @@
+# 相似实体索引：删除邻域（deletion neighborhood）+ 有界编辑距离，查询未命中时找出拼写相近的已知实体
+import bisect
+import threading
+import unicodedata
+from array import array
+from itertools import chain
+
+_HASH_MASK = 0xFFFFFFFF
+# 排序时按哈希最高 6 位分桶，逐桶排序，百万级实体编译时不必一次性生成完整的 Python 整数列表
+_SORT_BUCKET_SHIFT = 58
+
+
+def normalize_entity(text):
+    """
+    实体规范化：全角转半角（NFKC）、去掉所有空白、英文转小写
+    例如 "Ｐｙｔｈｏｎ" / "py thon" / "PYTHON" 都规范化为 "python"
+    """
+    if not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
+    return ''.join(text.split()).lower()
+
+
+def deletion_variants(key, depth):
+    """返回 key 删除不超过 depth 个字符得到的全部字符串（含 key 本身）"""
+    if depth == 1:
+        variants = {key[:i] + key[i + 1:] for i in range(len(key))}
+        variants.add(key)
+        return variants
+    variants = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {s[:i] + s[i + 1:] for s in frontier for i in range(len(s))}
+        variants |= frontier
+    return variants
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """
+    计算编辑距离，超过 max_distance 时提前结束
+    :return: 编辑距离，超出上限时返回None
+    """
+    length_a, length_b = len(a), len(b)
+    if abs(length_a - length_b) > max_distance:
+        return None
+    if a == b:
+        return 0
+    if max_distance == 1:
+        # 距离 1 只可能是一次替换（等长）或一次插入/删除（长度差 1），直接比较公共前后缀
+        if length_a == length_b:
+            return 1 if sum(x != y for x, y in zip(a, b)) == 1 else None
+        if length_a < length_b:
+            a, b = b, a
+        prefix = 0
+        for x, y in zip(a, b):
+            if x != y:
+                break
+            prefix += 1
+        return 1 if a[prefix + 1:] == b[prefix:] else None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class FuzzyEntityIndex:
+    def __init__(self, max_distance=1):
+        """
+        已知实体的相似度索引
+        编辑距离不超过 k 的两个字符串，各自删除不超过 k 个字符后必有一个公共串，
+        因此为每个实体登记其删除邻域，查询时只需查找查询串的删除邻域，候选再用有界编辑距离校验
+        删除邻域按 32 位哈希存放在排序的 array('Q')（哈希 << 32 | 实体编号）中，二分查找；
+        之后加入的实体放在增量字典中，compact() 时合并
+        :param max_distance: 支持的最大编辑距离；每个长度为 L 的实体约登记 L^k 个删除串，通常取 1
+        """
+        self.max_distance = max_distance
+        self._keys = []  # 编号 → 规范化字符串（与原始实体相同时复用同一对象）
+        self._originals = []  # 编号 → 第一次出现的原始实体
+        self._variants = {}  # 编号 → 其余规范化后相同的原始实体（少见，单独存放）
+        self._compiled = array('Q')  # 已排序的 (删除串哈希 << 32 | 编号)
+        self._delta = {}  # 删除串哈希 → [编号, ...]，compact() 之后加入的实体
+        self._delta_size = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def load(self, entities):
+        """
+        批量加载实体并编译（重复实体自动忽略）
+        删除串直接写入 array 后一次排序，不经过增量字典，加载百万级实体时内存占用更低
+        :param entities: 可迭代的实体字符串，可以是生成器
+        :return: 加载后的实体数量
+        """
+        loader = self.loader()
+        loader.feed(entities)
+        return loader.finish()
+
+    def loader(self):
+        """
+        分批加载：返回 EntityLoader，多次 feed(entities) 后调用 finish() 编译，结果与一次 load 全部实体相同
+        供无法提供同步可迭代对象的调用方使用（例如异步逐批读取数据库），不必先把全部实体收集到列表中；
+        finish() 之前新实体查不到，应在发布索引之前完成加载
+        """
+        return EntityLoader(self)
+
+    @staticmethod
+    def _merge_buckets(buckets):
+        """逐桶排序并拼接为完整的排序数组（桶按哈希高位划分，拼接后整体有序）"""
+        compiled = array('Q')
+        for index, bucket in enumerate(buckets):
+            compiled.extend(sorted(bucket))
+            buckets[index] = None  # 尽早释放已排序的桶
+        return compiled
+
+    def _find_key(self, key):
+        """返回规范化字符串 key 的编号，不存在时返回None"""
+        keys = self._keys
+        for entity_id in self._lookup(hash(key) & _HASH_MASK):
+            if keys[entity_id] == key:
+                return entity_id
+        return None
+
+    def _lookup(self, key_hash):
+        """返回删除串哈希为 key_hash 的全部实体编号（可能含哈希冲突，由调用方校验）"""
+        compiled = self._compiled
+        low = key_hash << 32
+        position = bisect.bisect_left(compiled, low)
+        high = low | _HASH_MASK
+        ids = []
+        while position < len(compiled) and compiled[position] <= high:
+            ids.append(compiled[position] & _HASH_MASK)
+            position += 1
+        delta = self._delta.get(key_hash)
+        if delta:
+            ids.extend(delta)
+        return ids
+
+    def add(self, entity):
+        """
+        加入一个实体（已存在时不变），代价 O(len(entity) ^ max_distance)
+        :return: 新加入返回True
+        """
+        if not entity:
+            return False
+        key = normalize_entity(entity)
+        if not key:
+            return False
+        with self._lock:
+            entity_id = self._find_key(key)
+            if entity_id is not None:
+                return self._add_variant(entity_id, entity)
+            entity_id = len(self._keys)
+            # 先写入字符串再登记删除串：并发查询从删除串查到的编号一定已有对应字符串
+            self._keys.append(entity if key == entity else key)
+            self._originals.append(entity)
+            for variant in deletion_variants(key, self.max_distance):
+                self._delta.setdefault(hash(variant) & _HASH_MASK, []).append(entity_id)
+                self._delta_size += 1
+            self._count += 1
+            return True
+
+    def _add_variant(self, entity_id, entity):
+        """规范化后与已有实体相同（如全角/半角、空格差异），只记录原始写法"""
+        if entity in self._entities(entity_id):
+            return False
+        self._variants.setdefault(entity_id, []).append(entity)
+        self._count += 1
+        return True
+
+    def compact(self):
+        """把增量字典合并进排序数组（运行期间增量加入的实体较多时，可在空闲时调用）"""
+        with self._lock:
+            if not self._delta:
+                return
+            buckets = [array('Q') for _ in range(1 << (64 - _SORT_BUCKET_SHIFT))]
+            for packed in chain(self._compiled, (key_hash << 32 | entity_id for key_hash, ids in self._delta.items()
+                                                 for entity_id in ids)):
+                buckets[packed >> _SORT_BUCKET_SHIFT].append(packed)
+            # 先构建完整的新数组再替换引用，替换前的查询仍读取旧数组和增量字典
+            self._compiled = self._merge_buckets(buckets)
+            self._delta = {}
+            self._delta_size = 0
+
+    def __contains__(self, entity):
+        if not entity:
+            return False
+        entity_id = self._find_key(normalize_entity(entity))
+        return entity_id is not None and entity in self._entities(entity_id)
+
+    def __len__(self):
+        return self._count
+
+    def _entities(self, entity_id):
+        extra = self._variants.get(entity_id)
+        return [self._originals[entity_id]] + extra if extra else [self._originals[entity_id]]
+
+    def search(self, text, max_distance=None, limit=5):
+        """
+        查找与 text 规范化后编辑距离不超过 max_distance 的已知实体
+        :param text: 查询实体
+        :param max_distance: 编辑距离上限（按规范化后的字符计算），不超过构建时的 max_distance
+        :param limit: 最多返回的实体数
+        :return: [(实体, 编辑距离), ...]，按距离从小到大排列，不包含 text 本身
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        key = normalize_entity(text)
+        if not key:
+            return []
+        keys = self._keys
+        seen = set()
+        matches = []
+        for variant in deletion_variants(key, max_distance):
+            for entity_id in self._lookup(hash(variant) & _HASH_MASK):
+                if entity_id in seen:
+                    continue
+                seen.add(entity_id)
+                distance = bounded_levenshtein(key, keys[entity_id], max_distance)
+                if distance is not None:
+                    matches.extend((entity, distance) for entity in self._entities(entity_id) if entity != text)
+        matches.sort(key=lambda item: (item[1], item[0]))
+        return matches[:limit]
+
+    def stats(self):
+        """返回索引统计：实体数、规范化后的不同字符串数、删除串条目数（已编译 / 增量）和排序数组占用"""
+        return {
+            "entities": self._count,
+            "keys": len(self._keys),
+            "max_distance": self.max_distance,
+            "compiled_entries": len(self._compiled),
+            "delta_entries": self._delta_size,
+            "compiled_mb": len(self._compiled) * self._compiled.itemsize / 1024 / 1024,
+        }
+
+
+class EntityLoader:
+    """FuzzyEntityIndex 的分批加载器，见 FuzzyEntityIndex.loader"""
+
+    def __init__(self, index):
+        self._index = index
+        self._loaded = {}  # 本次加载的规范化字符串 → 编号（此时尚未写入排序数组，查不到）
+        self._buckets = [array('Q') for _ in range(1 << (64 - _SORT_BUCKET_SHIFT))]
+
+    def feed(self, entities):
+        """
+        加入一批实体：登记字符串，删除串写入待排序的分桶
+        :param entities: 可迭代的实体字符串
+        """
+        index = self._index
+        loaded = self._loaded
+        buckets = self._buckets
+        depth = index.max_distance
+        with index._lock:
+            indexed = bool(index._compiled or index._delta)
+            for entity in entities:
+                if not entity:
+                    continue
+                key = normalize_entity(entity)
+                if not key:
+                    continue
+                entity_id = loaded.get(key)
+                if entity_id is None and indexed:
+                    entity_id = index._find_key(key)
+                if entity_id is not None:
+                    index._add_variant(entity_id, entity)
+                    continue
+                entity_id = len(index._keys)
+                loaded[key] = entity_id
+                index._keys.append(entity if key == entity else key)
+                index._originals.append(entity)
+                index._count += 1
+                for variant in deletion_variants(key, depth):
+                    packed = (hash(variant) & _HASH_MASK) << 32 | entity_id
+                    buckets[packed >> _SORT_BUCKET_SHIFT].append(packed)
+
+    def finish(self):
+        """
+        与已编译的删除串一起排序，替换排序数组
+        :return: 加载后的实体数量
+        """
+        index = self._index
+        buckets, self._buckets = self._buckets, None
+        with index._lock:
+            for packed in index._compiled:
+                buckets[packed >> _SORT_BUCKET_SHIFT].append(packed)
+            index._compiled = index._merge_buckets(buckets)
+            self._loaded = None
+            return index._count
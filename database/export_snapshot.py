@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识快照导出脚本
+================
+
+把 knowledge_triple 导出为知识快照（格式见 database/knowledge_snapshot.py），
+在 SYSTEM_CONFIG["snapshot_path"] 中配置后，QAEngine 启动时直接映射快照，不再全量读取数据库。
+批量导入大量知识后应重新导出；导出过程原子替换文件，正在运行的进程不受影响。
+
+使用方式（在项目根目录下）：
+    python -m database.export_snapshot export [--output knowledge.snap]
+    python -m database.export_snapshot info knowledge.snap
+
+作者: Knowledge QA System
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from database.db_operation import DBOperation
+from database.knowledge_snapshot import KnowledgeSnapshot, VERSION, write_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="知识快照导出/查看")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="从数据库导出快照")
+    export_parser.add_argument("--output", default="knowledge.snap", help="输出文件路径")
+    export_parser.add_argument("--batch-size", type=int, default=10000, help="每批从数据库拉取的行数")
+    info_parser = subparsers.add_parser("info", help="查看快照信息")
+    info_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        db = DBOperation()
+        start = time.perf_counter()
+        try:
+            # 先取指纹再扫描：扫描期间写入的行 id 更大，加载快照时会被增量补上
+            max_id = db.backend.max_triple_id()
+            count = write_snapshot(db.iter_triples(batch_size=args.batch_size), args.output, max_triple_id=max_id)
+        except db.backend.Error as e:
+            print(f"❌ 导出快照失败: {e}")
+            sys.exit(1)
+        finally:
+            db.close()
+        print(f"✅ 快照已导出到 {args.output}：{count} 个知识点，"
+              f"{os.path.getsize(args.output)} 字节，耗时 {time.perf_counter() - start:.1f} 秒")
+    else:
+        try:
+            snapshot = KnowledgeSnapshot(args.path)
+        except (OSError, ValueError) as e:
+            print(f"❌ 无法读取快照: {e}")
+            sys.exit(1)
+        print(f"📄 {args.path}（版本 {VERSION}）")
+        print(f"   生成时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.created_at))}")
+        print(f"   知识点 {snapshot.triple_count} 个，字符串 {snapshot.string_count} 个，"
+              f"关系 {snapshot.relation_count} 个")
+        print(f"   导出时 max(id): {snapshot.max_triple_id}")
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
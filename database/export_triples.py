@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识流式导出脚本
+================
+
+按主键分页（WHERE id > 上一批最大 id）流式读取 knowledge_triple，写入备份/迁移文件，
+内存占用与表大小无关，千万级表也不需要一次性读入。
+
+输出格式：
+- csv：表头 entity1,relation,entity2，可直接用 database.bulk_import 导入
+- jsonl：每行 {"id", "entity1", "relation", "entity2"}，同样可用 database.bulk_import 导入
+- columnar：分块列式压缩格式，每块 --batch-size 行，id 列差分编码、三个字符串列分别连续存放后整体 zlib 压缩，
+  用 iter_columnar 逐块读回
+
+文件格式（columnar，版本 1，小端）：
+    头部：魔数 "KQACOLS\\0" + uint32 版本
+    数据块（重复）：uint32 行数、uint32 压缩后长度、zlib(块数据)
+    块数据：uint64[行数] id 差分（第一个为 id 本身）、uint32[行数 × 3] 三列各行的 UTF-8 字节长度、
+           entity1 列数据、relation 列数据、entity2 列数据
+
+断点续传：每写完一块，把最后导出的 id、已导出行数和文件长度原子写入断点文件（JSON）。
+--resume 时先把输出文件截断到断点记录的长度（丢弃中断时写了一半的块），再从该 id 之后继续。
+导出范围为开始导出时的最大 id（记录在断点文件中，续传时不变），导出期间新增的三元组不包含在内。
+
+使用方式（在项目根目录下）：
+    python -m database.export_triples export backup.csv
+    python -m database.export_triples export backup.cols --format columnar --batch-size 50000 --resume
+    python -m database.export_triples info backup.cols
+
+作者: Knowledge QA System
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from database.db_operation import DBOperation
+
+MAGIC = b"KQACOLS\x00"
+VERSION = 1
+HEADER_FORMAT = "<8sI"
+CHUNK_FORMAT = "<II"
+CSV_HEADER = ['entity1', 'relation', 'entity2']
+FORMATS = ("csv", "jsonl", "columnar")
+
+
+def _little_endian(values):
+    """array 使用本机字节序，文件统一为小端"""
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(row[1:] for row in rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def encode_jsonl(rows):
+    return ''.join(
+        json.dumps({"id": id_, "entity1": e1, "relation": rel, "entity2": e2}, ensure_ascii=False) + '\n'
+        for id_, e1, rel, e2 in rows
+    ).encode('utf-8')
+
+
+def encode_columnar(rows, level=6):
+    """把一批 (id, entity1, relation, entity2) 编码为一个压缩数据块"""
+    ids = array("Q")
+    previous = 0
+    for row in rows:
+        ids.append(row[0] - previous)
+        previous = row[0]
+    lengths = array("I")
+    columns = []
+    for column in range(1, 4):
+        encoded = [row[column].encode('utf-8') for row in rows]
+        lengths.extend(len(value) for value in encoded)
+        columns.append(b''.join(encoded))
+    payload = b''.join([_little_endian(ids).tobytes(), _little_endian(lengths).tobytes()] + columns)
+    compressed = zlib.compress(payload, level)
+    return struct.pack(CHUNK_FORMAT, len(rows), len(compressed)) + compressed
+
+
+def decode_columnar(count, payload):
+    """解码一个数据块，返回 [(id, entity1, relation, entity2), ...]"""
+    ids = array("Q")
+    ids.frombytes(payload[:count * 8])
+    lengths = array("I")
+    lengths.frombytes(payload[count * 8:count * 20])
+    _little_endian(ids)
+    _little_endian(lengths)
+    position = count * 20
+    columns = []
+    for column in range(3):
+        values = []
+        for length in lengths[column * count:(column + 1) * count]:
+            values.append(payload[position:position + length].decode('utf-8'))
+            position += length
+        columns.append(values)
+    rows = []
+    current = 0
+    for i, delta in enumerate(ids):
+        current += delta
+        rows.append((current, columns[0][i], columns[1][i], columns[2][i]))
+    return rows
+
+
+def iter_columnar(path):
+    """
+    逐块读取 columnar 文件
+    :return: 生成器，逐个产出 (id, entity1, relation, entity2)
+    :raises ValueError: 文件格式或版本不符
+    """
+    with open(path, 'rb') as f:
+        magic, version = struct.unpack(HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不是版本 {VERSION} 的列式导出文件: {path}")
+        chunk_header_size = struct.calcsize(CHUNK_FORMAT)
+        while True:
+            header = f.read(chunk_header_size)
+            if not header:
+                return
+            if len(header) < chunk_header_size:
+                raise ValueError(f"数据块不完整: {path}")
+            count, size = struct.unpack(CHUNK_FORMAT, header)
+            data = f.read(size)
+            if len(data) < size:
+                raise ValueError(f"数据块不完整: {path}")
+            yield from decode_columnar(count, zlib.decompress(data))
+
+
+def file_header(fmt):
+    """输出文件开头的内容"""
+    if fmt == "csv":
+        return (','.join(CSV_HEADER) + '\n').encode('utf-8')
+    if fmt == "columnar":
+        return struct.pack(HEADER_FORMAT, MAGIC, VERSION)
+    return b''
+
+
+ENCODERS = {"csv": encode_csv, "jsonl": encode_jsonl, "columnar": encode_columnar}
+
+
+def read_checkpoint(path):
+    """读取断点文件（不存在时返回None）"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path, state):
+    """原子写入断点，避免中断时留下半截文件"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def export_triples(db, path, fmt="csv", batch_size=10000, checkpoint=None, resume=False, progress_callback=None):
+    """
+    把 knowledge_triple 流式导出到文件
+    :param db: DBOperation
+    :param path: 输出文件路径
+    :param fmt: "csv"、"jsonl" 或 "columnar"
+    :param batch_size: 每批（每个数据块）的行数
+    :param checkpoint: 断点文件路径，为空时不记录断点
+    :param resume: 从断点继续（断点不存在时从头导出）
+    :param progress_callback: 每写完一批调用 progress_callback(stats)，stats 同返回值
+    :return: 统计信息 {"last_id", "until_id", "rows", "bytes", "elapsed", "rows_per_sec"}，rows 含续传前已导出的行
+    :raises backend.Error: 数据库不可用时抛出，此前写完的批次已记入断点
+    :raises ValueError: 断点与本次导出的格式不一致
+    """
+    encode = ENCODERS[fmt]
+    state = read_checkpoint(checkpoint) if checkpoint and resume else None
+    if state is not None:
+        if state["format"] != fmt:
+            raise ValueError(f"断点文件记录的格式为 {state['format']}，与 {fmt} 不一致")
+        f = open(path, 'r+b')
+        f.truncate(state["bytes"])
+        f.seek(state["bytes"])
+    else:
+        state = {"format": fmt, "last_id": 0, "until_id": db.backend.max_triple_id(), "rows": 0, "bytes": 0}
+        f = open(path, 'wb')
+        f.write(file_header(fmt))
+        state["bytes"] = f.tell()
+        if checkpoint:
+            # 覆盖上一次导出留下的断点，避免中断后 --resume 接到旧文件的进度上
+            write_checkpoint(checkpoint, state)
+
+    start = time.perf_counter()
+    start_rows = state["rows"]
+    stats = {}
+
+    def flush(batch):
+        f.write(encode(batch))
+        f.flush()
+        state["last_id"] = batch[-1][0]
+        state["rows"] += len(batch)
+        state["bytes"] = f.tell()
+        if checkpoint:
+            write_checkpoint(checkpoint, state)
+        elapsed = time.perf_counter() - start
+        stats.update(last_id=state["last_id"], until_id=state["until_id"], rows=state["rows"],
+                     bytes=state["bytes"], elapsed=elapsed,
+                     rows_per_sec=(state["rows"] - start_rows) / elapsed if elapsed else 0.0)
+        if progress_callback:
+            progress_callback(dict(stats))
+
+    try:
+        batch = []
+        for row in db.export_triples(state["last_id"], state["until_id"], batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        f.close()
+    if not stats:
+        stats.update(last_id=state["last_id"], until_id=state["until_id"], rows=state["rows"],
+                     bytes=state["bytes"], elapsed=time.perf_counter() - start, rows_per_sec=0.0)
+    return stats
+
+
+def show_info(path):
+    """打印 columnar 文件的行数、数据块数和 id 范围"""
+    rows = 0
+    first_id = last_id = None
+    for row in iter_columnar(path):
+        rows += 1
+        first_id = row[0] if first_id is None else first_id
+        last_id = row[0]
+    print(f"📄 {path}（列式导出，版本 {VERSION}）")
+    print(f"   {rows} 行，id {first_id} ~ {last_id}，{os.path.getsize(path)} 字节")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="知识流式导出/查看")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="从数据库导出")
+    export_parser.add_argument('path', help="输出文件路径")
+    export_parser.add_argument('--format', choices=FORMATS, help="输出格式（默认按扩展名判断，无法判断时为 csv）")
+    export_parser.add_argument('--batch-size', type=int, default=10000, help="每批拉取并写入的行数")
+    export_parser.add_argument('--checkpoint', help="断点文件路径（默认 <path>.checkpoint）")
+    export_parser.add_argument('--resume', action='store_true', help="从断点文件记录的 id 继续导出")
+    info_parser = subparsers.add_parser("info", help="查看列式导出文件信息")
+    info_parser.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == "info":
+        try:
+            show_info(args.path)
+        except (OSError, ValueError, zlib.error) as e:
+            print(f"❌ 无法读取导出文件: {e}")
+            sys.exit(1)
+        return
+
+    fmt = args.format or {".jsonl": "jsonl", ".json": "jsonl", ".cols": "columnar"}.get(
+        os.path.splitext(args.path)[1], "csv")
+    checkpoint = args.checkpoint or args.path + '.checkpoint'
+
+    print("=" * 50)
+    print("🧠 知识问答系统 - 流式导出工具")
+    print("=" * 50)
+    print(f"📄 文件: {args.path}  格式: {fmt}  批大小: {args.batch_size}")
+
+    def on_progress(stats):
+        print(f"   📦 已导出 {stats['rows']} 行（id ≤ {stats['last_id']} / {stats['until_id']}），"
+              f"{stats['bytes']} 字节，{stats['rows_per_sec']:.0f} 行/秒")
+
+    db = DBOperation()
+    try:
+        stats = export_triples(db, args.path, fmt, batch_size=args.batch_size, checkpoint=checkpoint,
+                               resume=args.resume, progress_callback=on_progress)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法导出: {e}")
+        sys.exit(1)
+    except db.backend.Error as e:
+        print(f"❌ 导出中断: {e}")
+        print("💡 修复后使用 --resume 从断点继续")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"\n🎉 导出完成：{stats['rows']} 行，{stats['bytes']} 字节，"
+          f"耗时 {stats['elapsed']:.1f} 秒（{stats['rows_per_sec']:.0f} 行/秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+问答语料离线抽取脚本
+====================
+
+从 JSONL 问答日志中流式读取问答对，用 TripleExtractor.extract_triple（静默模式）抽取三元组，
+按批写入 knowledge_triple。
+
+文件格式：每行一个对象 {"question": ..., "answer": ...}（字段名可用 --question-field/--answer-field 修改）
+
+特性：
+- 问答对按 --chunk-size 切成工作单元分发到进程池，每个工作进程持有自己的抽取器
+- 进程池中同时在途的工作单元不超过 --max-pending 个，内存占用与文件大小无关
+- 结果按输入顺序取回，抽取失败（无法识别实体或关系、答案为空、格式错误）的问答对写入拒绝文件，不会等待输入
+- 抽取出的三元组通过 bulk_save_knowledge 按批写入，每批提交后写入断点文件，中断后用 --resume 继续
+
+使用方式（在项目根目录下）：
+    python -m database.extract_corpus logs/qa.jsonl
+    python -m database.extract_corpus logs/qa.jsonl --workers 8 --chunk-size 1000 --resume
+
+作者: Knowledge QA System
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from database.bulk_import import read_checkpoint, write_checkpoint
+from database.db_operation import DBOperation
+from nlp.triple_extractor import TripleExtractor
+
+# 工作进程内的抽取器，由 _init_worker 在进程启动时创建一次
+_extractor = None
+
+
+def iter_qa_pairs(path, question_field="question", answer_field="answer", start_offset=0):
+    """
+    逐行读取 JSONL 问答对
+    :param start_offset: 跳过前 start_offset 行（用于断点续传，跳过的行不解析）
+    :return: 生成器，产出 (行号, (question, answer))；无法解析的行产出 (行号, 原始行)，由抽取流程记入拒绝文件
+    """
+    with open(path, encoding='utf-8') as f:
+        for offset, line in enumerate(f):
+            if offset < start_offset:
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                question, answer = record[question_field], record[answer_field]
+            except (ValueError, KeyError, TypeError):
+                yield offset, line
+                continue
+            if isinstance(question, str) and isinstance(answer, str):
+                yield offset, (question, answer)
+            else:
+                yield offset, line
+
+
+def _init_worker(relations):
+    global _extractor
+    _extractor = TripleExtractor(db_relations=relations)
+
+
+def _no_input(prompt):
+    """静默模式的输入回调：不提供任何补充，自动抽取失败的问答对得到空的实体/关系"""
+    return ""
+
+
+def extract_chunk(chunk):
+    """
+    抽取一个工作单元（在工作进程中执行）
+    :param chunk: [(行号, (question, answer) 或 原始行), ...]
+    :return: [(行号, 三元组或None, 拒绝时的记录), ...]
+    """
+    results = []
+    for offset, pair in chunk:
+        if isinstance(pair, str):
+            results.append((offset, None, {"line": pair, "error": "格式错误：需要 question 和 answer 字符串字段"}))
+            continue
+        question, answer = pair
+        entity1, relation, entity2 = _extractor.extract_triple(question, answer, silent=True, input_callback=_no_input)
+        if entity1 and relation and entity2:
+            results.append((offset, (entity1, relation, entity2), None))
+        else:
+            results.append((offset, None, {"question": question, "answer": answer, "error": "无法抽取实体或关系"}))
+    return results
+
+
+def extract_pairs(pairs, relations, workers=None, chunk_size=500, max_pending=None):
+    """
+    并行抽取问答对，按输入顺序产出结果
+    :param pairs: iter_qa_pairs 产出的 (行号, 问答对) 生成器
+    :param relations: 关系词列表（数据库关系词和别名），传给每个工作进程的抽取器
+    :param workers: 工作进程数，默认 CPU 核数；0 表示在当前进程中抽取
+    :param chunk_size: 每个工作单元的问答对数量
+    :param max_pending: 同时在途的工作单元上限，默认工作进程数的 2 倍
+    :return: 生成器，产出 (行号, 三元组或None, 拒绝时的记录)
+    """
+    chunks = iter(lambda: list(islice(pairs, chunk_size)), [])
+    if workers == 0:
+        _init_worker(relations)
+        for chunk in chunks:
+            yield from extract_chunk(chunk)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    # 不用 pool.imap：它的分发线程会把整个输入一次性读进任务队列，这里按在途上限逐个提交
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(relations,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(extract_chunk, (chunk,)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def extract_corpus(db, path, reject_file, start_offset=0, workers=None, chunk_size=500, batch_size=1000,
+                   question_field="question", answer_field="answer", progress_callback=None):
+    """
+    抽取 JSONL 问答语料并写入数据库
+    :param db: DBOperation
+    :param reject_file: 已打开的拒绝文件，每行一条 JSON 记录
+    :param start_offset: 从第 start_offset 行开始处理
+    :param progress_callback: 每批提交后调用 progress_callback(stats)，stats 同返回值，
+                              其中 offset 之前的行已全部写入数据库或拒绝文件，可作为续传的 start_offset
+    :return: 统计信息 {"offset", "pairs", "extracted", "rejected", "saved", "failed", "elapsed", "pairs_per_sec"}
+    :raises backend.Error: 数据库不可用时抛出
+    """
+    relations = db.get_all_relations()
+    if db.alias_table_ready:
+        relations += db.relation_normalizer.aliases()
+    stats = {"offset": start_offset, "pairs": 0, "extracted": 0, "rejected": 0,
+             "saved": 0, "failed": 0, "elapsed": 0.0, "pairs_per_sec": 0.0}
+    start = time.perf_counter()
+    # 下一个待处理的行号，以及自上次提交以来交给 bulk_save_knowledge 的三元组所在行号
+    position = [start_offset]
+    batch_lines = []
+    batch_base = [0]
+
+    def reject(record):
+        stats["rejected"] += 1
+        reject_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def triples():
+        results = extract_pairs(iter_qa_pairs(path, question_field, answer_field, start_offset),
+                                relations, workers, chunk_size)
+        for offset, triple, rejected in results:
+            stats["pairs"] += 1
+            position[0] = offset + 1
+            if triple is None:
+                reject(dict(offset=offset, **rejected))
+                continue
+            stats["extracted"] += 1
+            batch_lines.append(offset)
+            yield triple
+
+    def on_error(index, item, message):
+        reject({"offset": batch_lines[index - batch_base[0]], "triple": list(item), "error": message})
+
+    def on_progress(save_stats):
+        # bulk_save_knowledge 按需拉取三元组，提交时生成器正停在本批最后一个三元组上
+        batch_base[0] = save_stats["offset"]
+        batch_lines.clear()
+        stats["offset"] = position[0]
+        stats["saved"] = save_stats["saved"]
+        stats["failed"] = save_stats["failed"]
+        stats["elapsed"] = time.perf_counter() - start
+        stats["pairs_per_sec"] = stats["pairs"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        reject_file.flush()
+        if progress_callback:
+            progress_callback(dict(stats))
+
+    db.bulk_save_knowledge(triples(), batch_size=batch_size, progress_callback=on_progress, error_callback=on_error)
+    # 最后一批之后可能只剩被拒绝的行
+    if stats["offset"] != position[0]:
+        on_progress({"offset": batch_base[0], "saved": stats["saved"], "failed": stats["failed"]})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="问答语料离线抽取")
+    parser.add_argument('path', help="JSONL 问答文件路径")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="工作进程数（0 表示不使用进程池）")
+    parser.add_argument('--chunk-size', type=int, default=500, help="每个工作单元的问答对数量")
+    parser.add_argument('--batch-size', type=int, default=1000, help="每批提交的三元组数量")
+    parser.add_argument('--question-field', default="question", help="问题字段名")
+    parser.add_argument('--answer-field', default="answer", help="答案字段名")
+    parser.add_argument('--checkpoint', help="断点文件路径（默认 <path>.extract.offset）")
+    parser.add_argument('--resume', action='store_true', help="从断点文件记录的行号继续")
+    parser.add_argument('--reject-file', help="拒绝文件路径（默认 <path>.rejects.jsonl）")
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or args.path + '.extract.offset'
+    reject_path = args.reject_file or args.path + '.rejects.jsonl'
+    start_offset = read_checkpoint(checkpoint) if args.resume else 0
+
+    print("=" * 50)
+    print("🧠 知识问答系统 - 问答语料抽取工具")
+    print("=" * 50)
+    print(f"📄 文件: {args.path}  工作进程: {args.workers}  工作单元: {args.chunk_size}  "
+          f"批大小: {args.batch_size}  起始行: {start_offset}")
+
+    db = DBOperation()
+    db.load_relation_aliases()
+
+    def on_progress(stats):
+        write_checkpoint(checkpoint, stats["offset"])
+        print(f"   📦 行 {stats['offset']}: 抽取 {stats['extracted']}, 拒绝 {stats['rejected']}, "
+              f"已写入 {stats['saved']}, {stats['pairs_per_sec']:.0f} 对/秒")
+
+    with open(reject_path, 'a', encoding='utf-8') as reject_file:
+        try:
+            stats = extract_corpus(db, args.path, reject_file, start_offset=start_offset, workers=args.workers,
+                                   chunk_size=args.chunk_size, batch_size=args.batch_size,
+                                   question_field=args.question_field, answer_field=args.answer_field,
+                                   progress_callback=on_progress)
+        except db.backend.Error as e:
+            print(f"❌ 抽取中断: {e}")
+            print(f"💡 修复后使用 --resume 从第 {read_checkpoint(checkpoint)} 行继续")
+            db.close()
+            sys.exit(1)
+
+    db.close()
+    print(f"\n🎉 抽取完成：{stats['pairs']} 个问答对，写入 {stats['saved']} 条，拒绝 {stats['rejected']} 条"
+          f"（见 {reject_path}），耗时 {stats['elapsed']:.1f} 秒（{stats['pairs_per_sec']:.0f} 对/秒）")
+
+
+if __name__ == "__main__":
+    main()
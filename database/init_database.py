@@ -1,68 +1,242 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-数据库初始化脚本
-================
+数据库初始化与迁移脚本
+======================
 
-用于初始化知识问答系统的数据库和表结构。
+用于初始化知识问答系统的数据库和表结构，并按版本依次执行表结构迁移。
+
+迁移记录在 schema_version 表中（每个已执行的版本一行），再次运行时只执行尚未记录的版本；
+每个迁移步骤本身也是幂等的（建索引前先按列检查是否已存在），中途失败后重新运行即可继续。
+MySQL 的 DDL 会隐式提交，无法整体回滚，因此版本号在该版本的全部步骤成功后才写入。
+版本 4（改写以关系别名保存的三元组）与 python -m database.migrate_relations 相同，两者任一执行过即记为已完成。
+
+迁移完成后用 EXPLAIN 检查 query_knowledge 可能执行的每种语句形态（正向/反向、模糊/等值关系、
+无关系回退、UNION 单次往返），任何一条对 knowledge_triple 做全表扫描或全索引扫描时返回失败。
 
 使用步骤：
 1. 确保MySQL服务正在运行
 2. 检查config/db_config.py中的数据库连接信息
-3. 运行此脚本：python init_database.py
+3. 在项目根目录下运行：
+    python -m database.init_database          # 初始化/迁移到最新版本并检查查询计划
+    python -m database.init_database status   # 查看已执行的迁移版本
+    python -m database.init_database explain  # 仅检查查询计划
+    python -m database.init_database test     # 测试连接
 
 作者: Knowledge QA System
 """
 
 import mysql.connector
 import sys
-from config.db_config import DB_CONFIG, DB_INIT_SQL
+from mysql.connector import errorcode
+from config.db_config import (DB_CONFIG, DB_INIT_SQL, SCHEMA_VERSION_SQL, RELATION_ALIAS_SCHEMA_VERSION,
+                              RELATION_ALIAS_SCHEMA_DESCRIPTION)
+from database.migrate_relations import rewrite_relations
+from database.mysql_backend import MySQLBackend
+from database.storage_backend import relation_condition
+
+# 同一时间只允许一个迁移进程（MySQL 命名锁，连接断开时自动释放）
+MIGRATION_LOCK = "knowledge_graph_schema_migration"
+MIGRATION_LOCK_TIMEOUT = 30
+
+
+def _index_columns(cursor, table):
+    """返回表上全部索引 {索引名: (列, ...)}，列按索引中的顺序排列"""
+    cursor.execute(
+        "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,)
+    )
+    indexes = {}
+    for name, column in cursor.fetchall():
+        indexes[name] = indexes.get(name, ()) + (column,)
+    return indexes
+
+
+def _ensure_index(cursor, table, name, columns):
+    """已有相同列顺序的索引（包括唯一约束）时跳过，否则在线添加索引"""
+    for existing, existing_columns in _index_columns(cursor, table).items():
+        if existing_columns == tuple(columns):
+            print(f"   ⏭️ {table} 已有索引 {existing} ({', '.join(columns)})")
+            return
+    # 添加二级索引时不锁表，迁移期间问答服务可以继续读写
+    cursor.execute(f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE")
+    print(f"   ✅ {table} 添加索引 {name} ({', '.join(columns)})")
+
+
+def _drop_redundant_index(cursor, table, name):
+    """索引是另一个索引的最左前缀时删除（查询改走更长的索引，写入少维护一棵树），否则保留"""
+    indexes = _index_columns(cursor, table)
+    columns = indexes.get(name)
+    if columns is None:
+        print(f"   ⏭️ {table} 没有索引 {name}")
+        return
+    covering = [other for other, other_columns in indexes.items()
+                if other != name and other_columns[:len(columns)] == columns]
+    if not covering:
+        print(f"   ⚠️ {table} 的索引 {name} 没有被其他索引覆盖，保留")
+        return
+    cursor.execute(f"ALTER TABLE {table} DROP INDEX {name}, ALGORITHM=INPLACE, LOCK=NONE")
+    print(f"   ✅ {table} 删除索引 {name}（由 {covering[0]} 覆盖）")
+
+
+def _migrate_base_tables(cursor):
+    """创建 DB_INIT_SQL 中的全部表（数据库本身由 init_database 创建并选中）"""
+    for sql in (stmt.strip() for stmt in DB_INIT_SQL.split(';')):
+        if sql and not sql.upper().startswith(('CREATE DATABASE', 'USE ')):
+            cursor.execute(sql)
+    print("   ✅ knowledge_triple / relation_alias 表已就绪")
+
+
+def _migrate_covering_indexes(cursor):
+    """
+    query_knowledge 的两种访问路径各有一个覆盖索引，关系条件（LIKE 或等值）和返回的答案列都在索引内完成，
+    不需要回表：正向 (entity1, relation) → entity2 由唯一约束 uk_triple 覆盖，反向需要新索引
+    """
+    _ensure_index(cursor, "knowledge_triple", "idx_forward", ("entity1", "relation", "entity2"))
+    _ensure_index(cursor, "knowledge_triple", "idx_reverse", ("entity2", "relation", "entity1"))
+
+
+def _migrate_drop_single_column_indexes(cursor):
+    """idx_entity1 / idx_entity2 是复合索引的最左前缀，无关系回退查询同样可以走复合索引"""
+    _drop_redundant_index(cursor, "knowledge_triple", "idx_entity1")
+    _drop_redundant_index(cursor, "knowledge_triple", "idx_entity2")
+
+
+def _migrate_relation_aliases(cursor):
+    """
+    登记关系别名并把以别名保存的已有三元组改写为规范关系（与 python -m database.migrate_relations 相同），
+    版本记录写入后 DBOperation 才启用关系规范化
+    """
+    rewrite_relations(cursor)
+
+
+# 迁移版本：(版本, 说明, 执行函数)，只能在末尾追加，已发布的版本不能修改
+MIGRATIONS = [
+    (1, "创建知识三元组表和关系别名表", _migrate_base_tables),
+    (2, "添加正向/反向覆盖索引", _migrate_covering_indexes),
+    (3, "删除被复合索引覆盖的单列索引", _migrate_drop_single_column_indexes),
+    (RELATION_ALIAS_SCHEMA_VERSION, RELATION_ALIAS_SCHEMA_DESCRIPTION, _migrate_relation_aliases),
+]
+
+
+def applied_versions(cursor):
+    """返回已执行的迁移 [(版本, 说明, 执行时间), ...]"""
+    cursor.execute("SELECT version, description, applied_at FROM schema_version ORDER BY version")
+    return cursor.fetchall()
+
+
+def migrate(cursor, connection):
+    """
+    执行尚未记录的迁移版本
+    :return: 执行后的版本号
+    """
+    cursor.execute(SCHEMA_VERSION_SQL)
+    # 按版本集合判断而不是取最大版本：migrate_relations 单独运行时会先于 2、3 记录版本 4
+    applied = {row[0] for row in applied_versions(cursor)}
+    latest = MIGRATIONS[-1][0]
+    pending = [migration for migration in MIGRATIONS if migration[0] not in applied]
+    print(f"📌 已执行 {len(applied)} 个版本，待执行 {len(pending)} 个，最新版本 {latest}")
+    for version, description, apply in pending:
+        print(f"📝 迁移到版本 {version}: {description}")
+        apply(cursor)
+        # 版本 4 的步骤自身会写入版本记录，这里忽略重复
+        cursor.execute("INSERT IGNORE INTO schema_version (version, description) VALUES (%s, %s)",
+                       (version, description))
+        connection.commit()
+    return latest
+
+
+def lookup_statements():
+    """
+    query_knowledge 可能执行的全部语句形态，SQL 直接取自 MySQLBackend，与运行时保持一致
+    :return: [(说明, SQL, 示例参数), ...]
+    """
+    entity = "__explain__"
+    statements = [
+        ("正向无关系回退", MySQLBackend.FORWARD_NO_REL_SQL, (entity,)),
+        ("反向无关系回退", MySQLBackend.REVERSE_NO_REL_SQL, (entity,)),
+    ]
+    for exact, label in ((False, "模糊关系"), (True, "等值关系")):
+        cond, param = relation_condition(entity, exact)
+        statements += [
+            (f"正向{label}", MySQLBackend.FORWARD_SQL.format(relation_cond=cond), (entity, param)),
+            (f"反向{label}", MySQLBackend.REVERSE_SQL.format(relation_cond=cond), (entity, param)),
+            (f"单次往返{label}", MySQLBackend.UNION_SQL.format(relation_cond=cond), (entity, param) * 2),
+            (f"单次往返无关系{label}", MySQLBackend.UNION_NO_REL_SQL.format(relation_cond=cond),
+             (entity, param) * 2 + (entity, entity)),
+        ]
+    return statements
+
+
+def explain_lookups(connection):
+    """
+    用 EXPLAIN 检查每种查询语句形态
+    :return: 全部语句都没有对 knowledge_triple 做全表/全索引扫描返回True
+    """
+    print("\n🔍 检查查询计划...")
+    ok = True
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for name, sql, params in lookup_statements():
+            cursor.execute("EXPLAIN " + sql, params)
+            # UNION 的结果临时表（<union1,2>）本身总是 ALL，只检查对 knowledge_triple 的访问
+            rows = [row for row in cursor.fetchall() if row.get('table') == 'knowledge_triple']
+            if not rows:
+                print(f"   ⚠️ {name}: 没有返回 knowledge_triple 的执行计划（表为空时优化器可能直接判定无结果）")
+            for row in rows:
+                full_scan = row.get('type') in ('ALL', 'index') or (row.get('type') and not row.get('key'))
+                print(f"   {'❌' if full_scan else '✅'} {name}: type={row.get('type')} key={row.get('key')} "
+                      f"extra={row.get('Extra')}")
+                ok = ok and not full_scan
+    finally:
+        cursor.close()
+    print("✅ 查询均使用索引" if ok else "❌ 存在全表扫描的查询")
+    return ok
 
 
 def init_database():
-    """初始化数据库和表结构"""
+    """初始化数据库、迁移到最新版本并检查查询计划"""
     print("🔧 开始初始化数据库...")
-    
+
     # 临时的连接配置（不指定数据库名）
     temp_config = DB_CONFIG.copy()
     temp_database = temp_config.pop('database')
-    
+
     try:
         # 1. 连接到MySQL服务器（不指定数据库）
         print(f"📡 连接到MySQL服务器: {temp_config['host']}:{temp_config.get('port', 3306)}")
         connection = mysql.connector.connect(**temp_config)
         cursor = connection.cursor()
         print("✅ MySQL连接成功")
-        
-        # 2. 执行初始化SQL
-        print("📝 执行数据库初始化脚本...")
-        # 分割SQL语句（以分号分隔）
-        sql_statements = [stmt.strip() for stmt in DB_INIT_SQL.split(';') if stmt.strip()]
-        
-        for i, sql in enumerate(sql_statements, 1):
-            if sql:
-                try:
-                    cursor.execute(sql)
-                    print(f"   ✅ SQL {i} 执行成功")
-                except mysql.connector.Error as e:
-                    print(f"   ⚠️ SQL {i} 执行警告: {e}")
-        
-        connection.commit()
-        print("✅ 数据库初始化完成")
-        
+
+        # 2. 创建并选中数据库，执行尚未记录的迁移版本
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{temp_database}` "
+                       f"DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        cursor.execute(f"USE `{temp_database}`")
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            print("❌ 另一个迁移进程正在运行，请稍后重试")
+            return False
+        try:
+            version = migrate(cursor, connection)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchone()
+        print(f"✅ 数据库已迁移到版本 {version}")
+
         # 3. 验证表是否创建成功
         print("\n🔍 验证表结构...")
-        cursor.execute("USE knowledge_graph;")
         cursor.execute("SHOW TABLES;")
         tables = cursor.fetchall()
-        
+
         if tables:
             print("📋 已创建的表:")
             for table in tables:
                 print(f"   - {table[0]}")
         else:
             print("⚠️ 未找到任何表")
-            
+
         # 4. 显示表结构信息
         if ('knowledge_triple',) in tables:
             print("\n📊 knowledge_triple 表结构:")
@@ -70,9 +244,16 @@ def init_database():
             columns = cursor.fetchall()
             for col in columns:
                 print(f"   - {col[0]}: {col[1]} {'(主键)' if col[0] == 'id' else ''}")
-        
+            print("📊 knowledge_triple 索引:")
+            for name, index_columns in _index_columns(cursor, 'knowledge_triple').items():
+                print(f"   - {name}: ({', '.join(index_columns)})")
+
+        # 5. 检查查询计划
+        if not explain_lookups(connection):
+            return False
+
         print("\n🎉 数据库初始化完成！现在可以运行问答系统了。")
-        
+
     except mysql.connector.Error as e:
         print(f"❌ 数据库初始化失败: {e}")
         print("\n💡 可能的解决方案:")
@@ -80,31 +261,72 @@ def init_database():
         print("   2. 检查config/db_config.py中的连接信息是否正确")
         print("   3. 确保用户有创建数据库的权限")
         print("   4. 检查防火墙设置")
+        print("   5. 迁移中途失败时修复后重新运行，已执行的版本不会重复执行")
         return False
-        
+
     finally:
         if 'cursor' in locals():
             cursor.close()
         if 'connection' in locals():
             connection.close()
-            
+
+    return True
+
+
+def show_status():
+    """显示已执行的迁移版本"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        cursor = connection.cursor()
+        try:
+            rows = applied_versions(cursor)
+        except mysql.connector.Error as e:
+            if e.errno != errorcode.ER_NO_SUCH_TABLE:
+                raise
+            rows = []  # 尚未执行过任何迁移
+        cursor.close()
+        connection.close()
+    except mysql.connector.Error as e:
+        print(f"❌ 无法读取迁移记录: {e}")
+        return False
+
+    applied = {row[0] for row in rows}
+    print("📋 迁移版本:")
+    for version, description, applied_at in rows:
+        print(f"   ✅ {version}: {description}（{applied_at}）")
+    for version, description, _ in MIGRATIONS:
+        if version not in applied:
+            print(f"   ⏳ {version}: {description}（未执行）")
     return True
 
 
+def explain_only():
+    """仅检查查询计划"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        try:
+            return explain_lookups(connection)
+        finally:
+            connection.close()
+    except mysql.connector.Error as e:
+        print(f"❌ 检查查询计划失败: {e}")
+        return False
+
+
 def test_connection():
     """测试数据库连接"""
     print("🧪 测试数据库连接...")
-    
+
     try:
         connection = mysql.connector.connect(**DB_CONFIG)
         cursor = connection.cursor()
-        
+
         # 测试查询
         cursor.execute("SELECT COUNT(*) FROM knowledge_triple;")
         count = cursor.fetchone()[0]
-        
+
         print(f"✅ 数据库连接成功，当前存储 {count} 个知识点")
-        
+
         # 显示一些示例数据
         if count > 0:
             cursor.execute("SELECT entity1, relation, entity2 FROM knowledge_triple LIMIT 3;")
@@ -112,11 +334,11 @@ def test_connection():
             print("\n📝 示例知识点:")
             for i, (e1, rel, e2) in enumerate(examples, 1):
                 print(f"   {i}. {e1} - {rel} - {e2}")
-        
+
         cursor.close()
         connection.close()
         return True
-        
+
     except mysql.connector.Error as e:
         print(f"❌ 连接测试失败: {e}")
         return False
@@ -126,16 +348,22 @@ if __name__ == "__main__":
     print("="*50)
     print("🧠 知识问答系统 - 数据库初始化工具")
     print("="*50)
-    
-    if len(sys.argv) > 1 and sys.argv[1] == "test":
+
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "test":
         # 仅测试连接
         success = test_connection()
+    elif command == "status":
+        success = show_status()
+    elif command == "explain":
+        success = explain_only()
     else:
         # 完整初始化
         success = init_database()
-    
+
     if success:
-        print("\n✨ 系统已准备就绪！运行 'python main.py' 开始问答")
+        if command is None:
+            print("\n✨ 系统已准备就绪！运行 'python main.py' 开始问答")
     else:
-        print("\n💥 初始化失败，请检查错误信息并重试")
-        sys.exit(1)
\ No newline at end of file
+        print("\n💥 执行失败，请检查错误信息并重试")
+        sys.exit(1)
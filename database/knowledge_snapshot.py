@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+知识快照
+========
+
+把 knowledge_triple 导出为紧凑的只读二进制文件，启动时用 mmap 映射后直接二分查找，
+无需从数据库逐行加载、也无需反序列化整个文件：启动耗时只取决于实际访问到的页，
+同一台机器上的多个进程共享操作系统的页缓存。
+
+文件格式（版本 2，字节序与生成机器一致，加载时校验）：
+    头部（128 字节）：魔数、版本、字节序、字符串数、三元组数、关系数、原始字符串数、
+                     导出时的 max(id)、生成时间、各段偏移
+    字符串偏移表：uint64[字符串数 + 1]
+    字符串数据：全部实体/关系按排序规则归一化后的键（collation.fold_key），按 UTF-8 字节序排序去重
+               （字符串 id 即排序序号），查询与数据库的 = / LIKE 一致
+    正向数组：uint32[三元组数 × 3]，按 (entity1, relation, entity2) 排序
+    反向数组：uint32[三元组数 × 3]，按 (entity2, relation, entity1) 排序
+    关系数组：uint32[关系数]，全部不重复关系的字符串 id
+    原始字符串 id：uint32[原始字符串数]，与键不同的原始字符串（返回给用户的答案）的字符串 id，升序
+    原始字符串偏移表：uint64[原始字符串数 + 1]
+    原始字符串数据：上述原始字符串的 UTF-8 拼接
+
+快照是导出时刻的副本：头部记录导出前的 max(id)，加载时（DBOperation.load_snapshot）把 id 更大的三元组
+补入 SnapshotIndex 的内存增量层，之后通过 save_knowledge 写入的知识同样写入增量层。
+导出时先写临时文件再原子替换，正在使用旧快照的进程不受影响。
+
+导出与查看见 database/export_snapshot.py。
+
+作者: Knowledge QA System
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from database.collation import fold_key
+from database.triple_index import TripleIndex
+
+MAGIC = b"KQASNAP\x00"
+VERSION = 2
+BYTE_ORDERS = {"little": 1, "big": 2}
+# 魔数、版本、字节序、字符串数、三元组数、关系数、原始字符串数、导出时的 max(id)、生成时间、
+# 字符串偏移表/字符串数据/正向数组/反向数组/关系数组/原始字符串 id/原始字符串偏移表/原始字符串数据的起始偏移、文件大小
+HEADER_FORMAT = "=8sIIIIIIQdQQQQQQQQQ"
+HEADER_SIZE = 128
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def write_snapshot(triples, path, max_triple_id=0):
+    """
+    把三元组写入快照文件（在排序规则下重复的三元组只保留一份，保留最先出现的原始写法）
+    :param triples: 可迭代的 (entity1, relation, entity2)，可以是生成器
+    :param path: 输出文件路径
+    :param max_triple_id: 读取 triples 之前 knowledge_triple 的 max(id)，加载时据此补上之后写入的三元组
+    :return: 写入的三元组数量
+    """
+    # 第一遍：键驻留，三元组以临时 id 紧凑保存；与键不同的原始字符串单独记录
+    ids = {}
+    originals = {}
+    raw = array("I")
+    for triple in triples:
+        for value in triple:
+            key = fold_key(value)
+            string_id = ids.get(key)
+            if string_id is None:
+                string_id = ids[key] = len(ids)
+                if key != value:
+                    originals[string_id] = value
+            raw.append(string_id)
+
+    # 键按 UTF-8 字节排序，使加载时可以对字符串表二分查找
+    encoded = [key.encode("utf-8") for key in ids]
+    order = sorted(range(len(encoded)), key=encoded.__getitem__)
+    remap = array("I", bytes(4 * len(order)))
+    for new_id, old_id in enumerate(order):
+        remap[old_id] = new_id
+
+    forward = sorted({(remap[raw[i]], remap[raw[i + 1]], remap[raw[i + 2]]) for i in range(0, len(raw), 3)})
+    del raw
+    reverse = sorted((e2, rel, e1) for e1, rel, e2 in forward)
+    relations = array("I", sorted({rel for _, rel, _ in forward}))
+
+    string_offsets = array("Q", [0])
+    for old_id in order:
+        string_offsets.append(string_offsets[-1] + len(encoded[old_id]))
+    string_data = b"".join(encoded[old_id] for old_id in order)
+
+    display = sorted((remap[old_id], value.encode("utf-8")) for old_id, value in originals.items())
+    display_offsets = array("Q", [0])
+    for _, value in display:
+        display_offsets.append(display_offsets[-1] + len(value))
+
+    sections = [
+        string_offsets.tobytes(),
+        string_data,
+        array("I", (value for record in forward for value in record)).tobytes(),
+        array("I", (value for record in reverse for value in record)).tobytes(),
+        relations.tobytes(),
+        array("I", (string_id for string_id, _ in display)).tobytes(),
+        display_offsets.tobytes(),
+        b"".join(value for _, value in display),
+    ]
+    offsets = []
+    position = HEADER_SIZE
+    for data in sections:
+        position = _align(position)
+        offsets.append(position)
+        position += len(data)
+
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, VERSION, BYTE_ORDERS[sys.byteorder],
+        len(order), len(forward), len(relations), len(display), max_triple_id, time.time(), *offsets, position,
+    )
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\x00"))
+        for offset, data in zip(offsets, sections):
+            f.write(b"\x00" * (offset - f.tell()))
+            f.write(data)
+    # 原子替换：已映射旧文件的进程继续使用旧的 inode
+    os.replace(tmp_path, path)
+    return len(forward)
+
+
+def _lower_bound(records, count, first, second=None):
+    """在按 (first, second, ...) 排序的三元组数组中，返回第一个不小于给定键的记录序号"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        value = records[3 * mid]
+        if value < first or (value == first and second is not None and records[3 * mid + 1] < second):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class KnowledgeSnapshot:
+    def __init__(self, path):
+        """
+        只读映射快照文件
+        :param path: write_snapshot 生成的文件路径
+        :raises ValueError: 文件不是有效的快照（魔数、版本、字节序或大小不符）
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+        # 关系词数量很少，解码结果缓存起来供子串匹配使用
+        self._relation_cache = {}
+
+    def _parse(self):
+        if len(self._mmap) < HEADER_SIZE:
+            raise ValueError(f"不是有效的知识快照: {self.path}")
+        (magic, version, byte_order, self.string_count, self.triple_count, self.relation_count,
+         self.display_count, self.max_triple_id, self.created_at, strings_at, data_at, forward_at, reverse_at,
+         relations_at, display_ids_at, display_offsets_at, display_data_at, file_size) = \
+            struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是有效的知识快照: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"不支持的快照版本 {version}（当前支持 {VERSION}），请重新导出")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise ValueError("快照的字节序与本机不一致，请在本机重新导出")
+        if file_size != len(self._mmap):
+            raise ValueError(f"快照文件不完整（{len(self._mmap)}/{file_size} 字节），请重新导出")
+
+        view = memoryview(self._mmap)
+        self._views.append(view)
+        self._data_at = data_at
+        self._string_offsets = self._section(view, strings_at, 8 * (self.string_count + 1), "Q")
+        self._forward = self._section(view, forward_at, 12 * self.triple_count, "I")
+        self._reverse = self._section(view, reverse_at, 12 * self.triple_count, "I")
+        self._relations = self._section(view, relations_at, 4 * self.relation_count, "I")
+        self._display_ids = self._section(view, display_ids_at, 4 * self.display_count, "I")
+        self._display_offsets = self._section(view, display_offsets_at, 8 * (self.display_count + 1), "Q")
+        self._display_data_at = display_data_at
+
+    def _section(self, view, offset, length, fmt):
+        section = view[offset:offset + length].cast(fmt)
+        self._views.append(section)
+        return section
+
+    def __len__(self):
+        return self.triple_count
+
+    def _string_bytes(self, string_id):
+        start = self._data_at + self._string_offsets[string_id]
+        return self._mmap[start:self._data_at + self._string_offsets[string_id + 1]]
+
+    def string(self, string_id):
+        """返回字符串 id 对应的原始字符串（导出时最先出现的写法）"""
+        i = bisect.bisect_left(self._display_ids, string_id)
+        if i < self.display_count and self._display_ids[i] == string_id:
+            start = self._display_data_at + self._display_offsets[i]
+            return self._mmap[start:self._display_data_at + self._display_offsets[i + 1]].decode("utf-8")
+        return self._string_bytes(string_id).decode("utf-8")
+
+    def string_id(self, value):
+        """按排序规则归一化后二分查找字符串表，返回字符串 id；不存在时返回None"""
+        key = fold_key(value).encode("utf-8")
+        lo, hi = 0, self.string_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.string_count and self._string_bytes(lo) == key:
+            return lo
+        return None
+
+    def _relation(self, relation_id):
+        """返回关系的键（fold_key 归一化后的关系词），用于子串匹配"""
+        relation = self._relation_cache.get(relation_id)
+        if relation is None:
+            relation = self._relation_cache[relation_id] = self._string_bytes(relation_id).decode("utf-8")
+        return relation
+
+    def relations(self):
+        """返回快照中所有不重复的关系词"""
+        return sorted(self.string(relation_id) for relation_id in self._relations)
+
+    def _match(self, records, entity, relation, exact):
+        """
+        在 records（正向或反向数组）中查找 entity 的一条关系匹配记录，返回其另一端实体
+        匹配语义与 TripleIndex._match 一致：exact 时等值，否则子串（空关系匹配任意关系），均按 fold_key 比较
+        """
+        entity_id = self.string_id(entity)
+        if entity_id is None:
+            return None
+        count = self.triple_count
+        if exact:
+            relation_id = self.string_id(relation) if relation else None
+            if relation_id is None:
+                return None
+            i = _lower_bound(records, count, entity_id, relation_id)
+            if i < count and records[3 * i] == entity_id and records[3 * i + 1] == relation_id:
+                return self.string(records[3 * i + 2])
+            return None
+
+        start = _lower_bound(records, count, entity_id)
+        end = _lower_bound(records, count, entity_id + 1)
+        if start == end:
+            return None
+        if not relation:
+            return self.string(records[3 * start + 2])
+        relation = fold_key(relation)
+        checked = None
+        for i in range(start, end):
+            relation_id = records[3 * i + 1]
+            if relation_id == checked:
+                continue  # 同一关系的记录相邻，只需判断一次
+            checked = relation_id
+            if relation in self._relation(relation_id):
+                return self.string(records[3 * i + 2])
+        return None
+
+    def lookup_forward(self, entity1, relation, exact=False):
+        """只查正向：entity1 → entity2"""
+        return self._match(self._forward, entity1, relation, exact)
+
+    def lookup_reverse(self, entity2, relation, exact=False):
+        """只查反向：entity2 → entity1"""
+        return self._match(self._reverse, entity2, relation, exact)
+
+    def lookup(self, entity1, relation, exact=False):
+        """按 query_knowledge 的语义查询答案：先正向，再反向"""
+        answer = self.lookup_forward(entity1, relation, exact)
+        if answer is not None:
+            return answer
+        return self.lookup_reverse(entity1, relation, exact)
+
+    def close(self):
+        """解除映射（先释放全部 memoryview，否则 mmap 无法关闭）"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+
+class SnapshotIndex:
+    """
+    快照 + 内存增量层，接口与 TripleIndex 一致，可直接作为 DBOperation.triple_index 使用
+    启动后保存的新知识写入增量层；查询顺序为 增量正向 → 快照正向 → 增量反向 → 快照反向
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._overlay = TripleIndex()
+        self._overlay.loaded = True
+        self.loaded = True
+
+    @property
+    def size(self):
+        return len(self.snapshot) + self._overlay.size
+
+    def add(self, entity1, relation, entity2):
+        self._overlay.add(entity1, relation, entity2)
+
+    def relations(self):
+        # 快照和增量层中排序规则下相同的关系只返回一个，以快照中的写法为准
+        names = {fold_key(name): name for name in self._overlay.relations()}
+        names.update((fold_key(name), name) for name in self.snapshot.relations())
+        return sorted(names.values())
+
+    def lookup(self, entity1, relation, exact=False):
+        for lookup in (self._overlay.lookup_forward, self.snapshot.lookup_forward,
+                       self._overlay.lookup_reverse, self.snapshot.lookup_reverse):
+            answer = lookup(entity1, relation, exact)
+            if answer is not None:
+                return answer
+        return None
+
+    def close(self):
+        self.snapshot.close()
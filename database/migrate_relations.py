@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关系规范化迁移脚本
+================
+
+为已有数据库启用关系别名表（relation_alias），使查询可以用等值条件命中索引。
+
+迁移步骤：
+1. 创建 relation_alias 表（已存在则跳过）
+2. 写入 config/system_config.py 中预置的别名映射
+3. 将 knowledge_triple 中已有的关系词登记为自身的规范关系
+4. 把使用别名的已有三元组改写为规范关系（与已有记录重复的直接删除）
+5. 在 schema_version 中记录迁移版本，DBOperation 看到该记录后才启用关系规范化
+6. 用 EXPLAIN 检查等值查询是否使用了索引
+
+迁移完成后可将 SYSTEM_CONFIG["relation_match"] 设为 "exact"。
+
+使用方式（在项目根目录下）：
+    python -m database.migrate_relations          # 执行迁移并检查查询计划
+    python -m database.migrate_relations explain  # 仅检查查询计划
+
+作者: Knowledge QA System
+"""
+
+import sys
+from mysql.connector import Error
+from config.db_config import (DB_INIT_SQL, SCHEMA_VERSION_SQL, RELATION_ALIAS_SCHEMA_VERSION,
+                              RELATION_ALIAS_SCHEMA_DESCRIPTION)
+from config.system_config import SYSTEM_CONFIG
+from database.db_connect import DBConnector
+
+# 迁移后的热路径查询形态：(说明, SQL, 示例参数)
+EXACT_LOOKUP_QUERIES = [
+    ("正向等值查询", "SELECT entity2 FROM knowledge_triple WHERE entity1 = %s AND relation = %s LIMIT 1"),
+    ("反向等值查询", "SELECT entity1 FROM knowledge_triple WHERE entity2 = %s AND relation = %s LIMIT 1"),
+]
+
+
+def _alias_table_sql():
+    """从 DB_INIT_SQL 中取出 relation_alias 的建表语句，保证与新安装的表结构一致"""
+    for stmt in DB_INIT_SQL.split(';'):
+        if 'CREATE TABLE IF NOT EXISTS relation_alias' in stmt:
+            return stmt.strip()
+    raise RuntimeError("DB_INIT_SQL 中缺少 relation_alias 建表语句")
+
+
+def migrate(connector):
+    """执行关系规范化迁移"""
+    print("🔧 开始迁移关系别名...")
+    with connector.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # 建表语句会隐式提交，放在改写之前；改写和版本记录在同一事务中提交
+            cursor.execute(SCHEMA_VERSION_SQL)
+            cursor.execute(_alias_table_sql())
+            print("   ✅ relation_alias 表已就绪")
+            rewrite_relations(cursor)
+            conn.commit()
+        finally:
+            cursor.close()
+    print("✅ 关系别名迁移完成")
+
+
+def rewrite_relations(cursor):
+    """
+    登记别名、把使用别名的已有三元组改写为规范关系，最后记录迁移版本（之后 DBOperation 才启用关系规范化）
+    不提交事务，由调用方提交；每一步都可以重复执行
+    """
+    aliases = SYSTEM_CONFIG.get("relation_aliases") or {}
+    for alias, canonical in aliases.items():
+        cursor.execute(
+            "INSERT IGNORE INTO relation_alias (alias, canonical) VALUES (%s, %s), (%s, %s)",
+            (canonical, canonical, alias, canonical)
+        )
+    print(f"   ✅ 写入预置别名 {len(aliases)} 个")
+
+    cursor.execute("""
+        INSERT IGNORE INTO relation_alias (alias, canonical)
+        SELECT DISTINCT relation, relation FROM knowledge_triple
+    """)
+    print(f"   ✅ 登记已有关系词 {cursor.rowcount} 个")
+
+    # 改写别名行；与已存在的规范三元组冲突的行由 IGNORE 跳过，随后删除
+    cursor.execute("""
+        UPDATE IGNORE knowledge_triple t
+        JOIN relation_alias a ON t.relation = a.alias
+        SET t.relation = a.canonical
+        WHERE a.alias <> a.canonical
+    """)
+    print(f"   ✅ 改写别名三元组 {cursor.rowcount} 条")
+    cursor.execute("""
+        DELETE t FROM knowledge_triple t
+        JOIN relation_alias a ON t.relation = a.alias
+        WHERE a.alias <> a.canonical
+    """)
+    print(f"   ✅ 删除重复三元组 {cursor.rowcount} 条")
+    cursor.execute("INSERT IGNORE INTO schema_version (version, description) VALUES (%s, %s)",
+                   (RELATION_ALIAS_SCHEMA_VERSION, RELATION_ALIAS_SCHEMA_DESCRIPTION))
+    print(f"   ✅ 记录迁移版本 {RELATION_ALIAS_SCHEMA_VERSION}，关系规范化已启用")
+
+
+def explain_exact_lookups(connector):
+    """
+    用 EXPLAIN 检查等值查询是否使用索引
+    :return: 全部查询都使用索引返回True，否则返回False
+    """
+    print("\n🔍 检查查询计划...")
+    ok = True
+    with connector.connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for name, sql in EXACT_LOOKUP_QUERIES:
+                cursor.execute("EXPLAIN " + sql, ("__explain__", "__explain__"))
+                for row in cursor.fetchall():
+                    used = row.get('key')
+                    print(f"   - {name}: type={row.get('type')} key={used} possible_keys={row.get('possible_keys')}")
+                    if row.get('type') == 'ALL' or not used:
+                        ok = False
+        finally:
+            cursor.close()
+    print("✅ 查询均使用索引" if ok else "❌ 存在未使用索引的查询")
+    return ok
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("🧠 知识问答系统 - 关系规范化迁移工具")
+    print("=" * 50)
+
+    connector = DBConnector()
+    try:
+        if not (len(sys.argv) > 1 and sys.argv[1] == "explain"):
+            migrate(connector)
+        success = explain_exact_lookups(connector)
+    except Error as e:
+        print(f"❌ 迁移失败: {e}")
+        success = False
+    finally:
+        connector.close()
+
+    if success:
+        print("\n✨ 迁移完成！可将 SYSTEM_CONFIG['relation_match'] 设为 'exact'")
+    else:
+        sys.exit(1)
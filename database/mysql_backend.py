@@ -0,0 +1,72 @@
+#MySQL 存储后端：通过 DBConnector 连接池访问 MySQL，每次查询需要一次网络往返
+from mysql.connector import Error
+from database.db_connect import DBConnector
+from database.storage_backend import SQLBackend
+
+# 单次往返查询：把"正向→反向→正向无关系→反向无关系"四个分支合并为一条 UNION ALL，
+# 用 priority 列保持原有分支顺序，每个分支各自 LIMIT 1；{relation_cond} 为关系匹配条件（LIKE 或等值）
+UNION_LOOKUP_SQL = """
+    (SELECT entity2 AS answer, 1 AS priority FROM knowledge_triple
+     WHERE entity1 = %s AND {relation_cond} LIMIT 1)
+    UNION ALL
+    (SELECT entity1 AS answer, 2 AS priority FROM knowledge_triple
+     WHERE entity2 = %s AND {relation_cond} LIMIT 1)
+    ORDER BY priority
+    LIMIT 1
+"""
+
+UNION_LOOKUP_NO_REL_SQL = """
+    (SELECT entity2 AS answer, 1 AS priority FROM knowledge_triple
+     WHERE entity1 = %s AND {relation_cond} LIMIT 1)
+    UNION ALL
+    (SELECT entity1 AS answer, 2 AS priority FROM knowledge_triple
+     WHERE entity2 = %s AND {relation_cond} LIMIT 1)
+    UNION ALL
+    (SELECT entity2 AS answer, 3 AS priority FROM knowledge_triple
+     WHERE entity1 = %s LIMIT 1)
+    UNION ALL
+    (SELECT entity1 AS answer, 4 AS priority FROM knowledge_triple
+     WHERE entity2 = %s LIMIT 1)
+    ORDER BY priority
+    LIMIT 1
+"""
+
+# 三元组写入（存在则更新），批量写入时 executemany 会合并为多行 INSERT
+UPSERT_TRIPLE_SQL = """
+    INSERT INTO knowledge_triple (entity1, relation, entity2, create_time)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE entity2 = VALUES(entity2), create_time = VALUES(create_time)
+"""
+
+INSERT_ALIAS_SQL = "INSERT IGNORE INTO relation_alias (alias, canonical) VALUES (%s, %s)"
+
+
+class MySQLBackend(SQLBackend):
+    name = "mysql"
+    Error = Error
+    UNION_SQL = UNION_LOOKUP_SQL
+    UNION_NO_REL_SQL = UNION_LOOKUP_NO_REL_SQL
+    UPSERT_SQL = UPSERT_TRIPLE_SQL
+    INSERT_ALIAS_SQL = INSERT_ALIAS_SQL
+
+    def __init__(self, connector=None, lookup_mode="chain"):
+        """
+        :param connector: DBConnector 连接池，默认按 DB_CONFIG 创建
+        :param lookup_mode: 数据库查询方式，见 SQLBackend
+        """
+        super().__init__(lookup_mode)
+        self.connector = connector or DBConnector()
+
+    def connection(self):
+        return self.connector.connection()
+
+    def location(self):
+        config = self.connector.config
+        return f"mysql://{config.get('host', 'localhost')}:{config.get('port', 3306)}/{config.get('database', '')}"
+
+    def stats(self):
+        """返回后端名称和连接池统计信息"""
+        return {"backend": self.name, **self.connector.stats()}
+
+    def close(self):
+        self.connector.close()
@@ -0,0 +1,52 @@
+# 关系词规范化：维护"别名 → 规范关系"映射（如 创办人 → 创始人），使查询可以走 relation 列的等值索引
+import threading
+
+
+class RelationNormalizer:
+    def __init__(self, aliases=None):
+        """
+        初始化关系词规范化器
+        :param aliases: 预置别名映射 {别名: 规范关系}
+        """
+        self._canonical = {}
+        self._lock = threading.Lock()
+        for alias, canonical in (aliases or {}).items():
+            self.register(alias, canonical)
+
+    def __len__(self):
+        return len(self._canonical)
+
+    def load(self, rows):
+        """
+        加载 relation_alias 表中的映射（已存在的映射以先加载者为准）
+        :param rows: 可迭代的 (alias, canonical)
+        """
+        with self._lock:
+            for alias, canonical in rows:
+                self._canonical.setdefault(alias, canonical)
+                self._canonical.setdefault(canonical, canonical)
+
+    def register(self, alias, canonical=None):
+        """
+        登记别名（canonical 为空时登记为自身的规范关系）
+        :return: 别名最终对应的规范关系
+        """
+        canonical = canonical or alias
+        with self._lock:
+            # 规范关系本身可能也是别名，统一指向最终的规范关系
+            canonical = self._canonical.get(canonical, canonical)
+            self._canonical.setdefault(canonical, canonical)
+            return self._canonical.setdefault(alias, canonical)
+
+    def is_known(self, relation):
+        """关系词是否已在映射中（已知关系可使用等值查询）"""
+        return relation in self._canonical
+
+    def canonical(self, relation):
+        """返回关系词的规范形式，未知关系原样返回"""
+        return self._canonical.get(relation, relation)
+
+    def aliases(self):
+        """返回所有已知关系词（包括别名和规范关系），用于扩充抽取器词表"""
+        with self._lock:
+            return list(self._canonical)
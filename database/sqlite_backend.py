@@ -0,0 +1,183 @@
+#SQLite 存储后端：嵌入式数据库，查询在进程内完成，无需 MySQL 服务
+import itertools
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+
+from config.db_config import SQLITE_INIT_SQL, RELATION_ALIAS_SCHEMA_VERSION, RELATION_ALIAS_SCHEMA_DESCRIPTION
+from database.storage_backend import SQLBackend
+
+# Python 3.12 起 sqlite3 默认的 datetime 适配器已弃用，统一按 "YYYY-MM-DD HH:MM:SS" 文本保存
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", timespec="seconds"))
+
+# SQLite 不允许在 UNION ALL 的分支中直接使用 LIMIT，需要包一层子查询；分支顺序仍由 priority 列保证
+UNION_LOOKUP_SQL = """
+    SELECT answer FROM (
+        SELECT * FROM (SELECT entity2 AS answer, 1 AS priority FROM knowledge_triple
+                       WHERE entity1 = %s AND {relation_cond} LIMIT 1)
+        UNION ALL
+        SELECT * FROM (SELECT entity1 AS answer, 2 AS priority FROM knowledge_triple
+                       WHERE entity2 = %s AND {relation_cond} LIMIT 1)
+    )
+    ORDER BY priority
+    LIMIT 1
+"""
+
+UNION_LOOKUP_NO_REL_SQL = """
+    SELECT answer FROM (
+        SELECT * FROM (SELECT entity2 AS answer, 1 AS priority FROM knowledge_triple
+                       WHERE entity1 = %s AND {relation_cond} LIMIT 1)
+        UNION ALL
+        SELECT * FROM (SELECT entity1 AS answer, 2 AS priority FROM knowledge_triple
+                       WHERE entity2 = %s AND {relation_cond} LIMIT 1)
+        UNION ALL
+        SELECT * FROM (SELECT entity2 AS answer, 3 AS priority FROM knowledge_triple
+                       WHERE entity1 = %s LIMIT 1)
+        UNION ALL
+        SELECT * FROM (SELECT entity1 AS answer, 4 AS priority FROM knowledge_triple
+                       WHERE entity2 = %s LIMIT 1)
+    )
+    ORDER BY priority
+    LIMIT 1
+"""
+
+# 与 MySQL 的 ON DUPLICATE KEY UPDATE 等价：命中 uk_triple 时只刷新时间
+UPSERT_TRIPLE_SQL = """
+    INSERT INTO knowledge_triple (entity1, relation, entity2, create_time)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (entity1, relation, entity2)
+    DO UPDATE SET create_time = excluded.create_time, update_time = CURRENT_TIMESTAMP
+"""
+
+INSERT_ALIAS_SQL = "INSERT OR IGNORE INTO relation_alias (alias, canonical) VALUES (%s, %s)"
+
+# 为每个 ":memory:" 后端生成独立的共享内存库名称
+_memory_ids = itertools.count(1)
+
+
+class _ThreadConnection:
+    """线程局部的连接持有者：线程退出时其线程局部数据被释放，持有者随之回收，由 weakref.finalize 关闭连接"""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+
+def _close_thread_connection(lock, connections, conn):
+    """线程退出后关闭它的连接；后端已关闭（连接已不在 connections 中）时什么也不做"""
+    with lock:
+        if conn not in connections:
+            return
+        connections.discard(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class SQLiteBackend(SQLBackend):
+    name = "sqlite"
+    Error = sqlite3.Error
+    UNION_SQL = UNION_LOOKUP_SQL
+    UNION_NO_REL_SQL = UNION_LOOKUP_NO_REL_SQL
+    UPSERT_SQL = UPSERT_TRIPLE_SQL
+    INSERT_ALIAS_SQL = INSERT_ALIAS_SQL
+
+    def __init__(self, path="knowledge_graph.db", lookup_mode="chain", cached_statements=256, timeout=10):
+        """
+        每个线程使用自己的连接（sqlite3 连接不能跨线程并发使用），首次连接时按 SQLITE_INIT_SQL 建表
+        新建的数据库文件直接记录关系别名迁移版本（启用关系规范化）；已有文件没有该记录时关系词按原样匹配
+        :param path: 数据库文件路径，":memory:" 表示进程内临时数据库（同一后端的各线程共享）
+        :param lookup_mode: 数据库查询方式，见 SQLBackend
+        :param cached_statements: 每个连接缓存的预编译语句数，重复的查询语句无需再次解析
+        :param timeout: 写锁被占用时的最长等待时间（秒）
+        """
+        super().__init__(lookup_mode)
+        self.path = path
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._local = threading.local()
+        # 全部已打开的连接；线程退出时它的连接被关闭并移除，连接数不随线程的创建和退出增长
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        if path == ":memory:":
+            # 普通 :memory: 库每个连接各自独立，改用共享缓存的内存库，并保留一个连接使其在后端关闭前不被销毁
+            self._database = f"file:qa_memory_{next(_memory_ids)}?mode=memory&cache=shared"
+            self._uri = True
+        else:
+            self._database = path
+            self._uri = False
+        anchor = self._connect()
+        new_database = anchor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_triple'").fetchone() is None
+        anchor.executescript(SQLITE_INIT_SQL)
+        if new_database:
+            # 新建的数据库没有以别名保存的旧数据，关系别名迁移无需改写，直接记录为已完成
+            anchor.execute("INSERT OR IGNORE INTO schema_version (version, description) VALUES (?, ?)",
+                           (RELATION_ALIAS_SCHEMA_VERSION, RELATION_ALIAS_SCHEMA_DESCRIPTION))
+            anchor.commit()
+        # 创建后端的线程直接使用 anchor；anchor 只在 close() 时关闭（内存库在最后一个连接关闭时被销毁）
+        self._anchor = anchor
+        self._local.holder = _ThreadConnection(anchor)
+
+    def _connect(self):
+        """创建新连接：WAL 模式下读写互不阻塞，synchronous=NORMAL 每次提交无需等待 fsync"""
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("SQLite 后端已关闭")
+        conn = sqlite3.connect(
+            self._database,
+            uri=self._uri,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,  # 仅为了在 close() 中统一关闭，使用时每个连接只属于一个线程
+        )
+        conn.execute("PRAGMA journal_mode=WAL")  # 内存库不支持 WAL，会保持 memory 模式
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._connections.add(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """返回当前线程的连接（线程退出时自动关闭），出现异常时回滚未提交的修改"""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = _ThreadConnection(self._connect())
+            weakref.finalize(holder, _close_thread_connection, self._lock, self._connections, holder.conn)
+        conn = holder.conn
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def _sql(self, sql):
+        return sql.replace("%s", "?")
+
+    def location(self):
+        return self.path if self.path == ":memory:" else os.path.abspath(self.path)
+
+    def stats(self):
+        """返回后端名称、数据库路径和已打开的连接数"""
+        with self._lock:
+            connections = len(self._connections)
+        return {"backend": self.name, "path": self.path, "connections": connections}
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            self._closed = True
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
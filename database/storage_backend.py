@@ -0,0 +1,324 @@
+# 存储后端接口：DBOperation 只依赖这里定义的方法，MySQL / SQLite 等具体实现可通过配置切换
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from config.system_config import SYSTEM_CONFIG
+from monitoring import METRICS, get_logger, log_event
+
+logger = get_logger("database.backend")
+
+
+def relation_condition(relation, exact=False):
+    """
+    返回关系匹配的 SQL 条件和参数
+    :param exact: 为True时使用等值条件（可走索引），否则使用子串模糊匹配
+    :return: ("relation = %s", relation) 或 ("relation LIKE %s", "%relation%")
+    """
+    if exact:
+        return "relation = %s", relation
+    return "relation LIKE %s", f'%{relation}%'
+
+
+class StorageBackend(ABC):
+    """
+    知识三元组存储后端接口
+    实现类出错时抛出自身的 Error 类型（类属性），由 DBOperation 统一捕获和提示
+    """
+    name = None
+    Error = Exception
+
+    @abstractmethod
+    def query_knowledge(self, entity1, relation, exact=False):
+        """
+        按"正向 → 反向 → 正向无关系 → 反向无关系"的顺序查询答案
+        :param exact: 为True时关系按等值匹配，否则按子串匹配
+        :return: 答案或None
+        """
+
+    @abstractmethod
+    def save_knowledge(self, entity1, relation, entity2, alias=None):
+        """
+        保存（存在则更新）一个三元组并提交
+        :param alias: 需要同时登记的 (别名, 规范关系)，与三元组在同一事务中提交
+        """
+
+    @abstractmethod
+    def get_all_relations(self):
+        """返回所有不重复的关系词列表"""
+
+    @abstractmethod
+    def save_batch(self, rows, aliases, report_error):
+        """
+        写入一批三元组并提交；整批失败时逐行重试，出错的行交给 report_error(key, triple, message)
+        :param rows: [(key, (entity1, relation, entity2)), ...]，key 由调用方定义（如输入偏移量）
+        :param aliases: 需要同时登记的 {别名: 规范关系}
+        :return: 成功写入的 rows 子集
+        """
+
+    @abstractmethod
+    def iter_triples(self, batch_size=10000):
+        """分批遍历全部三元组，逐个产出 (entity1, relation, entity2)"""
+
+    @abstractmethod
+    def iter_entity_triples(self, entities, chunk_size=500):
+        """产出以给定实体为 entity1 或 entity2 的全部三元组 (entity1, relation, entity2)"""
+
+    @abstractmethod
+    def max_triple_id(self):
+        """返回 knowledge_triple 当前最大的 id（空表返回0），新增三元组后变大，用作派生数据的指纹"""
+
+    @abstractmethod
+    def iter_triples_after(self, last_id, batch_size=10000):
+        """按 id 顺序产出 id 大于 last_id 的三元组 (id, entity1, relation, entity2)"""
+
+    @abstractmethod
+    def load_relation_aliases(self):
+        """返回 relation_alias 表中的全部 (alias, canonical)"""
+
+    @abstractmethod
+    def has_schema_version(self, version):
+        """schema_version 表中是否记录了该迁移版本（表不存在时抛出 Error）"""
+
+    def location(self):
+        """返回标识所连接数据库的字符串，用于派生与该数据库对应的本地文件名（如写后日志）"""
+        return self.name
+
+    def stats(self):
+        """返回后端统计信息"""
+        return {"backend": self.name}
+
+    def close(self):
+        """释放后端资源"""
+
+
+class SQLBackend(StorageBackend):
+    """
+    基于 DB-API 连接的通用实现
+    子类提供 connection() 上下文管理器和方言相关的 SQL；SQL 统一以 %s 作为参数占位符书写
+    """
+    FORWARD_SQL = "SELECT entity2 FROM knowledge_triple WHERE entity1 = %s AND {relation_cond} LIMIT 1"
+    REVERSE_SQL = "SELECT entity1 FROM knowledge_triple WHERE entity2 = %s AND {relation_cond} LIMIT 1"
+    FORWARD_NO_REL_SQL = "SELECT entity2 FROM knowledge_triple WHERE entity1 = %s LIMIT 1"
+    REVERSE_NO_REL_SQL = "SELECT entity1 FROM knowledge_triple WHERE entity2 = %s LIMIT 1"
+    # 单条语句完成全部回退分支，第一列为答案
+    UNION_SQL = None
+    UNION_NO_REL_SQL = None
+    # 三元组写入（存在则更新），参数 (entity1, relation, entity2, create_time)
+    UPSERT_SQL = None
+    # 别名登记（已存在则忽略），参数 (alias, canonical)
+    INSERT_ALIAS_SQL = None
+
+    def __init__(self, lookup_mode="chain"):
+        """
+        :param lookup_mode: "chain" 依次执行最多四条回退查询；"union" 合并为一条语句
+        """
+        self.lookup_mode = lookup_mode
+
+    @abstractmethod
+    def connection(self):
+        """借出连接的上下文管理器：异常时回滚，退出时归还"""
+
+    def _sql(self, sql):
+        """把通用 SQL 转换为后端的参数风格（默认 %s，无需转换）"""
+        return sql
+
+    def query_knowledge(self, entity1, relation, exact=False):
+        relation_cond, rel_param = relation_condition(relation, exact)
+        no_relation = not relation or relation.strip() == ''
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if self.lookup_mode == "union":
+                    # 单次往返：分支顺序由 priority 列保证，与 chain 模式结果一致
+                    if no_relation:
+                        sql = self.UNION_NO_REL_SQL
+                        params = (entity1, rel_param, entity1, rel_param, entity1, entity1)
+                    else:
+                        sql = self.UNION_SQL
+                        params = (entity1, rel_param, entity1, rel_param)
+                    with METRICS.timer("db.query.union"):
+                        cursor.execute(self._sql(sql.format(relation_cond=relation_cond)), params)
+                        result = cursor.fetchone()
+                    return result[0] if result else None
+
+                # 正向查询：entity1 → entity2（模糊匹配关系，提升容错率；exact 模式下已知关系走等值索引）
+                # 反向查询：entity2 → entity1（当正向查询失败时）
+                # 例如："中国的首都是什么？" → 查询 entity2="中国的首都" 的记录，返回 entity1="北京"
+                # 每个回退分支单独计时（db.query.forward / reverse / forward_no_rel / reverse_no_rel）
+                branches = [
+                    ("db.query.forward", self.FORWARD_SQL.format(relation_cond=relation_cond), (entity1, rel_param)),
+                    ("db.query.reverse", self.REVERSE_SQL.format(relation_cond=relation_cond), (entity1, rel_param)),
+                ]
+                # 如果关系为空，尝试无关系匹配
+                if no_relation:
+                    branches.append(("db.query.forward_no_rel", self.FORWARD_NO_REL_SQL, (entity1,)))
+                    branches.append(("db.query.reverse_no_rel", self.REVERSE_NO_REL_SQL, (entity1,)))
+                for stage, sql, params in branches:
+                    with METRICS.timer(stage):
+                        cursor.execute(self._sql(sql), params)
+                        result = cursor.fetchone()
+                    if result:
+                        return result[0]
+                return None
+            finally:
+                cursor.close()
+
+    def save_knowledge(self, entity1, relation, entity2, alias=None):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if alias:
+                    # 新关系词登记为别名，与三元组在同一事务中提交
+                    cursor.execute(self._sql(self.INSERT_ALIAS_SQL), alias)
+                cursor.execute(self._sql(self.UPSERT_SQL), (entity1, relation, entity2, datetime.now()))
+                with METRICS.timer("db.commit"):
+                    conn.commit()
+            finally:
+                cursor.close()
+
+    def save_batch(self, rows, aliases, report_error):
+        now = datetime.now()
+        alias_rows = list(aliases.items())
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    if alias_rows:
+                        cursor.executemany(self._sql(self.INSERT_ALIAS_SQL), alias_rows)
+                    cursor.executemany(self._sql(self.UPSERT_SQL), [triple + (now,) for _, triple in rows])
+                    with METRICS.timer("db.commit"):
+                        conn.commit()
+                    return list(rows)
+                finally:
+                    cursor.close()
+        except self.Error as batch_error:
+            # 整批失败：逐行重试定位坏行，其余行照常写入
+            log_event(logger, logging.WARNING, "批量写入失败，逐行重试", rows=len(rows), error=batch_error)
+
+        saved_rows = []
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if alias_rows:
+                    cursor.executemany(self._sql(self.INSERT_ALIAS_SQL), alias_rows)
+                for key, triple in rows:
+                    try:
+                        cursor.execute(self._sql(self.UPSERT_SQL), triple + (now,))
+                        saved_rows.append((key, triple))
+                    except self.Error as e:
+                        report_error(key, triple, str(e))
+                with METRICS.timer("db.commit"):
+                    conn.commit()
+            finally:
+                cursor.close()
+        return saved_rows
+
+    def get_all_relations(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT DISTINCT relation FROM knowledge_triple ORDER BY relation")
+                return [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+    def iter_triples(self, batch_size=10000):
+        # 遍历期间占用一个连接，生成器结束或关闭时归还
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT entity1, relation, entity2 FROM knowledge_triple")
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield tuple(row)
+            finally:
+                cursor.close()
+
+    def max_triple_id(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT MAX(id) FROM knowledge_triple")
+                row = cursor.fetchone()
+                return row[0] or 0
+            finally:
+                cursor.close()
+
+    def iter_triples_after(self, last_id, batch_size=10000):
+        # 按主键分页（WHERE id > 上一批最大 id），每批走主键范围扫描，不随偏移量变慢
+        sql = self._sql("SELECT id, entity1, relation, entity2 FROM knowledge_triple "
+                        "WHERE id > %s ORDER BY id LIMIT %s")
+        while True:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(sql, (last_id, batch_size))
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+            for row in rows:
+                yield tuple(row)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def iter_entity_triples(self, entities, chunk_size=500):
+        # 每个分块只需两条 IN 查询（正向、反向），与键的数量无关
+        entities = list(entities)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for i in range(0, len(entities), chunk_size):
+                    chunk = entities[i:i + chunk_size]
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    for column in ('entity1', 'entity2'):
+                        cursor.execute(self._sql(
+                            f"SELECT entity1, relation, entity2 FROM knowledge_triple WHERE {column} IN ({placeholders})"
+                        ), chunk)
+                        for row in cursor.fetchall():
+                            yield tuple(row)
+            finally:
+                cursor.close()
+
+    def load_relation_aliases(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT alias, canonical FROM relation_alias")
+                return [tuple(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+    def has_schema_version(self, version):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self._sql("SELECT 1 FROM schema_version WHERE version = %s"), (version,))
+                return cursor.fetchone() is not None
+            finally:
+                cursor.close()
+
+
+def create_backend(name=None, lookup_mode=None):
+    """
+    按系统配置创建存储后端（延迟导入，使用 SQLite 时不会建立 MySQL 连接）
+    :param name: "mysql" 或 "sqlite"，默认取 SYSTEM_CONFIG["storage_backend"]
+    :param lookup_mode: 数据库查询方式，默认取 SYSTEM_CONFIG["db_lookup_mode"]
+    :return: StorageBackend 实例
+    """
+    name = name or SYSTEM_CONFIG.get("storage_backend", "mysql")
+    lookup_mode = lookup_mode or SYSTEM_CONFIG.get("db_lookup_mode", "chain")
+    if name == "sqlite":
+        from database.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(
+            path=SYSTEM_CONFIG.get("sqlite_path", "knowledge_graph.db"),
+            lookup_mode=lookup_mode,
+            cached_statements=SYSTEM_CONFIG.get("sqlite_cached_statements", 256),
+        )
+    if name == "mysql":
+        from database.mysql_backend import MySQLBackend
+        return MySQLBackend(lookup_mode=lookup_mode)
+    raise ValueError(f"未知的存储后端: {name}")
@@ -0,0 +1,118 @@
+# 内存三元组索引：启动时从 knowledge_triple 全量加载，查询直接走字典，MySQL 只作为持久化存储
+import threading
+
+from database.collation import fold_key
+
+
+class TripleIndex:
+    def __init__(self):
+        # 键按排序规则归一化（fold_key），与数据库的 = / LIKE 比较一致；值保存原始字符串
+        # 正向索引：entity1 键 → {relation 键: [entity2, ...]}
+        self._forward = {}
+        # 反向索引：entity2 键 → {relation 键: [entity1, ...]}
+        self._reverse = {}
+        # 关系子串索引：子串 → {包含该子串的关系词键}，用于复现 relation LIKE '%relation%' 的语义
+        self._substrings = {}
+        # 关系词键 → 第一次写入时的原始关系词
+        self._relation_names = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.size = 0
+
+    def load(self, triples):
+        """
+        全量加载三元组
+        :param triples: 可迭代的 (entity1, relation, entity2)
+        :return: 加载的三元组数量
+        """
+        with self._lock:
+            for entity1, relation, entity2 in triples:
+                self.add(entity1, relation, entity2)
+            self.loaded = True
+            return self.size
+
+    def add(self, entity1, relation, entity2):
+        """写入一个三元组（与 uk_triple 唯一键在排序规则下一致，重复写入不产生新记录）"""
+        key1, relation_key, key2 = fold_key(entity1), fold_key(relation), fold_key(entity2)
+        with self._lock:
+            targets = self._forward.setdefault(key1, {}).setdefault(relation_key, [])
+            # 同一实体同一关系下的答案很少，直接逐个比较键
+            if any(fold_key(target) == key2 for target in targets):
+                return
+            targets.append(entity2)
+            self._reverse.setdefault(key2, {}).setdefault(relation_key, []).append(entity1)
+            self._register_relation(relation_key, relation)
+            self.size += 1
+
+    def _register_relation(self, relation_key, relation):
+        """登记关系词键的全部子串（关系词很短，子串数量可控）"""
+        if relation_key in self._relation_names:
+            return
+        self._relation_names[relation_key] = relation
+        length = len(relation_key)
+        for i in range(length):
+            for j in range(i + 1, length + 1):
+                self._substrings.setdefault(relation_key[i:j], set()).add(relation_key)
+
+    def relations(self):
+        """返回索引中所有不重复的关系词（排序规则下相等的关系词只返回第一次写入的形式）"""
+        with self._lock:
+            return sorted(self._relation_names.values())
+
+    def _match(self, rel_map, relation, exact=False):
+        """
+        在某个实体的关系表中找到一个"包含 relation 子串"（exact 时为"等于 relation"）的关系，返回其对应的值
+        relation 按排序规则归一化后比较，与数据库的 = / LIKE 一致
+        """
+        if not rel_map:
+            return None
+        relation = fold_key(relation) if relation else relation
+        if exact:
+            values = rel_map.get(relation)
+            return values[0] if values else None
+        if not relation:
+            # relation 为空时 LIKE '%%' 匹配任意关系
+            for values in rel_map.values():
+                return values[0]
+            return None
+        candidates = self._substrings.get(relation)
+        if not candidates:
+            return None
+        # 遍历两者中较小的集合，避免扫描
+        if len(rel_map) <= len(candidates):
+            for rel, values in rel_map.items():
+                if rel in candidates:
+                    return values[0]
+        else:
+            for rel in candidates:
+                values = rel_map.get(rel)
+                if values:
+                    return values[0]
+        return None
+
+    def lookup(self, entity1, relation, exact=False):
+        """
+        按 query_knowledge 的语义查询答案：先正向（entity1 → entity2），再反向（entity2 → entity1）
+        :param entity1: 实体1
+        :param relation: 关系（默认子串匹配）
+        :param exact: 为True时关系按等值匹配（对应 relation_match="exact"）
+        :return: 答案或None
+        """
+        with self._lock:
+            answer = self.lookup_forward(entity1, relation, exact)
+            if answer is not None:
+                return answer
+            return self.lookup_reverse(entity1, relation, exact)
+
+    def lookup_forward(self, entity1, relation, exact=False):
+        """只查正向：entity1 → entity2"""
+        with self._lock:
+            return self._match(self._forward.get(fold_key(entity1)), relation, exact)
+
+    def lookup_reverse(self, entity2, relation, exact=False):
+        """只查反向：entity2 → entity1"""
+        with self._lock:
+            return self._match(self._reverse.get(fold_key(entity2)), relation, exact)
+
+    def close(self):
+        """内存索引无需释放资源（与 SnapshotIndex 接口一致）"""
@@ -0,0 +1,335 @@
+# 写后队列：学习到的三元组先写入本地日志并入队立即返回，由后台线程合并为多行事务批量提交（组提交）
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 flock，不加锁（同一日志只能由一个进程使用）
+    fcntl = None
+
+from database.triple_index import TripleIndex
+from monitoring import METRICS, get_logger, log_event
+
+logger = get_logger("database.write_behind")
+
+
+class JournalLockedError(RuntimeError):
+    """日志已被另一个进程中的写后队列占用"""
+
+
+class WriteBehindQueue:
+    def __init__(self, db_operation, journal_path, max_batch=200, max_delay=0.05, max_queue=10000, fsync=False):
+        """
+        :param db_operation: 负责实际写入的 DBOperation（通过其批量写入路径提交，并同步内存结构）
+        :param journal_path: 本地追加日志路径；进程崩溃后未提交的写入在下次启动时重放。
+                             队列运行期间持有 journal_path + ".lock" 的排他锁，同一日志只能由一个进程使用
+        :param max_batch: 每个事务最多包含的三元组数
+        :param max_delay: 第一条入队后最多等待的秒数，到期即使不满一批也提交
+        :param max_queue: 队列上限（含正在提交的一批），队列满时 submit 阻塞，提供背压
+        :param fsync: 为True时每条日志写入后 fsync（断电也不丢失）；默认只刷到操作系统缓冲（进程崩溃不丢失）
+        """
+        self.db = db_operation
+        self.journal_path = journal_path
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.max_queue = max(self.max_batch, max_queue)
+        self.fsync = fsync
+        # 日志超过该大小时在提交后重写为只含未提交的条目
+        self.journal_compact_bytes = 64 * 1024 * 1024
+
+        self._cond = threading.Condition()
+        self._pending = deque()  # [(seq, 入队时间, entity1, relation, entity2), ...]
+        self._inflight = []  # 正在提交的一批，提交完成前仍对读可见
+        self._overlay = TripleIndex()  # 未提交三元组（规范关系）的只读视图，每批提交后重建
+        self._seq = 0  # 最后分配的序号
+        self._committed_seq = 0  # 已处理（提交或因数据错误丢弃）的最大序号
+        self._flush_waiters = 0
+        self._closing = False
+        self._abandoned = False
+        self._journal = None
+        self._journal_bytes = 0
+        self._lock_file = None
+        self._thread = None
+
+        # 统计
+        self.submitted = 0
+        self.committed = 0
+        self.failed = 0
+        self.batches = 0
+        self.replayed = 0
+
+    def start(self):
+        """
+        锁定日志，重放其中未提交的写入，然后启动后台写线程
+        :raises JournalLockedError: 日志正被另一个进程使用
+        """
+        self._acquire_lock()
+        try:
+            replay = self._read_journal()
+            with self._cond:
+                self._rewrite_journal(replay)
+        except BaseException:
+            self._release_lock()
+            raise
+        with self._cond:
+            for seq, entity1, relation, entity2 in replay:
+                self._pending.append((seq, time.monotonic(), entity1, relation, entity2))
+                self._overlay.add(entity1, self.db._normalize_relation(relation), entity2)
+                self._seq = max(self._seq, seq)
+            self._committed_seq = replay[0][0] - 1 if replay else self._seq
+            self.replayed = len(replay)
+        for _, entity1, relation, entity2 in replay:
+            self.db._after_enqueue(entity1, self.db._normalize_relation(relation), entity2)
+        if replay:
+            log_event(logger, logging.WARNING, "重放写后日志中未提交的写入", path=self.journal_path, triples=len(replay))
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        return self
+
+    def _acquire_lock(self):
+        """
+        对锁文件加排他锁（非阻塞）：两个进程同时追加、重放和截断同一日志会重复提交或丢失写入
+        锁加在单独的锁文件上，日志本身会被 _rewrite_journal 替换为新文件；进程退出（包括崩溃）时锁自动释放
+        """
+        if fcntl is None:
+            return
+        lock_file = open(f"{self.journal_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise JournalLockedError(f"写后日志正被另一个进程使用: {self.journal_path}") from None
+        except BaseException:
+            lock_file.close()
+            raise
+        self._lock_file = lock_file
+
+    def _release_lock(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # 关闭文件即释放 flock
+            self._lock_file = None
+
+    def _read_journal(self):
+        """
+        读取日志，返回最后一个提交标记之后的写入 [(seq, entity1, relation, entity2), ...]
+        最后一行可能在崩溃时只写了一半，解析失败的行跳过
+        """
+        if not os.path.exists(self.journal_path):
+            return []
+        entries = {}
+        committed = 0
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                    if "commit" in record:
+                        committed = max(committed, record["commit"])
+                    else:
+                        entity1, relation, entity2 = record["triple"]
+                        entries[record["seq"]] = (entity1, relation, entity2)
+                except (ValueError, KeyError, TypeError):
+                    log_event(logger, logging.WARNING, "跳过无法解析的写后日志行", path=self.journal_path,
+                              line=line_number)
+        return [(seq,) + triple for seq, triple in sorted(entries.items()) if seq > committed]
+
+    def _rewrite_journal(self, entries):
+        """把日志重写为只含给定条目（先写临时文件再替换），之后继续追加；调用方持有 _cond"""
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for seq, entity1, relation, entity2 in entries:
+                f.write(self._put_record(seq, entity1, relation, entity2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal_bytes = os.path.getsize(self.journal_path)
+
+    @staticmethod
+    def _put_record(seq, entity1, relation, entity2):
+        return json.dumps({"seq": seq, "triple": [entity1, relation, entity2]}, ensure_ascii=False) + "\n"
+
+    def _append(self, record):
+        """追加一行日志；调用方持有 _cond"""
+        self._journal.write(record)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_bytes += len(record)
+
+    def submit(self, entity1, relation, entity2):
+        """
+        写入日志并入队，立即返回（队列满时等待后台线程腾出空间）
+        入队后同一进程内的查询立即可见
+        :return: 入队成功返回True；三元组为空或队列已关闭返回False
+        """
+        if not (entity1 and relation and entity2):
+            return False
+        with self._cond:
+            while len(self._pending) + len(self._inflight) >= self.max_queue and not self._closing:
+                self._cond.wait()
+            if self._closing:
+                return False
+            self._seq += 1
+            self._append(self._put_record(self._seq, entity1, relation, entity2))
+            self._pending.append((self._seq, time.monotonic(), entity1, relation, entity2))
+            relation = self.db._normalize_relation(relation)
+            self._overlay.add(entity1, relation, entity2)
+            self.submitted += 1
+            self._cond.notify_all()
+        self.db._after_enqueue(entity1, relation, entity2)
+        return True
+
+    def lookup(self, entity1, relation, exact=False):
+        """按 query_knowledge 的语义在未提交的三元组中查询（relation 为规范关系），没有时返回None"""
+        overlay = self._overlay
+        if not overlay.size:
+            return None
+        return overlay.lookup(entity1, relation, exact=exact)
+
+    def __len__(self):
+        """未提交的三元组数（含正在提交的一批）"""
+        with self._cond:
+            return len(self._pending) + len(self._inflight)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # 组提交：攒够一批、第一条等待超过 max_delay、有 flush/close 等待时提交
+                deadline = self._pending[0][1] + self.max_delay
+                while len(self._pending) < self.max_batch and not self._closing and not self._flush_waiters:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                count = min(self.max_batch, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(count)]
+                self._inflight = batch
+            if not self._commit(batch):
+                return
+            with self._cond:
+                self._committed_seq = batch[-1][0]
+                self._inflight = []
+                if self._journal is None:
+                    # close 已超时返回；这批已提交，重放时按唯一键覆盖写入，不会产生重复
+                    self._cond.notify_all()
+                    return
+                # 已提交的三元组由 _after_save 写入内存结构，重建只含剩余未提交条目的视图
+                overlay = TripleIndex()
+                for _, _, entity1, relation, entity2 in self._pending:
+                    overlay.add(entity1, self.db._normalize_relation(relation), entity2)
+                self._overlay = overlay
+                if not self._pending:
+                    # 全部提交，直接清空日志（无需提交标记，也不需要 fsync）
+                    self._journal.flush()
+                    self._journal.truncate(0)
+                    self._journal_bytes = 0
+                elif self._journal_bytes > self.journal_compact_bytes:
+                    self._rewrite_journal([(seq, entity1, relation, entity2)
+                                           for seq, _, entity1, relation, entity2 in self._pending])
+                else:
+                    self._append(json.dumps({"commit": self._committed_seq}) + "\n")
+                self._cond.notify_all()
+
+    def _commit(self, batch):
+        """
+        把一批写入作为一个事务提交；数据库不可用时退避重试，不丢弃
+        :return: 提交完成返回True；close 超时放弃时返回False（这批写入留在日志中，下次启动重放）
+        """
+        rows = [(seq, (entity1, relation, entity2)) for seq, _, entity1, relation, entity2 in batch]
+
+        def report_error(seq, triple, message):
+            self.failed += 1
+            log_event(logger, logging.ERROR, "写后队列丢弃无法写入的三元组", seq=seq, triple=triple, error=message)
+
+        retry_delay = 0.1
+        while True:
+            try:
+                with METRICS.timer("write_behind.commit"):
+                    saved = self.db._save_batch(rows, report_error)
+                break
+            except self.db.backend.Error as e:
+                log_event(logger, logging.ERROR, "写后队列提交失败，稍后重试", rows=len(rows), error=e)
+                with self._cond:
+                    if self._abandoned:
+                        return False
+                    self._cond.wait(retry_delay)
+                    if self._abandoned:
+                        return False
+                retry_delay = min(retry_delay * 2, 5.0)
+        METRICS.record("write_behind.delay", time.monotonic() - batch[0][1])
+        self.committed += saved
+        self.batches += 1
+        return True
+
+    def flush(self, timeout=None):
+        """
+        等待此前入队的全部写入提交完成（屏障）
+        :param timeout: 最长等待秒数，None 表示一直等待
+        :return: 全部提交返回True，超时返回False
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            target = self._seq
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try:
+                while self._committed_seq < target:
+                    if self._thread is None or not self._thread.is_alive():
+                        return False
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout=None):
+        """
+        停止接收新写入，提交队列中的全部写入后关闭日志
+        :param timeout: 最长等待秒数；超时（例如数据库不可用）时放弃，未提交的写入留在日志中，下次启动重放
+        :return: 全部提交返回True
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            remaining = len(self._pending) + len(self._inflight)
+            if self._thread is not None and self._thread.is_alive():
+                self._abandoned = True
+                self._cond.notify_all()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self._release_lock()
+        if remaining:
+            log_event(logger, logging.WARNING, "写后队列关闭时仍有未提交的写入，将在下次启动时重放",
+                      path=self.journal_path, triples=remaining)
+        return not remaining
+
+    def stats(self):
+        """返回队列统计：排队数、已入队/已提交/丢弃的三元组数、提交批次数、平均批大小、启动时重放数"""
+        with self._cond:
+            queued = len(self._pending) + len(self._inflight)
+        return {
+            "queued": queued,
+            "submitted": self.submitted,
+            "committed": self.committed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch": self.committed / self.batches if self.batches else 0.0,
+            "replayed": self.replayed,
+            "journal_bytes": self._journal_bytes,
+        }
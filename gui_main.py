@@ -5,6 +5,8 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, simpledialog
 from core.qa_engine import QAEngine
+from config.system_config import SYSTEM_CONFIG
+from monitoring import configure_logging
 import threading
 
 
@@ -371,6 +373,7 @@ class QAGUI:
 
 
 def main():
+    configure_logging(SYSTEM_CONFIG.get("log_level", "WARNING"), SYSTEM_CONFIG.get("log_format", "text"))
     root = tk.Tk()
     app = QAGUI(root)
     root.mainloop()
@@ -1,6 +1,9 @@
 from core.qa_engine import QAEngine
+from config.system_config import SYSTEM_CONFIG
+from monitoring import configure_logging
 
 def main():
+    configure_logging(SYSTEM_CONFIG.get("log_level", "WARNING"), SYSTEM_CONFIG.get("log_format", "text"))
     # 初始化问答引擎
     qa_engine = QAEngine()
     print("======================================")
@@ -0,0 +1,32 @@
+"""
+监控模块 (monitoring)
+====================
+
+本模块提供知识问答系统的运行时观测能力，不依赖其他业务模块：
+
+- METRICS / MetricsRegistry / Histogram: 分阶段耗时直方图
+  - 抽取、各查询回退分支、连接借出、提交、请求总耗时
+  - 快照通过 QAEngine.stats() 和 HTTP 服务的 /stats 输出
+  - 禁用时计时器为空操作
+
+- get_logger / log_event / configure_logging: 分级结构化日志
+  - 基于标准库 logging，日志器均位于 knowledge_qa.* 之下
+  - 支持 text（key=value）和 json 两种输出格式
+  - 级别未启用时不构建字段、不格式化
+
+- start_memory_tracing / memory_report / dump_memory_report: tracemalloc 内存报告
+
+主要组件：
+    METRICS: 进程级耗时注册表
+    get_logger: 获取模块日志器
+    configure_logging: 配置日志级别和格式（由程序入口调用）
+"""
+
+from .metrics import METRICS, MetricsRegistry, Histogram
+from .structured_log import get_logger, log_event, configure_logging, StructuredFormatter
+from .memory import start_memory_tracing, stop_memory_tracing, memory_report, dump_memory_report
+
+# 定义模块的公共API
+__all__ = ['METRICS', 'MetricsRegistry', 'Histogram',
+           'get_logger', 'log_event', 'configure_logging', 'StructuredFormatter',
+           'start_memory_tracing', 'stop_memory_tracing', 'memory_report', 'dump_memory_report']
@@ -0,0 +1,54 @@
+# 内存分析：基于 tracemalloc 统计分配最多的代码位置
+import time
+import tracemalloc
+
+
+def start_memory_tracing(frames=1):
+    """
+    开始跟踪内存分配（有一定运行开销，仅在排查内存问题时开启）
+    :param frames: 每次分配记录的调用栈深度
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_memory_tracing():
+    """停止跟踪并释放跟踪数据"""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def memory_report(limit=10):
+    """
+    返回当前内存分配报告；未开启跟踪时返回None
+    :param limit: 返回分配量最大的前 limit 个代码位置
+    :return: {"current_mb", "peak_mb", "top": [{"location", "size_kb", "count"}, ...]}
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+    return {
+        "current_mb": current / 1024 / 1024,
+        "peak_mb": peak / 1024 / 1024,
+        "top": [
+            {"location": str(stat.traceback[0]), "size_kb": stat.size / 1024, "count": stat.count}
+            for stat in stats
+        ],
+    }
+
+
+def dump_memory_report(path, limit=25):
+    """
+    把内存分配报告写入文本文件
+    :return: 写入成功返回True，未开启跟踪时返回False
+    """
+    report = memory_report(limit)
+    if report is None:
+        return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# 内存分配报告 {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"当前 {report['current_mb']:.1f} MB，峰值 {report['peak_mb']:.1f} MB\n\n")
+        for item in report["top"]:
+            f.write(f"{item['size_kb']:>12.1f} KB {item['count']:>10} 次  {item['location']}\n")
+    return True
@@ -0,0 +1,134 @@
+# 耗时直方图：按阶段记录耗时分布（对数分桶），供 QAEngine.stats() 和 /stats 输出快照
+import bisect
+import math
+import threading
+import time
+
+# 分桶上界（秒）：1 微秒起每档翻倍，最后一档约 67 秒，更慢的记入溢出桶
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** i for i in range(27))
+
+
+class Histogram:
+    """单个阶段的耗时直方图（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def record(self, seconds):
+        index = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self._buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def _percentile(self, buckets, count, pct):
+        """返回 pct 分位数所在分桶的上界（不超过实际最大值）"""
+        rank = max(1, math.ceil(pct / 100 * count))
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        """返回统计快照（毫秒）：次数、均值、最小/最大值、p50/p90/p99（按分桶上界估计）"""
+        with self._lock:
+            buckets = list(self._buckets)
+            count, total, minimum, maximum = self.count, self.total, self.min, self.max
+        if not count:
+            return {"count": 0}
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000,
+            "min_ms": minimum * 1000,
+            "max_ms": maximum * 1000,
+            "p50_ms": self._percentile(buckets, count, 50) * 1000,
+            "p90_ms": self._percentile(buckets, count, 90) * 1000,
+            "p99_ms": self._percentile(buckets, count, 99) * 1000,
+        }
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.record(time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    按名称管理耗时直方图
+    用法：
+        with METRICS.timer("db.commit"):
+            conn.commit()
+    禁用（enabled=False）时 timer() 返回空操作的上下文管理器，不计时也不加锁
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def timer(self, name):
+        """返回记录到 name 直方图的计时上下文管理器"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(name))
+
+    def record(self, name, seconds):
+        """直接记录一次耗时（秒）"""
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def snapshot(self):
+        """返回 {阶段名称: 统计快照}"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histograms[name].snapshot() for name in sorted(histograms)}
+
+    def reset(self):
+        """清空全部直方图"""
+        with self._lock:
+            self._histograms = {}
+
+
+# 进程级的默认注册表，各模块直接使用
+METRICS = MetricsRegistry()
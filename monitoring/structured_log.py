@@ -0,0 +1,71 @@
+# 分级结构化日志：基于标准库 logging，事件名 + 键值字段，关闭对应级别时不产生格式化开销
+import json
+import logging
+import sys
+import time
+
+ROOT_LOGGER = "knowledge_qa"
+
+
+def get_logger(name):
+    """返回 knowledge_qa.<name> 日志器"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def log_event(logger, level, event, **fields):
+    """
+    记录一条结构化日志；级别未启用时直接返回
+    热点路径上可先判断 logger.isEnabledFor(level)，连字段字典也不构建
+    :param event: 事件描述
+    :param fields: 结构化字段（如 entity1=..., elapsed_ms=...）
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+class StructuredFormatter(logging.Formatter):
+    """text 格式：时间 级别 日志器 事件 key=value ...；json 格式：每行一个 JSON 对象"""
+
+    def __init__(self, fmt="text"):
+        super().__init__()
+        self.json_output = fmt == "json"
+
+    def format(self, record):
+        fields = getattr(record, "fields", None) or {}
+        message = record.getMessage()
+        if self.json_output:
+            payload = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "event": message,
+                **fields,
+            }
+            if record.exc_info:
+                payload["exception"] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
+        line = f"{timestamp} {record.levelname:<7} {record.name} {message}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level="WARNING", fmt="text", stream=None):
+    """
+    为 knowledge_qa.* 日志器配置输出（由 main.py / server.py 等入口调用，重复调用会替换之前的配置）
+    :param level: 日志级别名称或数值，如 "INFO"、"WARNING"
+    :param fmt: "text" 或 "json"
+    :param stream: 输出流，默认 stderr
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(StructuredFormatter(fmt))
+    logger.addHandler(handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    return logger
@@ -13,14 +13,40 @@
     1. 实体识别：提取问题中的核心实体（如：Python、苹果等）
     2. 关系抽取：识别实体间的关系（如：创始人、颜色等）
     3. 三元组构建：将问题和答案组合成结构化知识
+    4. 关系链解析：多跳问题（如"Python的创始人的国籍"）解析为实体 + 关系链
+
+- EntityRecognizer: 已知实体识别器
+  - 知识库全部实体构成字符字典树，对问题做一次从左到右的最长匹配切分
+  - 识别到的已知实体优先于规则切分，学习新知识时增量加入
+
+- ParseCache: 问题解析缓存
+  - 按规范化后的问题文本（首尾空白、末尾问号）缓存抽取结果，LRU 淘汰
+  - 关系词表或已知实体变化时整体失效，提供命中率统计
+  - normalize_question：问题的规范化规则（缓存键即解析输入），无论是否启用缓存，解析和学习都使用同一规则
+
+- RelationMatcher: 关系词匹配器
+  - 基于 Aho-Corasick 自动机，一次扫描找出问题中的全部关系词
+  - 匹配代价与关系词表规模无关
+
+- IncrementalRelationMatcher: 可在线增删的关系词匹配器
+  - 自动机 + 增量字典树 + 删除集合，每次增删 O(len(关系词))
+  - 读操作无锁，学习到的新关系词无需重启即可识别
 
 主要类：
     TripleExtractor: 三元组抽取器，提供静态方法处理文本
+    EntityRecognizer: 已知实体识别器
+    ParseCache: 问题解析缓存
+    RelationMatcher: 关系词多模式匹配器
+    IncrementalRelationMatcher: 支持增删的关系词匹配器
 """
 
 from .triple_extractor import TripleExtractor
+from .relation_matcher import RelationMatcher, IncrementalRelationMatcher
+from .entity_recognizer import EntityRecognizer
+from .parse_cache import ParseCache, normalize_question
+from monitoring import get_logger
 
 # 定义模块的公共API
-__all__ = ['TripleExtractor']
+__all__ = ['TripleExtractor', 'EntityRecognizer', 'ParseCache', 'normalize_question', 'RelationMatcher', 'IncrementalRelationMatcher']
 
-print("✅ NLP 模块初始化完成 - 三元组抽取器已就绪")
\ No newline at end of file
+get_logger("nlp").debug("NLP 模块初始化完成 - 三元组抽取器已就绪")
\ No newline at end of file
@@ -0,0 +1,127 @@
+# 已知实体识别器（NLP 模块）：知识库中全部实体构成字符字典树，对问题做一次从左到右的最长匹配切分
+import sys
+import threading
+import time
+
+# 边的键：节点编号 << 21 | 字符码位（码位不超过 0x10FFFF < 2^21），全部边存放在一个字典中，
+# 比每个节点一个字典省内存（百万级实体时节点数以百万计）
+_CHAR_BITS = 21
+
+
+class EntityRecognizer:
+    def __init__(self, min_length=1):
+        """
+        :param min_length: 参与识别的实体最短长度，更短的实体不加入字典树
+        """
+        self.min_length = min_length
+        self._edges = {}  # (节点 << 21 | 字符) → 子节点
+        self._terminal = bytearray(1)  # 节点编号 → 是否为某个实体的结尾
+        self._nodes = 1  # 根节点为 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self.build_seconds = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, entity):
+        node = self._walk(entity)
+        return node is not None and bool(self._terminal[node])
+
+    def _walk(self, text):
+        edges = self._edges
+        node = 0
+        for ch in text:
+            node = edges.get(node << _CHAR_BITS | ord(ch))
+            if node is None:
+                return None
+        return node
+
+    def load(self, entities):
+        """
+        批量加入实体（可以是数据库游标生成器，不需要整体加载到内存）
+        :return: 加入后的实体数
+        """
+        start = time.perf_counter()
+        for entity in entities:
+            self.add(entity)
+        self.build_seconds += time.perf_counter() - start
+        return self._count
+
+    def add(self, entity):
+        """
+        加入一个实体（已存在时不变），O(len(entity))
+        :return: 新加入返回True
+        """
+        if not entity:
+            return False
+        entity = entity.strip()
+        if len(entity) < self.min_length:
+            return False
+        with self._lock:
+            edges = self._edges
+            node = 0
+            for ch in entity:
+                key = node << _CHAR_BITS | ord(ch)
+                child = edges.get(key)
+                if child is None:
+                    child = self._nodes
+                    self._nodes += 1
+                    self._terminal.append(0)
+                    edges[key] = child
+                node = child
+            if self._terminal[node]:
+                return False
+            # 路径建好后再标记结尾，读者不会看到只建了一半的实体
+            self._terminal[node] = 1
+            self._count += 1
+            return True
+
+    def segment(self, text):
+        """
+        从左到右最长匹配：每个位置取以该位置开头的最长已知实体，命中后跳到实体之后继续
+        :param text: 问题文本
+        :return: [(起始下标, 结束下标), ...]，互不重叠，按位置排列
+        """
+        get = self._edges.get
+        terminal = self._terminal
+        codes = [ord(ch) for ch in text]
+        spans = []
+        length = len(codes)
+        i = 0
+        while i < length:
+            node = get(codes[i])  # 根节点编号为 0，根的边键即字符码位
+            if node is None:
+                i += 1
+                continue
+            end = i + 1 if terminal[node] else -1
+            j = i + 1
+            while j < length:
+                node = get(node << _CHAR_BITS | codes[j])
+                if node is None:
+                    break
+                j += 1
+                if terminal[node]:
+                    end = j
+            if end > 0:
+                spans.append((i, end))
+                i = end
+            else:
+                i += 1
+        return spans
+
+    def find_entities(self, text):
+        """返回问题中识别出的已知实体 [(实体, 起始下标), ...]"""
+        return [(text[start:end], start) for start, end in self.segment(text)]
+
+    def stats(self):
+        """返回实体数、字典树节点数、内存估计（边字典、键和值的整数对象、结尾标记）和累计构建耗时"""
+        edge_count = len(self._edges)
+        memory = (sys.getsizeof(self._edges) + edge_count * (sys.getsizeof(1 << 40) + sys.getsizeof(1 << 20))
+                  + sys.getsizeof(self._terminal))
+        return {
+            "entities": self._count,
+            "nodes": self._nodes,
+            "memory_mb": memory / 1024 / 1024,
+            "build_seconds": self.build_seconds,
+        }
@@ -0,0 +1,83 @@
+# 问题解析缓存（NLP 模块）：按规范化后的问题文本缓存实体/关系抽取结果，词表变化时整体失效
+import re
+import threading
+from collections import OrderedDict
+
+# 问题末尾的标点和空白（半角与全角）
+_TRAILING_PUNCTUATION = re.compile(r'[?？!！.。~～\s]+$')
+
+
+def normalize_question(question):
+    """
+    问题文本规范化：去掉首尾空白和末尾的问号等标点，作为解析缓存的键，解析也使用同一文本（缓存不改变结果）
+    例如 "Python的创始人是谁？" / " Python的创始人是谁 ?" 都规范化为 "Python的创始人是谁"
+    问题中的实体不做全角/半角、空白等改写：从问题中解析出的实体原样保存和查询，
+    与数据库中已有的数据和批量导入的数据一致，大小写、全半角由数据库排序规则比较
+    """
+    return _TRAILING_PUNCTUATION.sub('', question.strip())
+
+
+class ParseCache:
+    def __init__(self, max_size=4096):
+        """
+        :param max_size: 最多缓存的问题数，超出后淘汰最久未使用的问题
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()  # 规范化问题 → 抽取结果
+        self._lock = threading.Lock()
+        # 词表版本：invalidate 时加一，解析开始前取得的版本已过期时结果不写入
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        :return: (found, result) found 为 False 表示未命中
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, result
+
+    def put(self, key, result, generation):
+        """
+        写入缓存
+        :param generation: 解析开始前读取的 self.generation；期间词表发生变化时放弃写入，避免缓存旧词表的结果
+        """
+        if not self.max_size:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """关系词表或已知实体发生变化：清空全部结果"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,223 @@
+# 关系词匹配器（NLP 模块）：基于 Aho-Corasick 自动机，一次扫描问题即可找出所有命中的关系词
+import threading
+from collections import deque
+
+
+class RelationMatcher:
+    def __init__(self, relations=None):
+        """
+        初始化关系词匹配器并编译自动机
+        :param relations: 关系词列表（可包含重复项，空字符串会被忽略）
+        """
+        # 每个节点：转移表、失败指针、以该节点结尾的关系词、输出链（下一个有输出的后缀节点）
+        self._goto = [{}]
+        self._fail = [0]
+        self._word = [None]
+        self._output_link = [0]
+        self._relations = set()
+        for rel in relations or []:
+            self._insert(rel)
+        self._build_fail_links()
+
+    def __len__(self):
+        return len(self._relations)
+
+    def __contains__(self, relation):
+        return relation in self._relations
+
+    @property
+    def relations(self):
+        """已编译的关系词集合（只读副本）"""
+        return frozenset(self._relations)
+
+    def _insert(self, relation):
+        """向字典树中插入一个关系词"""
+        if not relation or relation in self._relations:
+            return
+        node = 0
+        for ch in relation:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._word.append(None)
+                self._output_link.append(0)
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._word[node] = relation
+        self._relations.add(relation)
+
+    def _build_fail_links(self):
+        """按广度优先顺序计算失败指针和输出链"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                fail_node = self._fail[nxt]
+                # 输出链直接指向最近的"有关系词结尾"的后缀节点，避免逐个回溯
+                self._output_link[nxt] = fail_node if self._word[fail_node] else self._output_link[fail_node]
+
+    def find_first_occurrences(self, text):
+        """
+        单次扫描文本，返回每个命中关系词第一次出现的位置
+        :param text: 待匹配文本
+        :return: {关系词: 起始下标}，与 text.find(rel) 的结果一致
+        """
+        found = {}
+        goto = self._goto
+        fail = self._fail
+        word = self._word
+        output_link = self._output_link
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            out = node if word[node] else output_link[node]
+            while out:
+                rel = word[out]
+                if rel not in found:
+                    found[rel] = i - len(rel) + 1
+                out = output_link[out]
+        return found
+
+    def matches_longest_first(self, text):
+        """
+        返回所有命中的关系词，按长度从长到短排序（等长时靠前者优先）
+        :param text: 待匹配文本
+        :return: [(关系词, 起始下标), ...]
+        """
+        found = self.find_first_occurrences(text)
+        return sorted(found.items(), key=lambda item: (-len(item[0]), item[1]))
+
+
+# 增量字典树中标记"以该节点结尾的关系词"的键（单个字符不可能是空串）
+_WORD_KEY = ''
+
+
+class IncrementalRelationMatcher:
+    """
+    支持在线增删关系词的匹配器，接口与 RelationMatcher 一致
+    启动时的词表编译为 Aho-Corasick 自动机（只读）；之后新增的关系词写入增量字典树，
+    删除的自动机关系词记入删除集合。每次增删只需 O(len(relation))，不重建自动机。
+    读操作不加锁：写操作只在增量结构上做单步字典/集合修改，并发读者要么看到修改前、要么看到修改后的词表；
+    compact() 在锁内构建新自动机后整体替换，正在扫描的读者继续使用旧结构。
+    """
+
+    def __init__(self, relations=None):
+        """
+        :param relations: 初始关系词列表，编译为自动机
+        """
+        self._lock = threading.Lock()
+        self._state = (RelationMatcher(relations), {}, set(), set())
+
+    def __len__(self):
+        compiled, _, added, removed = self._state
+        return len(compiled) - len(removed) + len(added)
+
+    def __contains__(self, relation):
+        compiled, _, added, removed = self._state
+        return relation in added or (relation in compiled and relation not in removed)
+
+    @property
+    def relations(self):
+        """当前生效的关系词集合（只读副本）"""
+        with self._lock:
+            return self._live_relations()
+
+    def _live_relations(self):
+        compiled, _, added, removed = self._state
+        return frozenset((compiled.relations - removed) | added)
+
+    def add(self, relation):
+        """
+        新增一个关系词，O(len(relation))
+        :return: 关系词原先不存在返回True，已存在或为空返回False
+        """
+        if not relation:
+            return False
+        with self._lock:
+            compiled, trie, added, removed = self._state
+            if relation in compiled:
+                if relation not in removed:
+                    return False
+                removed.discard(relation)
+                return True
+            if relation in added:
+                return False
+            node = trie
+            for ch in relation:
+                node = node.setdefault(ch, {})
+            # 路径建好后再写入结尾标记，读者不会看到只建了一半的关系词
+            node[_WORD_KEY] = relation
+            added.add(relation)
+            return True
+
+    def remove(self, relation):
+        """
+        删除一个关系词，O(len(relation))
+        :return: 关系词原先存在返回True，否则返回False
+        """
+        with self._lock:
+            compiled, trie, added, removed = self._state
+            if relation in added:
+                node = trie
+                for ch in relation:
+                    node = node[ch]
+                del node[_WORD_KEY]  # 空分支保留，compact() 时一并清理
+                added.discard(relation)
+                return True
+            if relation in compiled and relation not in removed:
+                removed.add(relation)
+                return True
+            return False
+
+    def compact(self):
+        """把增量字典树和删除集合合并进新编译的自动机（O(词表大小)，适合在空闲时调用）"""
+        with self._lock:
+            _, _, added, removed = self._state
+            if added or removed:
+                self._state = (RelationMatcher(self._live_relations()), {}, set(), set())
+
+    def find_first_occurrences(self, text):
+        """
+        单次扫描文本，返回每个命中关系词第一次出现的位置，语义同 RelationMatcher.find_first_occurrences
+        :param text: 待匹配文本
+        :return: {关系词: 起始下标}
+        """
+        compiled, trie, _, removed = self._state
+        found = compiled.find_first_occurrences(text)
+        for rel in [rel for rel in found if rel in removed]:
+            del found[rel]
+        if trie:
+            # 增量字典树：从每个起点向后匹配，起点递增，先记录的即第一次出现的位置
+            length = len(text)
+            for start in range(length):
+                node = trie
+                for i in range(start, length):
+                    node = node.get(text[i])
+                    if node is None:
+                        break
+                    rel = node.get(_WORD_KEY)
+                    if rel is not None and rel not in found:
+                        found[rel] = start
+        return found
+
+    def matches_longest_first(self, text):
+        """
+        返回所有命中的关系词，按长度从长到短排序（等长时靠前者优先）
+        :param text: 待匹配文本
+        :return: [(关系词, 起始下标), ...]
+        """
+        found = self.find_first_occurrences(text)
+        return sorted(found.items(), key=lambda item: (-len(item[0]), item[1]))
@@ -1,9 +1,20 @@
 # 三元组提取（NLP 模块）：专注于问题和答案的解析，提取知识三元组，便于后续扩展 NLP 能力
+import re
+
+from nlp.relation_matcher import IncrementalRelationMatcher
+from nlp.parse_cache import normalize_question
+
+# 问句结尾的疑问词和标点（"是什么？"、"是谁"、"是多少"等），解析关系链前去掉
+QUESTION_TAIL = re.compile(r'(是)?(什么|谁|哪里|哪儿|哪个|哪国|哪一年|多少|几)?[？?。!！\s]*$')
+
+
 class TripleExtractor:
-    def __init__(self, db_relations=None):
+    def __init__(self, db_relations=None, entity_recognizer=None, parse_cache=None):
         """
         初始化三元组提取器
         :param db_relations: 从数据库获取的关系词列表，用于提高匹配准确性
+        :param entity_recognizer: 可选的 EntityRecognizer（知识库中的已知实体），识别到的已知实体优先于规则切分
+        :param parse_cache: 可选的 ParseCache，按规范化后的问题缓存抽取结果，关系词表或已知实体变化时失效
         """
         # 基础关系词列表（作为后备）
         self.base_relations = [
@@ -13,10 +24,80 @@ class TripleExtractor:
             '首都', '语言', '货币', '人口', '面积', 'GDP', '总统', '总理',
             '朝代', '年份', '时期', '时代'
         ]
-        # 合并数据库关系词和基础关系词，去重
-        all_relations = list(set(self.base_relations + (db_relations or [])))
-        # 按长度从长到短排序，优先匹配长关系词
-        self.all_relations = sorted(all_relations, key=len, reverse=True)
+        # 合并数据库关系词和基础关系词，编译多模式匹配自动机，一次扫描即可找出问题中所有关系词
+        # 运行期间学习到的新关系词通过 add_relation 增量加入，无需重建
+        self.relation_matcher = IncrementalRelationMatcher(set(self.base_relations + (db_relations or [])))
+        self.entity_recognizer = entity_recognizer
+        self.parse_cache = parse_cache
+
+    @property
+    def all_relations(self):
+        """当前全部关系词，按长度从长到短排序"""
+        return sorted(self.relation_matcher.relations, key=len, reverse=True)
+
+    def add_relation(self, relation):
+        """
+        把新关系词加入匹配词表（已存在时不变），代价 O(len(relation))
+        :return: 新加入返回True
+        """
+        added = self.relation_matcher.add(relation)
+        if added:
+            self._invalidate_parse_cache()
+        return added
+
+    def remove_relation(self, relation):
+        """
+        从匹配词表中删除关系词，代价 O(len(relation))
+        :return: 原先存在返回True
+        """
+        removed = self.relation_matcher.remove(relation)
+        if removed:
+            self._invalidate_parse_cache()
+        return removed
+
+    def add_entity(self, entity):
+        """
+        把新学习的实体加入已知实体识别器（未启用识别器时不做任何事）
+        :return: 新加入返回True
+        """
+        if self.entity_recognizer is None:
+            return False
+        added = self.entity_recognizer.add(entity)
+        if added:
+            self._invalidate_parse_cache()
+        return added
+
+    def _invalidate_parse_cache(self):
+        """词表变化后，已缓存的解析结果可能不再成立"""
+        if self.parse_cache is not None:
+            self.parse_cache.invalidate()
+
+    def _match_known_entity(self, question):
+        """
+        已知实体优先：对问题做最长匹配切分，找到紧挨在关系词之前（中间可以有"的"）的已知实体
+        落在已知实体内部的关系词（如"中国国家博物馆"中的"国家"）不作为关系
+        :return: (entity1, relation)，没有可用的已知实体时返回 (None, None)，由规则继续处理
+        """
+        matches = self.relation_matcher.matches_longest_first(question)
+        if not matches:
+            return None, None
+        spans = self.entity_recognizer.segment(question)
+        if not spans:
+            return None, None
+        starts_by_end = {end: start for start, end in spans}
+        for rel, rel_index in matches:
+            rel_end = rel_index + len(rel)
+            if any(start <= rel_index and rel_end <= end for start, end in spans):
+                continue
+            prefix = question[:rel_index].rstrip()
+            ends = [len(prefix)]
+            if prefix.endswith('的'):
+                ends.append(len(prefix[:-1].rstrip()))
+            for end in ends:
+                start = starts_by_end.get(end)
+                if start is not None:
+                    return question[start:end], rel
+        return None, None
 
     def extract_entity_and_relation(self, question):
         """
@@ -27,33 +108,52 @@ class TripleExtractor:
         3. "北京是中国的什么" → (北京, 是)
         4. "中国的首都是什么" → (中国的首都, 是) - 支持反向查询
         5. "爱因斯坦提出什么？" → (爱因斯坦, 提出) - 优先匹配关系词
+        问题先规范化（首尾空白、末尾问号等）再解析，是否启用解析缓存结果都相同；
+        启用解析缓存时，规范化后相同的问题直接返回缓存结果
         :param question: 用户问题
         :return: (entity1, relation) 或 (None, None)
         """
+        key = normalize_question(question)
+        if self.parse_cache is None:
+            return self._extract_entity_and_relation(key)
+        found, result = self.parse_cache.get(key)
+        if found:
+            return result
+        generation = self.parse_cache.generation
+        result = self._extract_entity_and_relation(key)
+        self.parse_cache.put(key, result, generation)
+        return result
+
+    def _extract_entity_and_relation(self, question):
+        """按规则抽取 (entity1, relation)，见 extract_entity_and_relation"""
         entity1 = None
         relation = None
         question = question.strip()
 
+        # 方法0: 已知实体优先（启用实体识别器时），避免规则把实体切错或把实体内部的字当成关系词
+        if self.entity_recognizer is not None:
+            entity1, relation = self._match_known_entity(question)
+            if entity1:
+                return entity1, relation
+
         # 方法1: 优先匹配关系词（如"提出"、"发明"等），避免被疑问词干扰
         # 这样可以正确处理"爱因斯坦提出什么？"这种情况
-        for rel in self.all_relations:
-            if rel in question:
-                # 找到关系词的位置
-                rel_index = question.find(rel)
-                # 关系词之前的部分作为实体1
-                entity1_candidate = question[:rel_index].strip()
-                # 如果实体不为空，且关系词后面可能跟着疑问词（如"什么"、"谁"等），这是正常情况
-                if entity1_candidate:
-                    entity1 = entity1_candidate
-                    relation = rel
-                    # 清理实体末尾可能的"的"字（但保留复合实体如"中国的首都"）
-                    if entity1.endswith('的') and len(entity1) > 1:
-                        # 检查是否是复合实体（包含多个"的"）
-                        if entity1.count('的') > 1 or (entity1.count('的') == 1 and len(entity1.split('的')[0]) > 2):
-                            pass  # 保留复合实体
-                        else:
-                            entity1 = entity1[:-1].strip()
-                    return entity1, relation
+        # 自动机一次扫描返回所有命中关系词（按长度从长到短），等价于逐个执行 rel in question / question.find(rel)
+        for rel, rel_index in self.relation_matcher.matches_longest_first(question):
+            # 关系词之前的部分作为实体1
+            entity1_candidate = question[:rel_index].strip()
+            # 如果实体不为空，且关系词后面可能跟着疑问词（如"什么"、"谁"等），这是正常情况
+            if entity1_candidate:
+                entity1 = entity1_candidate
+                relation = rel
+                # 清理实体末尾可能的"的"字（但保留复合实体如"中国的首都"）
+                if entity1.endswith('的') and len(entity1) > 1:
+                    # 检查是否是复合实体（包含多个"的"）
+                    if entity1.count('的') > 1 or (entity1.count('的') == 1 and len(entity1.split('的')[0]) > 2):
+                        pass  # 保留复合实体
+                    else:
+                        entity1 = entity1[:-1].strip()
+                return entity1, relation
 
         # 方法2: 处理"XX是什么"、"XX是谁"等格式
         # 优先匹配长关键词，避免误匹配
@@ -120,6 +220,26 @@ class TripleExtractor:
 
         return entity1, relation
 
+    def extract_relation_chain(self, question, min_hops=2):
+        """
+        解析多跳问题中的关系链：实体后面跟着用"的"连接的多个已知关系词
+        例如 "Python的创始人的国籍是什么" → ("Python", ["创始人", "国籍"])
+        从末尾开始取连续的已知关系词，其余部分作为实体（实体本身可以包含"的"，如"我的世界"）
+        :param question: 用户问题
+        :param min_hops: 至少包含的关系词数量，少于该数量时返回None（单跳问题由 extract_entity_and_relation 处理）
+        :return: (entity, [relation, ...]) 或 None
+        """
+        text = QUESTION_TAIL.sub('', normalize_question(question))
+        segments = [segment.strip() for segment in text.split('的')]
+        relations = []
+        while len(segments) > 1 and segments[-1] in self.relation_matcher:
+            relations.append(segments.pop())
+        entity = '的'.join(segments).strip()
+        if len(relations) < min_hops or not entity:
+            return None
+        relations.reverse()
+        return entity, relations
+
     def extract_triple(self, question, answer, silent=False, input_callback=None):
         """
         从问题和答案中提取完整三元组（实体1-关系-实体2）
@@ -127,7 +247,7 @@ class TripleExtractor:
         :param answer: 用户提供的答案
         :param silent: 是否静默模式（不打印，不等待输入）
         :param input_callback: 输入回调函数，格式：input_callback(prompt) -> str，用于GUI模式
-        :return: (entity1, relation, entity2)
+        :return: (entity1, relation, entity2)，entity1/relation 与查询时从同一问题解析出的一致
         """
         # 先尝试自动提取
         entity1, relation = self.extract_entity_and_relation(question)
@@ -141,9 +261,11 @@ class TripleExtractor:
                     entity1 = input_callback("请输入实体（例如：Python）：") or ""
                     relation = input_callback("请输入关系（例如：创始人）：") or ""
                     entity2 = input_callback("请确认答案（例如：吉多·范罗苏姆）：") or answer.strip()
+                    entity1, relation, entity2 = entity1.strip(), relation.strip(), entity2.strip()
                 else:
                     # 如果无法获取输入，使用默认值
-                    entity1 = question.split('的')[0] if '的' in question else question[:10]
+                    text = normalize_question(question)
+                    entity1 = text.split('的')[0] if '的' in text else text[:10]
                     relation = '是'
             else:
                 # 命令行模式：使用input
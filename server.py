@@ -0,0 +1,318 @@
+"""
+智能问答系统 - HTTP/JSON 服务版本
+使用标准库 http.server 提供并发问答服务，可部署在网关之后供多个用户同时使用
+
+接口：
+    POST /answer        {"question": "..."}                  → {"answer": ..., "message": ...}
+    POST /answer/batch  {"questions": ["...", ...]}          → {"results": [{"answer": ..., "message": ...}, ...]}
+    POST /learn         {"question": "...", "answer": "..."} → {"success": ..., "message": ...}
+                        （可额外提供 "entity1"、"relation" 直接指定三元组；未提供且无法从问题中识别时返回 400）
+    GET  /stats         各接口的请求数、错误数、吞吐量和延迟分位数，引擎各阶段耗时，以及存储后端统计
+    GET  /health        健康检查
+
+请求字段类型错误（如 question 不是字符串）时返回 400，请求体超过 --max-body-bytes 时返回 413。
+每个连接由独立线程读写，空闲的 keep-alive 连接只占用一个阻塞在读取上的线程；并发上限按请求计算：
+同时处理 --workers 个请求，另有 backlog 个请求排队等待，再多的请求返回 503。
+--idle-timeout 是套接字空闲超时：限制读取请求时每次等待客户端数据的时间和 keep-alive 连接的空闲时间，
+不限制请求的处理耗时（处理中的请求无法安全中断），慢查询由各阶段自身的时间预算控制。
+
+运行方式：
+    python server.py [--host 0.0.0.0] [--port 8000] [--workers 16] [--idle-timeout 30] [--max-connections 1024]
+                     [--max-body-bytes 1048576]
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.qa_engine import QAEngine
+from config.system_config import SYSTEM_CONFIG
+from monitoring import METRICS, configure_logging
+
+
+class EndpointMetrics:
+    """单个接口的请求统计：计数、错误数、吞吐量和最近请求的延迟分位数"""
+
+    def __init__(self, window=2048):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)  # 最近 window 次请求的耗时（秒）
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+    def record(self, elapsed, error=False):
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self._latencies.append(elapsed)
+            if error:
+                self.errors += 1
+
+    def snapshot(self, uptime):
+        with self._lock:
+            ordered = sorted(self._latencies)
+            count, errors, total_time = self.count, self.errors, self.total_time
+
+        def pct(p):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+        return {
+            "count": count,
+            "errors": errors,
+            "throughput_rps": count / uptime if uptime else 0.0,
+            "mean_ms": total_time / count * 1000 if count else 0.0,
+            "p50_ms": pct(50),
+            "p90_ms": pct(90),
+            "p99_ms": pct(99),
+        }
+
+
+class QAServer(ThreadingHTTPServer):
+    """
+    每个连接一个线程的 HTTP 服务器，按请求限流：同时处理 workers 个请求，最多再排队 backlog 个，
+    超出的请求返回 503；连接数超过 max_connections 时新连接直接返回 503
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, engine, workers=16, backlog=64, idle_timeout=30, max_connections=1024,
+                 max_body_bytes=1024 * 1024):
+        """
+        :param idle_timeout: 套接字空闲超时（秒），见模块说明
+        :param max_connections: 同时保持的连接数上限（含空闲的 keep-alive 连接），限制线程数
+        :param max_body_bytes: 请求体大小上限（字节），超过时返回 413
+        """
+        super().__init__(address, QARequestHandler)
+        self.engine = engine
+        self.idle_timeout = idle_timeout
+        self.max_body_bytes = max_body_bytes
+        self._connections = threading.BoundedSemaphore(max_connections)
+        # 正在处理和排队的请求总数上限，保证内存和延迟有界
+        self._admitted = threading.BoundedSemaphore(workers + backlog)
+        self._running = threading.BoundedSemaphore(workers)
+        self.metrics = {}
+        self._metrics_lock = threading.Lock()
+        self.started_at = time.time()
+
+    def process_request(self, request, client_address):
+        if not self._connections.acquire(blocking=False):
+            try:
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            finally:
+                self.shutdown_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._connections.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._connections.release()
+
+    @contextmanager
+    def request_slot(self):
+        """
+        占用一个请求处理名额：排队名额已满时产出False（调用方返回 503），否则等待处理名额后产出True
+        """
+        if not self._admitted.acquire(blocking=False):
+            yield False
+            return
+        try:
+            with self._running:
+                yield True
+        finally:
+            self._admitted.release()
+
+    def endpoint_metrics(self, endpoint):
+        with self._metrics_lock:
+            if endpoint not in self.metrics:
+                self.metrics[endpoint] = EndpointMetrics()
+            return self.metrics[endpoint]
+
+    def stats(self):
+        uptime = time.time() - self.started_at
+        with self._metrics_lock:
+            endpoints = dict(self.metrics)
+        # 引擎统计包括各阶段耗时（timings）、答案缓存、存储后端和关系词数
+        return {
+            "uptime": uptime,
+            "endpoints": {name: m.snapshot(uptime) for name, m in endpoints.items()},
+            **self.engine.stats(),
+        }
+
+
+class QARequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 默认保持连接，同一连接上可连续发送多个请求
+    protocol_version = "HTTP/1.1"
+    server_version = "KnowledgeQA/1.0"
+    # 响应头和响应体分两次写出，关闭 Nagle 算法避免与客户端延迟确认叠加产生约 40ms 的额外延迟
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # 套接字空闲超时：每次读取客户端数据的等待上限（同时限制空闲的 keep-alive 连接），不限制处理耗时
+        self.timeout = self.server.idle_timeout
+        super().setup()
+
+    def log_message(self, format, *args):
+        pass  # 访问日志由 /stats 统计代替，避免每个请求打印
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        """读取请求体，超过大小上限时不读取并返回None"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.max_body_bytes:
+            return None
+        return self.rfile.read(length) if length > 0 else b""
+
+    def _read_json(self):
+        if not self._body:
+            return {}
+        return json.loads(self._body.decode("utf-8"))
+
+    @staticmethod
+    def _string_field(data, key, required=True):
+        """
+        取出字符串字段，类型不符时抛出 ValueError（由 _dispatch 返回 400）
+        :param required: 为False时字段缺失或为 null 返回None
+        """
+        if not isinstance(data, dict):
+            raise ValueError("请求体必须是 JSON 对象")
+        value = data.get(key)
+        if value is None and not required:
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"{key} 必须是字符串")
+        return value
+
+    def _dispatch(self, routes):
+        route = routes.get(self.path)
+        if route is None:
+            # 未读取的请求体会破坏 keep-alive 连接上的后续请求，直接关闭连接
+            self.close_connection = True
+            self._send_json(404, {"error": f"未知接口: {self.path}"})
+            return
+        metrics = self.server.endpoint_metrics(f"{self.command} {self.path}")
+        start = time.perf_counter()
+        status = 500
+        try:
+            # 请求体在占用处理名额之前读完，慢速客户端不占用处理名额
+            self._body = self._read_body()
+            if self._body is None:
+                # 未读取的请求体会破坏 keep-alive 连接上的后续请求，响应后关闭连接
+                self.close_connection = True
+                status, payload = 413, {"error": f"请求体超过 {self.server.max_body_bytes} 字节"}
+            else:
+                with self.server.request_slot() as admitted:
+                    if admitted:
+                        status, payload = route()
+                    else:
+                        status, payload = 503, {"error": "服务繁忙，请稍后重试"}
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload = 400, {"error": f"请求格式错误: {e}"}
+        except Exception as e:
+            payload = {"error": f"服务器内部错误: {e}"}
+        self._send_json(status, payload)
+        metrics.record(time.perf_counter() - start, error=status >= 400)
+
+    def do_GET(self):
+        self._dispatch({
+            "/health": lambda: (200, {"status": "ok"}),
+            "/stats": lambda: (200, self.server.stats()),
+        })
+
+    def do_POST(self):
+        self._dispatch({
+            "/answer": self._handle_answer,
+            "/answer/batch": self._handle_answer_batch,
+            "/learn": self._handle_learn,
+        })
+
+    def _handle_answer(self):
+        question = self._string_field(self._read_json(), "question").strip()
+        answer, message = self.server.engine.answer_question(question, silent=True)
+        return 200, {"answer": answer, "message": message}
+
+    def _handle_answer_batch(self):
+        data = self._read_json()
+        questions = data.get("questions") if isinstance(data, dict) else None
+        if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+            raise ValueError("questions 必须是字符串列表")
+        results = self.server.engine.answer_questions(q.strip() for q in questions)
+        return 200, {"results": [{"answer": a, "message": m} for a, m in results]}
+
+    def _handle_learn(self):
+        data = self._read_json()
+        question = self._string_field(data, "question").strip()
+        answer = self._string_field(data, "answer")
+        entity1 = self._string_field(data, "entity1", required=False)
+        relation = self._string_field(data, "relation", required=False)
+        engine = self.server.engine
+        if entity1 and relation:
+            # 调用方已给出三元组结构，去掉首尾空白后直接保存（与 GUI 手动补充三元组一致）
+            entity1, relation, entity2 = entity1.strip(), relation.strip(), answer.strip()
+            if not entity1 or not relation or not entity2:
+                raise ValueError("entity1、relation 和 answer 不能为空白")
+            # 与 learn_knowledge 记录到同一个耗时直方图
+            with METRICS.timer("request.learn"):
+                success = engine.db_operation.save_knowledge(entity1, relation, entity2)
+            message = "学习成功！下次再问相关问题时我就知道啦～" if success else "学习失败，请重试～"
+        else:
+            # 静默模式下抽取失败时 learn_knowledge 会按猜测的结构保存，服务端改为拒绝并要求调用方给出三元组
+            entity1, relation = engine.triple_extractor.extract_entity_and_relation(question)
+            if not entity1 or not relation:
+                return 400, {"success": False,
+                             "message": "无法从问题中识别实体和关系，请在请求中提供 entity1 和 relation"}
+            success, message = engine.learn_knowledge(question, answer, silent=True)
+        return 200, {"success": success, "message": message}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="智能问答系统 HTTP 服务")
+    parser.add_argument("--host", default=SYSTEM_CONFIG.get("server_host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=SYSTEM_CONFIG.get("server_port", 8000))
+    parser.add_argument("--workers", type=int, default=SYSTEM_CONFIG.get("server_workers", 16),
+                        help="同时处理的请求数")
+    parser.add_argument("--idle-timeout", type=float, default=SYSTEM_CONFIG.get("server_idle_timeout", 30),
+                        help="套接字空闲超时（秒），不限制请求处理耗时")
+    parser.add_argument("--max-connections", type=int, default=SYSTEM_CONFIG.get("server_max_connections", 1024),
+                        help="同时保持的连接数上限（含空闲的 keep-alive 连接）")
+    parser.add_argument("--max-body-bytes", type=int, default=SYSTEM_CONFIG.get("server_max_body_bytes", 1024 * 1024),
+                        help="请求体大小上限（字节），超过时返回 413")
+    args = parser.parse_args()
+
+    configure_logging(SYSTEM_CONFIG.get("log_level", "WARNING"), SYSTEM_CONFIG.get("log_format", "text"))
+    engine = QAEngine()
+    server = QAServer((args.host, args.port), engine, workers=args.workers, idle_timeout=args.idle_timeout,
+                      max_connections=args.max_connections, max_body_bytes=args.max_body_bytes)
+    print("======================================")
+    print(f"🤖 智能问答服务已启动：http://{args.host}:{args.port}")
+    print(f"⚙️ 同时处理 {args.workers} 个请求，最多 {args.max_connections} 个连接，"
+          f"连接空闲超时 {args.idle_timeout} 秒（Ctrl+C 退出）")
+    print("======================================")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🤖 服务已停止")
+    finally:
+        server.server_close()
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+异步数据库操作和异步问答引擎测试：通过 pool= 注入本地替身连接池，不需要 MySQL 服务和 aiomysql
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_async_db.py
+"""
+
+import unittest
+from unittest import mock
+
+from config.system_config import SYSTEM_CONFIG
+from core.async_qa_engine import AsyncQAEngine
+from database.answer_cache import AnswerCache
+from database.async_db_operation import AsyncDBOperation, StandInDBError
+from database.entity_index import FuzzyEntityIndex
+
+
+class FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None):
+        self.pool.executed.append((sql, params))
+        if self.pool.error is not None:
+            raise self.pool.error
+        self.rows = self.pool.handle(sql, params)
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return list(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return FakeCursor(self.pool)
+
+    async def begin(self):
+        self.pool.events.append("begin")
+
+    async def commit(self):
+        self.pool.events.append("commit")
+
+    async def rollback(self):
+        self.pool.events.append("rollback")
+
+
+class FakeAcquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return FakeConnection(self.pool)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    """
+    替身连接池：查询语句按参数在内存三元组中求解（正向/反向，关系按 LIKE 的子串匹配）
+    error 不为空时每条语句都抛出该异常
+    """
+
+    def __init__(self, triples=(), migrated=False):
+        self.triples = list(triples)
+        self.migrated = migrated
+        self.error = None
+        self.executed = []
+        self.events = []
+
+    def acquire(self):
+        return FakeAcquire(self)
+
+    def handle(self, sql, params):
+        if "FROM schema_version" in sql:
+            return [(1,)] if self.migrated else []
+        if "FROM relation_alias" in sql:
+            return []
+        if "DISTINCT relation" in sql:
+            return [(relation,) for relation in sorted({t[1] for t in self.triples})]
+        if sql.startswith("SELECT id, entity1, entity2"):
+            last_id, limit = params
+            rows = [(i + 1, e1, e2) for i, (e1, _, e2) in enumerate(self.triples)]
+            return [row for row in rows if row[0] > last_id][:limit]
+        if "UNION ALL" in sql:
+            entity, relation = params[0], params[1].strip('%')
+            for e1, rel, e2 in self.triples:
+                if e1 == entity and relation in rel:
+                    return [(e2,)]
+            for e1, rel, e2 in self.triples:
+                if e2 == entity and relation in rel:
+                    return [(e1,)]
+            return []
+        return []
+
+
+TRIPLES = [
+    ("Python", "创始人", "吉多"),
+    ("吉多", "国籍", "荷兰"),
+    ("北京", "首都", "中国"),
+]
+
+
+class AsyncDBOperationTest(unittest.IsolatedAsyncioTestCase):
+    def make_db(self, **kwargs):
+        self.pool = FakePool(TRIPLES, **kwargs)
+        return AsyncDBOperation(answer_cache=AnswerCache(max_size=16, ttl=60), pool=self.pool)
+
+    async def test_query_forward_and_reverse(self):
+        db = self.make_db()
+        self.assertEqual(await db.query_knowledge("Python", "创始人"), "吉多")
+        self.assertEqual(await db.query_knowledge("中国", "首都"), "北京")
+        self.assertIsNone(await db.query_knowledge("Java", "创始人"))
+
+    async def test_database_error_is_not_cached(self):
+        db = self.make_db()
+        self.pool.error = StandInDBError("连接已断开")
+        self.assertIsNone(await db.query_knowledge("Python", "创始人"))
+        self.pool.error = None
+        self.assertEqual(await db.query_knowledge("Python", "创始人"), "吉多")
+
+    async def test_programming_errors_are_not_swallowed(self):
+        db = self.make_db()
+        self.pool.error = TypeError("参数类型错误")
+        with self.assertRaises(TypeError):
+            await db.query_knowledge("Python", "创始人")
+        with self.assertRaises(TypeError):
+            await db.save_knowledge("Python", "创始人", "吉多")
+        self.assertEqual(self.pool.events, ["begin", "rollback"])
+
+    async def test_save_commits_and_notifies(self):
+        db = self.make_db()
+        saved = []
+        db.save_listeners.append(lambda *triple: saved.append(triple))
+        self.assertTrue(await db.save_knowledge("Java", "创始人", "高斯林"))
+        self.assertEqual(self.pool.events, ["begin", "commit"])
+        self.assertEqual(saved, [("Java", "创始人", "高斯林")])
+
+    async def test_save_error_rolls_back(self):
+        db = self.make_db()
+        self.pool.error = StandInDBError("写入失败")
+        self.assertFalse(await db.save_knowledge("Java", "创始人", "高斯林"))
+        self.assertEqual(self.pool.events, ["begin", "rollback"])
+
+    async def test_aliases_require_migration_marker(self):
+        self.assertFalse(await self.make_db().load_relation_aliases())
+        db = self.make_db(migrated=True)
+        self.assertTrue(await db.load_relation_aliases())
+        self.assertTrue(db.alias_table_ready)
+
+    async def test_query_paths(self):
+        db = self.make_db()
+        answers, stats = await db.query_paths([("Python", ["创始人", "国籍"]), ("Python", ["创始人", "首都"]),
+                                               ("Python", ["a", "b", "c"])], max_hops=2, time_budget=0)
+        self.assertEqual(answers, ["荷兰", None, None])
+        self.assertEqual(stats["hops"], 2)
+        self.assertEqual(stats["lookups"], 3)
+        self.assertEqual(stats["memo_hits"], 0)
+
+    async def test_unsupported_config_is_rejected(self):
+        for config in ({"storage_backend": "sqlite"}, {"use_entity_filter": True}, {"write_behind": True}):
+            with mock.patch.dict(SYSTEM_CONFIG, config), self.assertRaises(ValueError) as context:
+                AsyncDBOperation(pool=FakePool())
+            self.assertIn(next(iter(config)), str(context.exception))
+        for config in ({"snapshot_path": "knowledge.snap"}, {"use_triple_index": True}):
+            with mock.patch.dict(SYSTEM_CONFIG, config), self.assertRaises(ValueError):
+                AsyncQAEngine(AsyncDBOperation(pool=FakePool()))
+
+    async def test_query_similar(self):
+        db = self.make_db()
+        self.assertEqual(await db.query_similar("Pythn", "创始人"), (None, None))
+        self.assertTrue(await db.load_entity_index(batch_size=2))
+        self.assertEqual(await db.query_similar("Pythn", "创始人"), ("Python", "吉多"))
+        self.assertEqual(await db.query_similar("Python", "国籍"), (None, None))
+
+
+class AsyncQAEngineTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = FakePool(TRIPLES)
+        self.engine = await AsyncQAEngine.create(AsyncDBOperation(pool=self.pool))
+
+    async def test_single_hop(self):
+        self.assertEqual(await self.engine.answer_question("Python创始人是谁", silent=True), ("吉多", None))
+
+    async def test_multi_hop(self):
+        self.assertEqual(await self.engine.answer_question("Python的创始人的国籍是什么", silent=True), ("荷兰", None))
+
+    async def test_similar_entity_fallback(self):
+        self.engine.db_operation.entity_index = FuzzyEntityIndex(max_distance=1)
+        self.engine.db_operation.entity_index.load(["Python", "吉多"])
+        answer, message = await self.engine.answer_question("Pythn创始人是谁", silent=True)
+        self.assertEqual(answer, "吉多")
+        self.assertIn("Python", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
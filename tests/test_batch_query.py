@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+批量查询测试：query_knowledge_batch 与逐个 query_knowledge 的结果一致（包括大小写不同的问法），使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_batch_query.py
+"""
+
+import os
+import tempfile
+import unittest
+
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+
+TRIPLES = [
+    ("Python", "创始人", "Guido"),
+    ("Guido", "国籍", "Netherlands"),
+    ("Netherlands", "首都", "Amsterdam"),
+    ("中国", "GDP", "很多"),
+]
+
+KEYS = [
+    ("Python", "创始人"), ("python", "创始人"), ("PYTHON", ""), ("guido", "国籍"), ("中国", "gdp"),
+    ("中国", "GDP"), ("很多", "gd"), ("amsterdam", "首都"), ("Java", "创始人"), ("python", "国籍"),
+]
+
+
+class BatchQueryTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.db = DBOperation(backend=SQLiteBackend(os.path.join(work_dir.name, "kg.db")), relation_match="like")
+        self.addCleanup(self.db.close)
+        for triple in TRIPLES:
+            self.assertTrue(self.db.save_knowledge(*triple))
+
+    def test_batch_matches_single_queries(self):
+        expected = {key: self.db.query_knowledge(*key) for key in KEYS}
+        self.assertEqual(expected[("python", "创始人")], "Guido")
+        self.assertEqual(expected[("中国", "gdp")], "很多")
+        self.assertEqual(self.db.query_knowledge_batch(KEYS), expected)
+        # 分块大小为 1 时每个实体单独一条 IN 查询，结果不变
+        self.assertEqual(self.db.query_knowledge_batch(KEYS, chunk_size=1), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑三元组索引测试：重建（load / compact）期间写入不被阻塞，重建期间写入的三元组在替换后仍可查到
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_compact_index.py
+"""
+
+import threading
+import unittest
+
+from database.compact_index import CompactTripleIndex
+
+
+class CompactTripleIndexTest(unittest.TestCase):
+    def test_lookup_and_compact(self):
+        index = CompactTripleIndex()
+        self.assertEqual(index.load([("Python", "创始人", "吉多"), ("Python", "创始人", "吉多")]), 1)
+        index.add("吉多", "国籍", "荷兰")
+        self.assertEqual(index.stats()["delta_triples"], 1)
+        index.compact()
+        self.assertEqual(index.stats()["delta_triples"], 0)
+        self.assertEqual(index.size, 2)
+        self.assertEqual(index.lookup("Python", "创始"), "吉多")
+        self.assertEqual(index.lookup("荷兰", "国籍", exact=True), "吉多")
+
+    def test_keys_follow_collation_and_answers_keep_original_case(self):
+        index = CompactTripleIndex()
+        index.load([("Python", "创始人", "Guido"), ("python", "创始人", "GUIDO"), ("中国", "GDP", "很多")])
+        self.assertEqual(index.size, 2)
+        self.assertEqual(index.lookup("PYTHON", "创始人"), "Guido")
+        self.assertEqual(index.lookup("guido", "创始人", exact=True), "Python")
+        self.assertEqual(index.lookup("中国", "gd"), "很多")
+        self.assertEqual(index.relations(), ["GDP", "创始人"])
+        index.add("PYTHON", "创始人", "guido")
+        self.assertEqual(index.stats()["delta_triples"], 0)
+        index.add("Java", "创始人", "Gosling")
+        index.compact()
+        self.assertEqual(index.lookup("JAVA", "创始人"), "Gosling")
+        self.assertEqual(index.lookup("Python", "创始人"), "Guido")
+
+    def test_add_during_rebuild_is_not_blocked_and_survives_swap(self):
+        index = CompactTripleIndex()
+        index.load([("Python", "创始人", "吉多")])
+        building = threading.Event()
+        resume = threading.Event()
+
+        def slow_triples():
+            yield "Java", "创始人", "高斯林"
+            building.set()
+            resume.wait(5)
+            yield "C", "创始人", "里奇"
+
+        loader = threading.Thread(target=index.load, args=(slow_triples(),))
+        loader.start()
+        self.assertTrue(building.wait(5))
+
+        # 重建进行中：写入应立即返回，且立即可查
+        writer = threading.Thread(target=index.add, args=("吉多", "国籍", "荷兰"))
+        writer.start()
+        writer.join(1)
+        self.assertFalse(writer.is_alive(), "重建期间 add 被阻塞")
+        self.assertEqual(index.lookup("吉多", "国籍"), "荷兰")
+        # 重建期间写入、但新数组中已经包含的三元组，替换后不会留在增量层
+        index.add("Java", "创始人", "高斯林")
+
+        resume.set()
+        loader.join(5)
+        self.assertFalse(loader.is_alive())
+        self.assertEqual(index.lookup("吉多", "国籍"), "荷兰")
+        self.assertEqual(index.lookup("Python", "创始人"), "吉多")
+        self.assertEqual(index.lookup("C", "创始人"), "里奇")
+        self.assertEqual(index.stats()["delta_triples"], 1)
+
+        index.compact()
+        self.assertEqual(index.stats()["delta_triples"], 0)
+        self.assertEqual(index.size, 4)
+        self.assertEqual(index.lookup("荷兰", "国籍"), "吉多")
+
+
+if __name__ == "__main__":
+    unittest.main()
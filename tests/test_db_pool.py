@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+DBConnector 连接池并发测试：通过 connection_factory 注入本地替身连接，不需要 MySQL 服务
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_db_pool.py
+"""
+
+import threading
+import time
+import unittest
+
+from mysql.connector import Error, PoolError
+
+from database.db_connect import DBConnector
+
+
+class FakeConnection:
+    """替身连接：记录回滚/关闭/存活检查次数，可模拟回滚失败（broken）和空闲期间被服务端断开（dead）"""
+
+    def __init__(self, number):
+        self.number = number
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.closed = False
+        self.broken = False
+        self.dead = False
+        self.pings = 0
+
+    def is_connected(self):
+        self.pings += 1
+        return not self.dead
+
+    def rollback(self):
+        if self.broken:
+            raise Error("连接已断开")
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    """线程安全的替身连接工厂，记录创建过的全部连接"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.connections = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self.fail:
+            raise Error("无法连接")
+        with self._lock:
+            conn = FakeConnection(len(self.connections))
+            self.connections.append(conn)
+            return conn
+
+
+class DBConnectorTest(unittest.TestCase):
+    def make_pool(self, pool_size=4, max_wait=1.0, factory=None, check_idle=60):
+        self.factory = factory or FakeFactory()
+        pool = DBConnector(config={}, pool_size=pool_size, max_wait=max_wait, connection_factory=self.factory,
+                           check_idle=check_idle)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_concurrent_acquire_release_never_exceeds_pool_size(self):
+        pool = self.make_pool(pool_size=4, max_wait=5.0)
+        lock = threading.Lock()
+        in_use = set()
+        peak = [0]
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(50):
+                    with pool.connection() as conn:
+                        with lock:
+                            self.assertNotIn(conn, in_use, "同一连接被同时借给两个线程")
+                            in_use.add(conn)
+                            peak[0] = max(peak[0], len(in_use))
+                        time.sleep(0.0005)
+                        with lock:
+                            in_use.remove(conn)
+            except BaseException as e:  # 子线程中的断言失败交给主线程报告
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(peak[0], 4)
+        self.assertLessEqual(len(self.factory.connections), 4)
+        stats = pool.stats()
+        self.assertEqual(stats["checkouts"], 16 * 50)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["timeouts"], 0)
+
+    def test_exhausted_pool_times_out(self):
+        pool = self.make_pool(pool_size=2)
+        held = [pool.acquire(), pool.acquire()]
+        start = time.perf_counter()
+        with self.assertRaises(PoolError):
+            pool.acquire(timeout=0.1)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        for conn in held:
+            pool.release(conn)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(pool_size=1, max_wait=5.0)
+        conn = pool.acquire()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(result, [], "连接池耗尽时应等待")
+        pool.release(conn)
+        waiter.join(timeout=5)
+        self.assertEqual(result, [conn])
+        self.assertEqual(pool.stats()["waits"], 1)
+        pool.release(conn)
+
+    def test_release_after_error_rolls_back_and_reuses(self):
+        pool = self.make_pool(pool_size=1)
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                conn.in_transaction = True
+                raise ValueError("查询出错")
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertFalse(conn.closed)
+        with pool.connection() as again:
+            self.assertIs(again, conn)
+
+    def test_broken_connection_is_discarded_after_error(self):
+        pool = self.make_pool(pool_size=1)
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                conn.broken = True
+                raise ValueError("查询出错")
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()["created"], 0)
+        # 名额已释放，下一次借出创建新连接
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh, conn)
+
+    def test_concurrent_errors_do_not_leak_slots(self):
+        pool = self.make_pool(pool_size=3, max_wait=5.0)
+        errors = []
+
+        def worker(index):
+            for i in range(30):
+                try:
+                    with pool.connection() as conn:
+                        conn.broken = (index + i) % 5 == 0
+                        if (index + i) % 2 == 0:
+                            raise ValueError("查询出错")
+                except ValueError:
+                    pass
+                except BaseException as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        stats = pool.stats()
+        self.assertEqual(stats["in_use"], 0)
+        self.assertLessEqual(stats["created"], 3)
+        # 损坏的连接都已关闭，没有被放回池中
+        idle = [conn for conn in self.factory.connections if not conn.closed]
+        self.assertEqual(len(idle), stats["idle"])
+        self.assertFalse(any(conn.broken for conn in idle))
+
+    def test_stale_idle_connection_is_replaced_on_checkout(self):
+        pool = self.make_pool(pool_size=1, check_idle=0)
+        with pool.connection() as conn:
+            pass
+        # 空闲期间服务端关闭了连接（wait_timeout、重启）
+        conn.dead = True
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(conn.pings, 1)
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["stale_discarded"]), (1, 1))
+        with pool.connection() as again:
+            self.assertIs(again, fresh)
+
+    def test_recently_released_connection_skips_liveness_check(self):
+        pool = self.make_pool(pool_size=1, check_idle=60)
+        with pool.connection() as conn:
+            pass
+        with pool.connection() as again:
+            self.assertIs(again, conn)
+        self.assertEqual(conn.pings, 0)
+
+    def test_factory_failure_releases_slot(self):
+        pool = self.make_pool(pool_size=1, factory=FakeFactory(fail=True))
+        with self.assertRaises(Error):
+            pool.acquire()
+        self.assertEqual(pool.stats()["created"], 0)
+        self.factory.fail = False
+        conn = pool.acquire(timeout=0.1)
+        pool.release(conn)
+
+    def test_close_rejects_new_checkouts(self):
+        pool = self.make_pool(pool_size=2)
+        conn = pool.acquire()
+        pool.release(conn)
+        pool.close()
+        self.assertTrue(conn.closed)
+        with self.assertRaises(PoolError):
+            pool.acquire(timeout=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
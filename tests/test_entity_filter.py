@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+实体过滤器测试：其他进程新增的实体在过滤器判定不存在时按 id 增量补读发现，
+回看范围覆盖 id 较小但提交较晚的三元组，使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_entity_filter.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from config.system_config import SYSTEM_CONFIG
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+
+
+class EntityFilterRefreshTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.path = os.path.join(work_dir.name, "kg.db")
+        patcher = mock.patch.dict(SYSTEM_CONFIG, {"entity_filter_path": "", "entity_filter_capacity": 1000,
+                                                  "entity_filter_refresh_interval": 1e-9,
+                                                  "entity_filter_id_margin": 10})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db = DBOperation(backend=SQLiteBackend(self.path))
+        self.addCleanup(self.db.close)
+        self.db.save_knowledge("Python", "创始人", "Guido")
+        self.assertTrue(self.db.load_entity_filter())
+
+    def insert_from_other_process(self, triple_id, entity1, relation, entity2):
+        conn = sqlite3.connect(self.path)
+        conn.execute("INSERT INTO knowledge_triple (id, entity1, relation, entity2) VALUES (?, ?, ?, ?)",
+                     (triple_id, entity1, relation, entity2))
+        conn.commit()
+        conn.close()
+
+    def test_entities_written_by_other_process_are_found(self):
+        self.insert_from_other_process(2, "Java", "创始人", "Gosling")
+        self.assertEqual(self.db.query_knowledge("Java", "创始人"), "Gosling")
+        self.assertEqual(self.db.query_knowledge("Gosling", "创始人"), "Java")
+
+    def test_late_commit_with_smaller_id_is_found(self):
+        self.insert_from_other_process(8, "Java", "创始人", "Gosling")
+        self.assertEqual(self.db.query_knowledge("Java", "创始人"), "Gosling")
+        # id 5 在 id 8 之前分配、之后才提交
+        self.insert_from_other_process(5, "Go", "创始人", "Pike")
+        self.assertEqual(self.db.query_knowledge("Go", "创始人"), "Pike")
+
+    def test_no_refresh_within_interval(self):
+        SYSTEM_CONFIG["entity_filter_refresh_interval"] = 3600
+        self.insert_from_other_process(2, "Java", "创始人", "Gosling")
+        self.assertIsNone(self.db.query_knowledge("Java", "创始人"))
+        self.assertEqual(self.db.query_knowledge("Python", "创始人"), "Guido")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+知识快照测试：导出后新写入的知识在重新加载快照时按 id 补入增量层，查询按排序规则比较，使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_knowledge_snapshot.py
+"""
+
+import os
+import tempfile
+import unittest
+
+from database.db_operation import DBOperation
+from database.knowledge_snapshot import KnowledgeSnapshot, write_snapshot
+from database.sqlite_backend import SQLiteBackend
+
+
+class KnowledgeSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.db_path = os.path.join(work_dir.name, "kg.db")
+        self.snapshot_path = os.path.join(work_dir.name, "knowledge.snap")
+
+    def open_db(self):
+        db = DBOperation(backend=SQLiteBackend(self.db_path))
+        self.addCleanup(db.close)
+        return db
+
+    def export(self, db):
+        max_id = db.backend.max_triple_id()
+        return write_snapshot(db.iter_triples(), self.snapshot_path, max_triple_id=max_id)
+
+    def test_facts_saved_after_export_are_found_after_restart(self):
+        db = self.open_db()
+        self.assertTrue(db.save_knowledge("Python", "创始人", "Guido"))
+        self.assertEqual(self.export(db), 1)
+        self.assertTrue(db.save_knowledge("Java", "创始人", "Gosling"))
+        db.close()
+
+        db = self.open_db()
+        self.assertTrue(db.load_snapshot(self.snapshot_path))
+        self.assertEqual(db.triple_index.size, 2)
+        self.assertEqual(db.query_knowledge("Java", "创始人"), "Gosling")
+        self.assertEqual(db.query_knowledge("Python", "创始人"), "Guido")
+
+    def test_snapshot_newer_than_database_is_rejected(self):
+        db = self.open_db()
+        db.save_knowledge("Python", "创始人", "Guido")
+        write_snapshot(db.iter_triples(), self.snapshot_path, max_triple_id=db.backend.max_triple_id() + 10)
+        self.assertFalse(db.load_snapshot(self.snapshot_path))
+        self.assertIsNone(db.triple_index)
+
+    def test_keys_follow_collation_and_answers_keep_original_case(self):
+        write_snapshot(iter([("Python", "创始人", "Guido"), ("python", "创始人", "GUIDO"), ("中国", "GDP", "很多")]),
+                       self.snapshot_path, max_triple_id=3)
+        snapshot = KnowledgeSnapshot(self.snapshot_path)
+        self.addCleanup(snapshot.close)
+        self.assertEqual((len(snapshot), snapshot.max_triple_id), (2, 3))
+        self.assertEqual(snapshot.lookup("PYTHON", "创始人"), "Guido")
+        self.assertEqual(snapshot.lookup("guido", "创始人", exact=True), "Python")
+        self.assertEqual(snapshot.lookup("中国", "gd"), "很多")
+        self.assertEqual(snapshot.relations(), ["GDP", "创始人"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+多跳查询测试：query_paths 的结果与逐跳调用 query_knowledge 一致（包括大小写不同的实体），使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_path_query.py
+"""
+
+import os
+import tempfile
+import unittest
+
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+
+TRIPLES = [
+    ("Python", "创始人", "Guido"),
+    ("guido", "国籍", "Netherlands"),
+    ("NETHERLANDS", "首都", "Amsterdam"),
+]
+
+PATHS = [
+    ("python", ["创始人", "国籍", "首都"]),
+    ("PYTHON", ["创始人", "国籍"]),
+    ("Python", ["创始人", "首都"]),
+    ("amsterdam", ["首都", "国籍"]),
+]
+
+
+class PathQueryTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.db = DBOperation(backend=SQLiteBackend(os.path.join(work_dir.name, "kg.db")), relation_match="like")
+        self.addCleanup(self.db.close)
+        for triple in TRIPLES:
+            self.assertTrue(self.db.save_knowledge(*triple))
+
+    def hop_by_hop(self, entity, relations):
+        for relation in relations:
+            entity = self.db.query_knowledge(entity, relation)
+            if not entity:
+                return None
+        return entity
+
+    def test_mixed_case_chain_matches_hop_by_hop(self):
+        expected = [self.hop_by_hop(entity, relations) for entity, relations in PATHS]
+        self.assertEqual(expected, ["Amsterdam", "Netherlands", None, "guido"])
+        answers, stats = self.db.query_paths(PATHS, time_budget=0)
+        self.assertEqual(answers, expected)
+        self.assertFalse(stats["timed_out"])
+
+
+if __name__ == "__main__":
+    unittest.main()
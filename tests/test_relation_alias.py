@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+关系别名规范化测试：只有关系别名迁移记录在 schema_version 中之后才改写查询关系，使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_relation_alias.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from config.db_config import RELATION_ALIAS_SCHEMA_VERSION
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+
+
+class RelationAliasTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.path = os.path.join(work_dir.name, "kg.db")
+
+    def open_db(self):
+        db = DBOperation(backend=SQLiteBackend(self.path))
+        self.addCleanup(db.close)
+        return db
+
+    def make_legacy_database(self, rows):
+        """模拟迁移前的旧数据库：以别名保存的三元组，没有关系别名迁移记录"""
+        SQLiteBackend(self.path).close()
+        conn = sqlite3.connect(self.path)
+        conn.execute("DELETE FROM schema_version WHERE version = ?", (RELATION_ALIAS_SCHEMA_VERSION,))
+        conn.executemany("INSERT INTO knowledge_triple (entity1, relation, entity2) VALUES (?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+    def test_unmigrated_database_keeps_raw_matching(self):
+        self.make_legacy_database([("Python", "创办人", "Guido")])
+        db = self.open_db()
+        self.assertEqual(db.query_knowledge("Python", "创办人"), "Guido")
+        self.assertFalse(db.load_relation_aliases())
+        self.assertFalse(db.alias_table_ready)
+        self.assertEqual(db.query_knowledge("Python", "创办人"), "Guido")
+
+    def test_new_database_normalizes_saves_and_queries(self):
+        db = self.open_db()
+        self.assertTrue(db.save_knowledge("Python", "创办人", "Guido"))
+        self.assertTrue(db.alias_table_ready)
+        self.assertEqual(db.query_knowledge("Python", "创始人"), "Guido")
+        self.assertEqual(db.query_knowledge("Python", "创办人"), "Guido")
+        # 重新打开后仍然启用规范化
+        db.close()
+        db = self.open_db()
+        self.assertTrue(db.load_relation_aliases())
+        self.assertEqual(db.query_knowledge("Python", "创办人"), "Guido")
+
+
+if __name__ == "__main__":
+    unittest.main()
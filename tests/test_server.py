@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 服务接口测试：QAServer 使用替身引擎监听本地随机端口，不需要数据库
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_server.py
+"""
+
+import http.client
+import json
+import threading
+import time
+import unittest
+
+from monitoring import METRICS
+from nlp.triple_extractor import TripleExtractor
+from server import QAServer
+
+
+class FakeDBOperation:
+    def __init__(self):
+        self.saved = []
+
+    def save_knowledge(self, entity1, relation, entity2):
+        self.saved.append((entity1, relation, entity2))
+        return True
+
+
+class FakeEngine:
+    """替身引擎：抽取使用真实的 TripleExtractor，保存记录到 FakeDBOperation"""
+
+    def __init__(self):
+        self.db_operation = FakeDBOperation()
+        self.triple_extractor = TripleExtractor(db_relations=["创始人"])
+
+    def answer_question(self, question, silent=False):
+        return None, None
+
+    def answer_questions(self, questions):
+        return [(None, None) for _ in questions]
+
+    def learn_knowledge(self, question, user_answer, silent=False, input_callback=None):
+        entity1, relation, entity2 = self.triple_extractor.extract_triple(question, user_answer, silent=silent,
+                                                                          input_callback=input_callback)
+        return self.db_operation.save_knowledge(entity1, relation, entity2), "学习成功"
+
+    def stats(self):
+        return {}
+
+
+class BlockingEngine(FakeEngine):
+    """替身引擎：answer_question 阻塞到 release 被设置，用于占满处理名额"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def answer_question(self, question, silent=False):
+        self.entered.set()
+        self.release.wait(5)
+        return None, None
+
+
+class QAServerTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = FakeEngine()
+        self.server = self.start_server(self.engine, workers=2)
+
+    def start_server(self, engine, **kwargs):
+        server = QAServer(("127.0.0.1", 0), engine, idle_timeout=5, **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def post(self, path, payload, server=None):
+        # 每个请求使用独立连接并在响应后关闭
+        conn = http.client.HTTPConnection(*(server or self.server).server_address, timeout=5)
+        try:
+            conn.request("POST", path, body=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                         headers={"Content-Type": "application/json", "Connection": "close"})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    def test_learn_rejects_non_string_fields(self):
+        for payload in ({"question": "Python创始人是谁", "answer": 123},
+                        {"question": ["Python"], "answer": "吉多"},
+                        {"question": "Python创始人是谁", "answer": "吉多", "entity1": {"a": 1}, "relation": "创始人"},
+                        {"question": "Python创始人是谁", "answer": "吉多", "entity1": "Python", "relation": 1}):
+            status, body = self.post("/learn", payload)
+            self.assertEqual(status, 400, payload)
+            self.assertIn("必须是字符串", body["error"])
+        self.assertEqual(self.engine.db_operation.saved, [])
+
+    def test_learn_rejects_unrecognized_question(self):
+        status, body = self.post("/learn", {"question": "嗯？", "answer": "吉多"})
+        self.assertEqual(status, 400)
+        self.assertFalse(body["success"])
+        self.assertEqual(self.engine.db_operation.saved, [])
+
+    def test_learn_with_extracted_or_explicit_triple(self):
+        status, body = self.post("/learn", {"question": "Python创始人是谁", "answer": "吉多"})
+        self.assertEqual((status, body["success"]), (200, True))
+        status, body = self.post("/learn", {"question": "嗯？", "answer": " 高斯林 ",
+                                            "entity1": "Ｊａｖａ", "relation": "创始人"})
+        self.assertEqual((status, body["success"]), (200, True))
+        self.assertEqual(self.engine.db_operation.saved, [("Python", "创始人", "吉多"), ("Ｊａｖａ", "创始人", "高斯林")])
+
+    def test_idle_keep_alive_connections_do_not_block_requests(self):
+        # 空闲的 keep-alive 连接数超过 workers 时，新请求仍立即得到处理
+        idle = []
+        for _ in range(3):
+            conn = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+            self.addCleanup(conn.close)
+            conn.request("GET", "/health")
+            response = conn.getresponse()
+            response.read()
+            self.assertEqual(response.status, 200)
+            idle.append(conn)
+        start = time.perf_counter()
+        self.assertEqual(self.post("/answer", {"question": "Python创始人是谁"})[0], 200)
+        self.assertLess(time.perf_counter() - start, 1)
+        # 空闲连接上的后续请求照常处理
+        idle[0].request("GET", "/health")
+        self.assertEqual(idle[0].getresponse().status, 200)
+
+    def test_requests_over_capacity_get_503(self):
+        engine = BlockingEngine()
+        server = self.start_server(engine, workers=1, backlog=0)
+        busy = threading.Thread(target=self.post, args=("/answer", {"question": "a"}, server))
+        busy.start()
+        self.addCleanup(busy.join, 5)
+        self.addCleanup(engine.release.set)
+        self.assertTrue(engine.entered.wait(5))
+        status, body = self.post("/answer", {"question": "b"}, server)
+        self.assertEqual(status, 503)
+        engine.release.set()
+        busy.join(5)
+        self.assertEqual(self.post("/answer", {"question": "c"}, server)[0], 200)
+
+    def test_explicit_triple_learn_is_timed(self):
+        before = METRICS.histogram("request.learn").count
+        status, body = self.post("/learn", {"question": "嗯？", "answer": "高斯林", "entity1": "Java", "relation": "创始人"})
+        self.assertEqual((status, body["success"]), (200, True))
+        self.assertEqual(METRICS.histogram("request.learn").count, before + 1)
+
+    def test_oversized_body_is_rejected(self):
+        server = self.start_server(FakeEngine(), workers=1, max_body_bytes=64)
+        status, body = self.post("/learn", {"question": "Python创始人是谁", "answer": "吉" * 64}, server)
+        self.assertEqual(status, 413)
+        self.assertEqual(server.engine.db_operation.saved, [])
+        self.assertEqual(self.post("/learn", {"question": "Python创始人是谁", "answer": "吉多"}, server)[0], 200)
+
+    def test_answer_rejects_non_string_question(self):
+        self.assertEqual(self.post("/answer", {"question": 1})[0], 400)
+        self.assertEqual(self.post("/answer/batch", {"questions": ["a", None]})[0], 400)
+        self.assertEqual(self.post("/answer/batch", {"questions": ["a"]})[0], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite 后端测试：每个线程使用自己的连接，线程退出后连接被关闭，连接数不随线程数增长
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_sqlite_backend.py
+"""
+
+import gc
+import os
+import tempfile
+import threading
+import unittest
+
+from database.sqlite_backend import SQLiteBackend
+
+
+class SQLiteBackendTest(unittest.TestCase):
+    def open_backend(self, path):
+        backend = SQLiteBackend(path)
+        self.addCleanup(backend.close)
+        return backend
+
+    def run_in_threads(self, backend, count):
+        results = []
+
+        def worker():
+            results.append(backend.query_knowledge("Python", "创始人"))
+
+        for _ in range(count):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        return results
+
+    def test_thread_connections_are_closed_on_thread_exit(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        backend = self.open_backend(os.path.join(work_dir.name, "kg.db"))
+        backend.save_knowledge("Python", "创始人", "Guido")
+        self.assertEqual(self.run_in_threads(backend, 20), ["Guido"] * 20)
+        gc.collect()
+        # 只剩创建后端的线程的连接
+        self.assertEqual(backend.stats()["connections"], 1)
+
+    def test_memory_database_survives_thread_exit(self):
+        backend = self.open_backend(":memory:")
+        backend.save_knowledge("Python", "创始人", "Guido")
+        self.assertEqual(self.run_in_threads(backend, 3), ["Guido"] * 3)
+        gc.collect()
+        self.assertEqual(backend.query_knowledge("Python", "创始人"), "Guido")
+
+    def test_backend_created_in_worker_thread_keeps_its_data(self):
+        backends = []
+        thread = threading.Thread(target=lambda: backends.append(SQLiteBackend(":memory:")))
+        thread.start()
+        thread.join()
+        backend = backends[0]
+        self.addCleanup(backend.close)
+        gc.collect()
+        backend.save_knowledge("Python", "创始人", "Guido")
+        self.assertEqual(self.run_in_threads(backend, 2), ["Guido"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+三元组抽取测试：问题规范化与解析缓存无关，学习保存的实体与查询时解析出的实体一致，实体本身不被改写
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_triple_extractor.py
+"""
+
+import unittest
+
+from nlp.parse_cache import ParseCache
+from nlp.triple_extractor import TripleExtractor
+
+QUESTIONS = [
+    "Ｐｙｔｈｏｎ的创始人是谁？",
+    "Python的创始人是谁 ?",
+    " Python的创始人是谁",
+    "Python  的创始人是谁",
+    "北京是中国的什么",
+    "Ｐｙｔｈｏｎ的创始人的国籍是什么？",
+]
+
+
+class TripleExtractorTest(unittest.TestCase):
+    def setUp(self):
+        self.plain = TripleExtractor(db_relations=["创始人", "国籍"])
+        self.cached = TripleExtractor(db_relations=["创始人", "国籍"], parse_cache=ParseCache(max_size=16))
+
+    def test_cache_does_not_change_parse(self):
+        for question in QUESTIONS:
+            expected = self.plain.extract_entity_and_relation(question)
+            # 第一次未命中、第二次命中缓存，结果都与未启用缓存时相同
+            self.assertEqual(self.cached.extract_entity_and_relation(question), expected, question)
+            self.assertEqual(self.cached.extract_entity_and_relation(question), expected, question)
+
+    def test_trailing_punctuation_and_spaces_share_cache_key(self):
+        expected = self.cached.extract_entity_and_relation("Python的创始人是谁")
+        for question in (" Python的创始人是谁？", "Python的创始人是谁 ?", "Python的创始人是谁。"):
+            self.assertEqual(self.cached.extract_entity_and_relation(question), expected, question)
+        self.assertEqual(self.cached.parse_cache.stats()["hits"], 3)
+        self.assertEqual(self.plain.extract_relation_chain("Python的创始人的国籍是什么？"), ("Python", ["创始人", "国籍"]))
+
+    def test_entities_are_not_rewritten(self):
+        # 全角实体原样保留（由数据库排序规则比较），不会与数据库中已有的写法不一致
+        entity1, relation = self.plain.extract_entity_and_relation("Ｐｙｔｈｏｎ的创始人是谁？")
+        self.assertTrue(entity1.startswith("Ｐｙｔｈｏｎ"), entity1)
+        self.assertEqual(self.plain.extract_triple("Ｐｙｔｈｏｎ的创始人是谁？", " 吉多 "), (entity1, relation, "吉多"))
+
+    def test_manual_input_is_stripped(self):
+        answers = iter([" Node ", "作者", "Ｒｙａｎ"])
+        triple = self.plain.extract_triple("？？", "Ryan", silent=True, input_callback=lambda prompt: next(answers))
+        self.assertEqual(triple, ("Node", "作者", "Ｒｙａｎ"))
+
+
+if __name__ == "__main__":
+    unittest.main()
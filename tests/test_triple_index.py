@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+内存三元组索引测试：加载索引后的查询结果与 SQL 查询（排序规则下大小写不敏感的 = / LIKE）一致，使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_triple_index.py
+"""
+
+import os
+import tempfile
+import unittest
+
+from config.system_config import SYSTEM_CONFIG
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+from database.triple_index import TripleIndex
+
+TRIPLES = [
+    ("Python", "创始人", "Guido"),
+    ("Guido", "国籍", "Netherlands"),
+    ("中国", "GDP", "很多"),
+    ("北京", "首都", "中国"),
+    ("Linux", "Creator", "Linus"),
+]
+
+QUERIES = [
+    ("Python", "创始人"), ("python", "创始人"), ("PYTHON", "创始"), ("guido", "国籍"),
+    ("netherlands", "国籍"), ("中国", "gdp"), ("中国", "Gd"), ("中国", "首都"), ("linux", "creator"),
+    ("LINUS", "CREATOR"), ("linux", ""), ("Java", "创始人"), ("python", "国籍"),
+]
+
+
+class TripleIndexTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.db = DBOperation(backend=SQLiteBackend(os.path.join(work_dir.name, "kg.db")), relation_match="like")
+        self.addCleanup(self.db.close)
+        for triple in TRIPLES:
+            self.assertTrue(self.db.save_knowledge(*triple))
+
+    def sql_answers(self):
+        self.db.triple_index = None
+        return [self.db.query_knowledge(*query) for query in QUERIES]
+
+    def test_index_matches_sql(self):
+        expected = self.sql_answers()
+        self.assertEqual(expected[1], "Guido")
+        self.assertEqual(expected[5], "很多")
+        previous = SYSTEM_CONFIG.get("triple_index_type")
+        for index_type in ("dict", "compact"):
+            SYSTEM_CONFIG["triple_index_type"] = index_type
+            try:
+                self.assertTrue(self.db.load_triple_index())
+            finally:
+                SYSTEM_CONFIG["triple_index_type"] = previous
+            self.assertEqual([self.db.query_knowledge(*query) for query in QUERIES], expected, index_type)
+
+    def test_case_variants_are_one_triple(self):
+        index = TripleIndex()
+        index.load([("Python", "创始人", "Guido"), ("python", "创始人", "GUIDO")])
+        self.assertEqual(index.size, 1)
+        self.assertEqual(index.lookup("PYTHON", "创始人"), "Guido")
+        self.assertEqual(index.lookup("guido", "创始人", exact=True), "Python")
+        self.assertEqual(index.relations(), ["创始人"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+写后队列测试：进程崩溃后未提交的写入在下次启动时重放（跳过写了一半的最后一行），
+同一日志只能由一个进程使用，使用临时 SQLite 文件
+
+运行方式（在项目根目录下）：
+    python -m pytest -q tests/test_write_behind.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from database.db_operation import DBOperation
+from database.sqlite_backend import SQLiteBackend
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程：启用写后模式保存两条知识，在后台线程提交之前直接退出（模拟崩溃）
+CRASH_SCRIPT = textwrap.dedent("""
+    import os, sys
+    from database.db_operation import DBOperation
+    from database.sqlite_backend import SQLiteBackend
+
+    db = DBOperation(backend=SQLiteBackend(sys.argv[1]))
+    db.enable_write_behind(sys.argv[2], max_delay=60)
+    assert db.save_knowledge("Python", "创始人", "Guido")
+    assert db.save_knowledge("Java", "创始人", "Gosling")
+    os._exit(0)
+""")
+
+
+class WriteBehindTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.db_path = os.path.join(work_dir.name, "kg.db")
+        self.journal = os.path.join(work_dir.name, "write_behind.journal")
+        SQLiteBackend(self.db_path).close()
+
+    def open_db(self):
+        db = DBOperation(backend=SQLiteBackend(self.db_path))
+        self.addCleanup(db.close)
+        return db
+
+    def crash_with_pending_writes(self):
+        subprocess.run([sys.executable, "-c", CRASH_SCRIPT, self.db_path, self.journal],
+                       cwd=PROJECT_ROOT, check=True, timeout=30)
+
+    def test_pending_writes_are_replayed_after_crash(self):
+        self.crash_with_pending_writes()
+        db = self.open_db()
+        self.assertIsNone(db.query_knowledge("Python", "创始人"))
+        queue = db.enable_write_behind(self.journal)
+        self.assertEqual(queue.replayed, 2)
+        self.assertTrue(db.flush(timeout=10))
+        db.close()
+        db = self.open_db()
+        self.assertEqual(db.query_knowledge("Python", "创始人"), "Guido")
+        self.assertEqual(db.query_knowledge("Java", "创始人"), "Gosling")
+
+    def test_torn_last_line_is_skipped(self):
+        self.crash_with_pending_writes()
+        # 崩溃时最后一行只写了一半
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write('{"seq": 3, "triple": ["C", "创始')
+        db = self.open_db()
+        queue = db.enable_write_behind(self.journal)
+        self.assertEqual(queue.replayed, 2)
+        self.assertTrue(db.flush(timeout=10))
+        self.assertEqual(db.query_knowledge("Java", "创始人"), "Gosling")
+        self.assertIsNone(db.query_knowledge("C", "创始人"))
+        # 重放后日志已重写，后续追加不会接在半行之后
+        self.assertTrue(db.save_knowledge("Go", "创始人", "Pike"))
+        self.assertTrue(db.flush(timeout=10))
+        self.assertEqual(db.query_knowledge("Go", "创始人"), "Pike")
+
+    def test_journal_is_locked_by_one_process(self):
+        owner = self.open_db()
+        self.assertIsNotNone(owner.enable_write_behind(self.journal))
+        other = self.open_db()
+        self.assertIsNone(other.enable_write_behind(self.journal))
+        self.assertIsNone(other.write_behind)
+        # 未启用写后模式时同步保存
+        self.assertTrue(other.save_knowledge("Python", "创始人", "Guido"))
+        owner.close()
+        self.assertIsNotNone(other.enable_write_behind(self.journal))
+
+    def test_default_journal_path_is_absolute_and_per_database(self):
+        db = self.open_db()
+        other = DBOperation(backend=SQLiteBackend(self.db_path + "2"))
+        self.addCleanup(other.close)
+        path = db.default_journal_path()
+        self.assertTrue(os.path.isabs(path))
+        self.assertNotEqual(path, other.default_journal_path())
+
+
+if __name__ == "__main__":
+    unittest.main()